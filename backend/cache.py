@@ -1,19 +1,166 @@
 """Redis cache utilities"""
 import redis.asyncio as redis
-from typing import Optional, Any
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Optional, Any, Awaitable, Callable, Dict, Hashable, List, Sequence, Tuple
+import asyncio
 import json
+import math
+import random
+import time
+import uuid
 import structlog
 
 from backend.config import settings
+from backend.utils.single_flight import SingleFlight
+from backend.utils.stage_scheduler import spawn_background
+
+try:
+    import orjson
+except ImportError:  # REDIS_SERIALIZER=orjson falls back to json
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # REDIS_SERIALIZER=msgpack falls back to json
+    msgpack = None
 
 logger = structlog.get_logger()
 
 
+class LocalLRUCache:
+    """Bounded in-process cache with per-entry TTL and LRU eviction"""
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get value, dropping it if expired"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+    
+    def set(self, key: Hashable, value: Any, ttl: float = None):
+        """Set value, evicting the least recently used entries if full"""
+        self._data[key] = (value, time.monotonic() + (ttl or self.ttl))
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def delete(self, key: Hashable):
+        """Delete key if present"""
+        self._data.pop(key, None)
+    
+    def delete_prefix(self, prefix: str):
+        """Delete all string keys starting with prefix"""
+        for key in [k for k in self._data if isinstance(k, str) and k.startswith(prefix)]:
+            del self._data[key]
+    
+    def delete_pattern(self, pattern: str):
+        """Delete all string keys matching a glob pattern"""
+        for key in [k for k in self._data if isinstance(k, str) and fnmatchcase(k, pattern)]:
+            del self._data[key]
+    
+    def clear(self):
+        """Drop all entries"""
+        self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class JsonSerializer:
+    """Standard-library JSON (the default; readable with redis-cli)"""
+    
+    name = "json"
+    
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode()
+    
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer:
+    """orjson: same JSON on the wire, several times faster to encode and decode"""
+    
+    name = "orjson"
+    
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackSerializer:
+    """MessagePack: compact binary values"""
+    
+    name = "msgpack"
+    
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+    
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+_SERIALIZERS = {
+    "json": (JsonSerializer, True),
+    "orjson": (OrjsonSerializer, orjson is not None),
+    "msgpack": (MsgpackSerializer, msgpack is not None),
+}
+
+
+def get_serializer(name: str):
+    """Serializer for a ``REDIS_SERIALIZER`` name, falling back to JSON if not installed"""
+    if name not in _SERIALIZERS:
+        raise ValueError(f"Unknown cache serializer: {name}")
+    serializer, available = _SERIALIZERS[name]
+    if not available:
+        logger.warning("Cache serializer not installed, using json", serializer=name)
+        return JsonSerializer
+    return serializer
+
+
+# Compare-and-delete so a lease is only released by its holder
+_RELEASE_LEASE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
 class RedisCache:
-    """Redis cache manager"""
+    """Redis cache manager
     
-    def __init__(self):
+    Values are encoded by a pluggable serializer (``REDIS_SERIALIZER``).
+    The client returns raw bytes, so pub/sub users decode messages
+    themselves. Connections come from a bounded pool that makes callers
+    wait up to ``REDIS_POOL_TIMEOUT`` seconds for a free connection
+    instead of opening more. The ``*_many`` methods take one round trip
+    however many keys they touch.
+    """
+    
+    def __init__(self, serializer=None):
         self.redis: Optional[redis.Redis] = None
+        self.pool: Optional[redis.BlockingConnectionPool] = None
+        self.serializer = serializer or get_serializer(settings.REDIS_SERIALIZER)
     
     async def connect(self):
         """Connect to Redis"""
@@ -21,23 +168,45 @@ class RedisCache:
             logger.warning("Redis URL not configured, cache disabled")
             return
         try:
-            self.redis = await redis.from_url(
+            self.pool = redis.BlockingConnectionPool.from_url(
                 settings.REDIS_URL,
-                encoding="utf-8",
-                decode_responses=True
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                timeout=settings.REDIS_POOL_TIMEOUT,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_keepalive=True,
+                health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+                retry_on_timeout=True,
             )
+            self.redis = redis.Redis(connection_pool=self.pool)
             await self.redis.ping()
-            logger.info("Connected to Redis")
+            logger.info(
+                "Connected to Redis",
+                max_connections=settings.REDIS_MAX_CONNECTIONS, serializer=self.serializer.name,
+            )
         except Exception as e:
             logger.warning("Failed to connect to Redis, cache disabled", error=str(e))
             self.redis = None
+            if self.pool is not None:
+                await self.pool.disconnect()
+                self.pool = None
     
     async def disconnect(self):
         """Disconnect from Redis"""
         if self.redis:
             await self.redis.close()
+            if self.pool is not None:
+                await self.pool.disconnect()
             logger.info("Disconnected from Redis")
     
+    def _loads(self, key, data: bytes) -> Optional[Any]:
+        try:
+            return self.serializer.loads(data)
+        except Exception as e:
+            # e.g. written by another serializer; treat as a miss
+            logger.warning("Redis value decode error", key=key, error=str(e))
+            return None
+    
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
         if not self.redis:
@@ -45,22 +214,52 @@ class RedisCache:
         try:
             value = await self.redis.get(key)
             if value:
-                return json.loads(value)
+                return self._loads(key, value)
             return None
         except Exception as e:
             logger.error("Redis get error", key=key, error=str(e))
             return None
     
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        """Get several values with one MGET; missing keys are left out"""
+        if not self.redis or not keys:
+            return {}
+        try:
+            values = await self.redis.mget(keys)
+        except Exception as e:
+            logger.error("Redis get many error", keys=len(keys), error=str(e))
+            return {}
+        found = {}
+        for key, value in zip(keys, values):
+            if value:
+                decoded = self._loads(key, value)
+                if decoded is not None:
+                    found[key] = decoded
+        return found
+    
     async def set(self, key: str, value: Any, ttl: int = None):
         """Set value in cache"""
         if not self.redis:
             return
         try:
             ttl = ttl or settings.REDIS_CACHE_TTL
-            await self.redis.setex(key, ttl, json.dumps(value))
+            await self.redis.setex(key, ttl, self.serializer.dumps(value))
         except Exception as e:
             logger.error("Redis set error", key=key, error=str(e))
     
+    async def set_many(self, items: Dict[str, Any], ttl: int = None):
+        """Set several values with one pipelined round trip"""
+        if not self.redis or not items:
+            return
+        try:
+            ttl = ttl or settings.REDIS_CACHE_TTL
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.setex(key, ttl, self.serializer.dumps(value))
+                await pipe.execute()
+        except Exception as e:
+            logger.error("Redis set many error", keys=len(items), error=str(e))
+    
     async def delete(self, key: str):
         """Delete key from cache"""
         if not self.redis:
@@ -70,6 +269,35 @@ class RedisCache:
         except Exception as e:
             logger.error("Redis delete error", key=key, error=str(e))
     
+    async def delete_many(self, keys: Sequence[str]) -> int:
+        """Delete several keys with one DEL"""
+        if not self.redis or not keys:
+            return 0
+        try:
+            return await self.redis.delete(*keys)
+        except Exception as e:
+            logger.error("Redis delete many error", keys=len(keys), error=str(e))
+            return 0
+    
+    async def delete_pattern(self, pattern: str) -> int:
+        """Delete all keys matching a glob pattern"""
+        if not self.redis:
+            return 0
+        try:
+            deleted = 0
+            batch = []
+            async for key in self.redis.scan_iter(match=pattern, count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    deleted += await self.redis.delete(*batch)
+                    batch = []
+            if batch:
+                deleted += await self.redis.delete(*batch)
+            return deleted
+        except Exception as e:
+            logger.error("Redis delete pattern error", pattern=pattern, error=str(e))
+            return 0
+    
     async def exists(self, key: str) -> bool:
         """Check if key exists"""
         if not self.redis:
@@ -79,7 +307,350 @@ class RedisCache:
         except Exception as e:
             logger.error("Redis exists error", key=key, error=str(e))
             return False
+    
+    async def acquire_lease(self, name: str, ttl: float) -> Optional[str]:
+        """Take an exclusive lease for ``ttl`` seconds (SET NX PX)
+        
+        Returns a token for ``release_lease``, or None if another holder
+        has it. Without Redis every caller gets the lease.
+        """
+        token = uuid.uuid4().hex
+        if not self.redis:
+            return token
+        try:
+            if await self.redis.set(name, token, nx=True, px=max(1, int(ttl * 1000))):
+                return token
+            return None
+        except Exception as e:
+            logger.error("Redis lease error", name=name, error=str(e))
+            return token
+    
+    async def release_lease(self, name: str, token: str):
+        """Release a lease if it is still held with ``token``"""
+        if not self.redis:
+            return
+        try:
+            await self.redis.eval(_RELEASE_LEASE, 1, name, token)
+        except Exception as e:
+            logger.error("Redis lease release error", name=name, error=str(e))
+
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# How often a caller waiting on another worker's lease checks for the result
+_LEASE_POLL_SECONDS = 0.05
+
+
+class TieredCache:
+    """In-process L1 in front of Redis (L2), with the ``RedisCache`` interface.
+    
+    Each key prefix in ``budgets`` gets its own bounded LRU (budget 0 keeps
+    that prefix out of L1); other keys share the default budget. Writes and
+    deletes go to both tiers and are announced on ``cache:invalidate`` so
+    other workers drop their L1 copies. While Redis is connected, L1 keeps
+    entries for at most ``l1_ttl`` seconds; without Redis it keeps them for
+    their full TTL and serves as the cache on its own.
+    """
+    
+    def __init__(self, l2: RedisCache, budgets: Dict[str, int], default_budget: int, l1_ttl: float):
+        self.l2 = l2
+        self.l1_ttl = l1_ttl
+        self.worker_id = uuid.uuid4().hex[:12]
+        # Longest prefix first so the most specific budget wins
+        self._tiers: List[Tuple[str, Optional[LocalLRUCache]]] = [
+            (prefix, LocalLRUCache(maxsize=size, ttl=l1_ttl) if size > 0 else None)
+            for prefix, size in sorted(budgets.items(), key=lambda item: -len(item[0]))
+        ]
+        self._default = LocalLRUCache(maxsize=default_budget, ttl=l1_ttl) if default_budget > 0 else None
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self._flights = SingleFlight("cache_compute")
+        self.compute_stats = dict.fromkeys(
+            ("fresh", "early_refresh", "stale", "computed", "waited", "lease_timeout"), 0
+        )
+    
+    @property
+    def redis(self) -> Optional[redis.Redis]:
+        return self.l2.redis
+    
+    @property
+    def invalidation_connected(self) -> bool:
+        """Whether other workers' writes and deletes reach this worker's L1"""
+        return self._listener is not None and not self._listener.done()
+    
+    def _l1(self, key: str) -> Optional[LocalLRUCache]:
+        for prefix, tier in self._tiers:
+            if key.startswith(prefix):
+                return tier
+        return self._default
+    
+    def _l1_caches(self) -> List[LocalLRUCache]:
+        return [tier for _, tier in self._tiers if tier is not None] + ([self._default] if self._default else [])
+    
+    def _l1_ttl(self, ttl: Optional[int]) -> float:
+        ttl = ttl or settings.REDIS_CACHE_TTL
+        return min(ttl, self.l1_ttl) if self.l2.redis is not None else ttl
+    
+    def l1_entries(self) -> Dict[str, int]:
+        """Entries held per L1 budget (``*`` for the default)"""
+        entries = {prefix: len(tier) for prefix, tier in self._tiers if tier is not None}
+        if self._default is not None:
+            entries["*"] = len(self._default)
+        return entries
+    
+    async def connect(self):
+        """Connect to Redis and subscribe to invalidations"""
+        await self.l2.connect()
+        if self.l2.redis is None:
+            logger.warning("Serving cache from process memory only")
+            return
+        try:
+            self._pubsub = self.l2.redis.pubsub()
+            await self._pubsub.subscribe(INVALIDATION_CHANNEL)
+            self._listener = asyncio.create_task(self._listen())
+        except Exception as e:
+            logger.warning("Cache invalidation subscribe failed", error=str(e))
+            self._pubsub = None
+    
+    async def disconnect(self):
+        """Stop listening and disconnect from Redis"""
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except Exception as e:
+                logger.warning("Cache invalidation close failed", error=str(e))
+            self._pubsub = None
+        await self.l2.disconnect()
+    
+    async def get(self, key: str) -> Optional[Any]:
+        """Get value from L1, falling back to Redis"""
+        l1 = self._l1(key)
+        if l1 is not None:
+            value = l1.get(key)
+            if value is not None:
+                self.l1_hits += 1
+                return value
+        
+        value = await self.l2.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.l2_hits += 1
+        if l1 is not None:
+            l1.set(key, value, ttl=self.l1_ttl)
+        return value
+    
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        """Get several values; keys missing from L1 are fetched in one MGET"""
+        found = {}
+        missing = []
+        for key in keys:
+            l1 = self._l1(key)
+            value = l1.get(key) if l1 is not None else None
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = value
+        self.l1_hits += len(found)
+        
+        fetched = await self.l2.get_many(missing)
+        self.l2_hits += len(fetched)
+        self.misses += len(missing) - len(fetched)
+        for key, value in fetched.items():
+            l1 = self._l1(key)
+            if l1 is not None:
+                l1.set(key, value, ttl=self.l1_ttl)
+        found.update(fetched)
+        return found
+    
+    async def set(self, key: str, value: Any, ttl: int = None):
+        """Set value in both tiers"""
+        l1 = self._l1(key)
+        if l1 is not None:
+            l1.set(key, value, ttl=self._l1_ttl(ttl))
+        await self.l2.set(key, value, ttl)
+        await self._announce("key", key)
+    
+    async def set_many(self, items: Dict[str, Any], ttl: int = None):
+        """Set several values in both tiers (one pipeline, one invalidation)"""
+        if not items:
+            return
+        l1_ttl = self._l1_ttl(ttl)
+        for key, value in items.items():
+            l1 = self._l1(key)
+            if l1 is not None:
+                l1.set(key, value, ttl=l1_ttl)
+        await self.l2.set_many(items, ttl)
+        await self._announce("keys", "\n".join(items))
+    
+    async def delete(self, key: str):
+        """Delete key from both tiers"""
+        l1 = self._l1(key)
+        if l1 is not None:
+            l1.delete(key)
+        await self.l2.delete(key)
+        await self._announce("key", key)
+    
+    async def delete_many(self, keys: Sequence[str]) -> int:
+        """Delete several keys from both tiers (one DEL, one invalidation)"""
+        if not keys:
+            return 0
+        for key in keys:
+            l1 = self._l1(key)
+            if l1 is not None:
+                l1.delete(key)
+        deleted = await self.l2.delete_many(keys)
+        await self._announce("keys", "\n".join(keys))
+        return deleted
+    
+    async def delete_pattern(self, pattern: str) -> int:
+        """Delete all keys matching a glob pattern from both tiers"""
+        for l1 in self._l1_caches():
+            l1.delete_pattern(pattern)
+        deleted = await self.l2.delete_pattern(pattern)
+        await self._announce("pattern", pattern)
+        return deleted
+    
+    async def exists(self, key: str) -> bool:
+        """Check if key exists in either tier"""
+        l1 = self._l1(key)
+        if l1 is not None and l1.get(key) is not None:
+            return True
+        return await self.l2.exists(key)
+    
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int = None,
+        stale_ttl: int = None,
+        beta: float = None,
+    ) -> Any:
+        """Cached value for ``key``, calling ``compute`` when it needs (re)building
+        
+        Entries are stored as ``{"v": value, "t": expires_at, "d": seconds
+        to compute}`` and kept ``stale_ttl`` seconds past ``t``. On a miss
+        one caller per worker computes, and workers hold a Redis lease so
+        only one of them does; the rest wait for its result (up to
+        ``CACHE_LOCK_WAIT`` seconds, then compute anyway). A hit may be
+        refreshed early, with a probability that rises as ``t`` nears and
+        with the cost of the last computation (XFetch, scaled by ``beta``);
+        a hit past ``t`` is stale. Either way the cached value is returned
+        at once and the refresh runs in the background. Keys used with this
+        method should not be written with ``set``.
+        """
+        ttl = ttl or settings.REDIS_CACHE_TTL
+        stale_ttl = settings.CACHE_STALE_TTL if stale_ttl is None else stale_ttl
+        beta = settings.CACHE_EARLY_REFRESH_BETA if beta is None else beta
+        
+        entry = await self.get(key)
+        if entry is not None:
+            now = time.time()
+            # -log(U) is exponential with mean 1: early refreshes spread out before expiry
+            if now - entry["d"] * beta * math.log(random.random() or 1e-300) < entry["t"]:
+                self.compute_stats["fresh"] += 1
+                return entry["v"]
+            self.compute_stats["stale" if now >= entry["t"] else "early_refresh"] += 1
+            if key not in self._flights:
+                spawn_background(
+                    self._flights.do(key, lambda: self._compute(key, compute, ttl, stale_ttl, wait=False)),
+                    name="cache_refresh",
+                )
+            return entry["v"]
+        
+        return await self._flights.do(key, lambda: self._compute(key, compute, ttl, stale_ttl, wait=True))
+    
+    async def _compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+        wait: bool,
+    ) -> Any:
+        lease = f"lease:{key}"
+        token = await self.l2.acquire_lease(lease, settings.CACHE_LOCK_TTL)
+        if token is None:
+            if not wait:
+                # Another worker is already refreshing it
+                return None
+            entry = await self._wait_for(key)
+            if entry is not None:
+                self.compute_stats["waited"] += 1
+                return entry["v"]
+            # The holder is slow or gone; compute without the lease
+            self.compute_stats["lease_timeout"] += 1
+            logger.warning("Cache lease wait timed out", key=key)
+        try:
+            started = time.perf_counter()
+            value = await compute()
+            entry = {"v": value, "t": time.time() + ttl, "d": time.perf_counter() - started}
+            await self.set(key, entry, ttl=ttl + stale_ttl)
+            self.compute_stats["computed"] += 1
+            return value
+        finally:
+            if token is not None:
+                await self.l2.release_lease(lease, token)
+    
+    async def _wait_for(self, key: str) -> Optional[Dict[str, Any]]:
+        """Poll Redis for an entry another worker is computing"""
+        deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(_LEASE_POLL_SECONDS)
+            entry = await self.l2.get(key)
+            if entry is not None:
+                l1 = self._l1(key)
+                if l1 is not None:
+                    l1.set(key, entry, ttl=self.l1_ttl)
+                return entry
+        return None
+    
+    async def _announce(self, kind: str, target: str):
+        if self.l2.redis is None:
+            return
+        try:
+            await self.l2.redis.publish(INVALIDATION_CHANNEL, f"{self.worker_id}|{kind}|{target}")
+        except Exception as e:
+            logger.warning("Cache invalidation publish failed", target=target, error=str(e))
+    
+    def _invalidate_local(self, kind: str, target: str):
+        if kind == "pattern":
+            for l1 in self._l1_caches():
+                l1.delete_pattern(target)
+            return
+        for key in target.split("\n") if kind == "keys" else (target,):
+            l1 = self._l1(key)
+            if l1 is not None:
+                l1.delete(key)
+    
+    async def _listen(self):
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Cache invalidation listener error", error=str(e))
+                await asyncio.sleep(1.0)
+                continue
+            if message is None:
+                continue
+            origin, kind, target = message["data"].decode().split("|", 2)
+            if origin != self.worker_id:
+                self._invalidate_local(kind, target)
 
 
 # Global cache instance
-cache = RedisCache()
+cache = TieredCache(
+    RedisCache(),
+    budgets=settings.cache_l1_budgets,
+    default_budget=settings.CACHE_L1_DEFAULT_SIZE,
+    l1_ttl=settings.CACHE_L1_TTL,
+)
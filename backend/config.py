@@ -1,6 +1,6 @@
 """Application configuration"""
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
@@ -16,10 +16,67 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     DATABASE_POOL_SIZE: int = 10
     DATABASE_MAX_OVERFLOW: int = 20
+    EMBEDDING_QUANTIZE: bool = False  # Store gesture embeddings as int8 instead of float32
     
     # Redis (optional - disabled if Docker not available)
     REDIS_URL: str = ""
     REDIS_CACHE_TTL: int = 3600
+    REDIS_SERIALIZER: str = "json"  # json, orjson or msgpack
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT: float = 5.0
+    REDIS_SOCKET_TIMEOUT: float = 2.0
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+    
+    # In-process L1 in front of Redis (entries per key prefix; 0 bypasses L1)
+    CACHE_L1_TTL: float = 60.0
+    CACHE_L1_DEFAULT_SIZE: int = 2048
+    CACHE_L1_BUDGETS: str = "session:=10000,analytics:=1000,cls:=0"
+    
+    # Recomputation of cached values (cache.get_or_compute)
+    CACHE_STALE_TTL: int = 300  # seconds a stale value is served while it refreshes
+    CACHE_EARLY_REFRESH_BETA: float = 1.0  # >1 refreshes earlier, 0 disables
+    CACHE_LOCK_TTL: float = 30.0
+    CACHE_LOCK_WAIT: float = 5.0
+    ANALYTICS_CACHE_TTL: int = 300
+    
+    @property
+    def cache_l1_budgets(self) -> Dict[str, int]:
+        """Parse L1 budgets from comma-separated prefix=size pairs"""
+        budgets = {}
+        for pair in self.CACHE_L1_BUDGETS.split(","):
+            prefix, _, size = pair.strip().rpartition("=")
+            if prefix:
+                budgets[prefix] = int(size)
+        return budgets
+    
+    # Bulk gesture ingestion (/api/gestures/batch)
+    GESTURE_BATCH_MAX_ITEMS: int = 1000
+    
+    # Batched write-through inserts for live gestures (multi-row INSERT, callers wait for the commit).
+    # Off by default: the insert then overlaps TTS, which is faster for a single user
+    GESTURE_BATCHED_WRITE_ENABLED: bool = False
+    GESTURE_BATCHED_WRITE_INTERVAL_MS: float = 20.0
+    GESTURE_BATCHED_WRITE_MAX_ROWS: int = 200
+    GESTURE_BATCHED_WRITE_MAX_PENDING: int = 5000
+    
+    # Repeated-gesture suppression window, by User.gesture_sensitivity (0 disables)
+    GESTURE_DEDUPE_WINDOW_LOW_MS: float = 800.0
+    GESTURE_DEDUPE_WINDOW_MEDIUM_MS: float = 500.0
+    GESTURE_DEDUPE_WINDOW_HIGH_MS: float = 250.0
+    GESTURE_DEDUPE_QUANTUM: float = 0.05
+    GESTURE_DEDUPE_MAX_ENTRIES: int = 10000
+    
+    # Streaming gesture segmentation (/api/gestures/ws/stream)
+    STREAM_BUFFER_SECONDS: float = 4.0
+    STREAM_MAX_PENDING_GESTURES: int = 8
+    STREAM_DRAIN_SECONDS: float = 10.0  # Finish completed gestures after the client leaves
+    
+    # Per-connection in-flight window (/api/gestures/ws)
+    WS_MAX_IN_FLIGHT: int = 4
+    WS_BACKPRESSURE_POLICY: str = "reject"  # reject, drop or coalesce
+    
+    # Caregiver live subscriptions (/api/gestures/ws/subscribe)
+    FANOUT_SUBSCRIBER_QUEUE_SIZE: int = 64
     
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:8000"
@@ -40,11 +97,35 @@ class Settings(BaseSettings):
     CEREBRAS_API_KEY: str = ""
     CEREBRAS_API_URL: str = "https://api.cerebras.ai/v1"
     CEREBRAS_MODEL: str = "llama3.1-8b"
+    CEREBRAS_BATCH_WINDOW_MS: float = 5.0
+    CEREBRAS_BATCH_MAX_SIZE: int = 16
+    
+    # Local fast-path classifier (skips Cerebras when confident)
+    LOCAL_CLASSIFIER_ENABLED: bool = True
+    LOCAL_CLASSIFIER_THRESHOLD: float = 0.9
+    LOCAL_CLASSIFIER_LEARN_CONFIDENCE: float = 0.8
+    LOCAL_CLASSIFIER_MIN_SAMPLES: int = 5
+    LOCAL_CLASSIFIER_MAX_DISTANCE: float = 3.0
+    
+    # Classification cache
+    CLASSIFICATION_CACHE_ENABLED: bool = True
+    CLASSIFICATION_CACHE_QUANTUM: float = 0.05
+    CLASSIFICATION_CACHE_TTL: int = 7 * 86400
+    CLASSIFICATION_CACHE_LOCAL_TTL: int = 3600
+    CLASSIFICATION_CACHE_SIZE: int = 10000
     
     # ElevenLabs
     ELEVENLABS_API_KEY: str = ""
+    ELEVENLABS_API_URL: str = "https://api.elevenlabs.io/v1"
     ELEVENLABS_VOICE_ID: str = "21m00Tcm4TlvDq8ikWAM"
     ELEVENLABS_MODEL: str = "eleven_monolingual_v1"
+    AUDIO_CACHE_DIR: str = "backend/static/audio_cache"
+    AUDIO_CACHE_MANIFEST: str = "backend/audio_cache.sqlite3"
+    AUDIO_CACHE_MAX_MB: int = 500
+    AUDIO_CACHE_EVICTION: str = "lru"  # lru or lfu
+    TTS_PREWARM_ENABLED: bool = True  # Pre-generate intention phrases in the default voice
+    TTS_PREWARM_CONCURRENCY: int = 4
+    AUDIO_STREAM_REQUESTS_PER_MINUTE: int = 30  # Per user, /api/audio/stream
     
     # Raindrop
     RAINDROP_API_KEY: str = ""
@@ -1,8 +1,10 @@
 """Database connection and session management"""
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool
-from typing import Generator
+from typing import AsyncGenerator, Generator
 import structlog
 
 from backend.config import settings
@@ -33,6 +35,38 @@ else:
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def async_database_url(url: str) -> str:
+    """Same database, asyncio driver (asyncpg for PostgreSQL, aiosqlite for SQLite)"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    if backend == "postgresql":
+        return parsed.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+    return url
+
+
+# Async engine for the hot paths (gesture ingestion, history, auth lookup) so
+# queries never block the event loop that also serves every WebSocket
+if settings.DATABASE_URL.startswith("sqlite"):
+    async_engine = create_async_engine(
+        async_database_url(settings.DATABASE_URL),
+        echo=settings.DEBUG,
+    )
+else:
+    async_engine = create_async_engine(
+        async_database_url(settings.DATABASE_URL),
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        echo=settings.DEBUG,
+    )
+
+# Objects stay readable after commit so responses can be built without a
+# lazy refresh (which would need a round trip inside the event loop)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
 def get_db() -> Generator[Session, None, None]:
     """Dependency for getting database session"""
     db = SessionLocal()
@@ -42,13 +76,53 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency for getting an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
     """Initialize database tables"""
     logger.info("Initializing database tables")
     Base.metadata.create_all(bind=engine)
+    upgrade_schema()
     logger.info("Database tables created successfully")
 
 
+# Nullable columns added to tables after their first release, as (table, column).
+# Their types come from the models; create_all only builds missing tables.
+ADDED_COLUMNS = [
+    ("gestures", "embedding_bin"),
+]
+
+
+def upgrade_schema(bind: Engine = None):
+    """Add any ``ADDED_COLUMNS`` missing from existing tables (safe to re-run)"""
+    import backend.models  # registers every table on Base.metadata
+    
+    bind = bind or engine
+    inspector = inspect(bind)
+    tables = set(inspector.get_table_names())
+    for table_name, column_name in ADDED_COLUMNS:
+        if table_name not in tables:
+            continue
+        if column_name in {column["name"] for column in inspector.get_columns(table_name)}:
+            continue
+        column_type = Base.metadata.tables[table_name].c[column_name].type.compile(dialect=bind.dialect)
+        try:
+            with bind.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}"))
+        except Exception as e:
+            # Another worker may have added it first
+            if column_name in {column["name"] for column in inspect(bind).get_columns(table_name)}:
+                continue
+            raise RuntimeError(
+                f"Database is missing {table_name}.{column_name} and it could not be added: {e}"
+            ) from e
+        logger.info("Added database column", table=table_name, column=column_name)
+
+
 def drop_db():
     """Drop all database tables (use with caution!)"""
     logger.warning("Dropping all database tables")
@@ -1,9 +1,15 @@
 """Cerebras AI inference client"""
 import httpx
-from typing import Dict, List, Any
+import json
+from typing import Dict, Iterable, List, Any, Tuple
+import asyncio
 import structlog
 
 from backend.config import settings
+from backend.metrics import track_call
+from backend.integrations.classification_cache import classification_cache
+from backend.utils.micro_batcher import MicroBatcher
+from backend.utils.single_flight import SingleFlight
 
 logger = structlog.get_logger()
 
@@ -16,22 +22,30 @@ class CerebrasClient:
         self.api_url = settings.CEREBRAS_API_URL
         self.model = settings.CEREBRAS_MODEL
         self.client = httpx.AsyncClient(timeout=30.0)
+        self.batcher = MicroBatcher(
+            self._classify_batch,
+            max_batch_size=settings.CEREBRAS_BATCH_MAX_SIZE,
+            window_ms=settings.CEREBRAS_BATCH_WINDOW_MS,
+            name="cerebras_classify",
+        )
+        self.flights = SingleFlight("cerebras_classify")
     
     async def generate_embedding(self, text: str) -> List[float]:
         """Generate embedding for text input"""
         try:
-            response = await self.client.post(
-                f"{self.api_url}/embeddings",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": self.model,
-                    "input": text,
-                }
-            )
-            response.raise_for_status()
+            with track_call("cerebras", "embedding"):
+                response = await self.client.post(
+                    f"{self.api_url}/embeddings",
+                    headers={
+                        "Authorization": f"Bearer {self.api_key}",
+                        "Content-Type": "application/json",
+                    },
+                    json={
+                        "model": self.model,
+                        "input": text,
+                    }
+                )
+                response.raise_for_status()
             data = response.json()
             return data["data"][0]["embedding"]
         except Exception as e:
@@ -44,11 +58,60 @@ class CerebrasClient:
         features: List[float],
         context: str = ""
     ) -> Dict[str, Any]:
-        """Classify gesture intention using Cerebras"""
+        """Classify gesture intention using Cerebras
+        
+        Concurrent requests with the same cache key share one lookup and
+        one upstream classification.
+        """
+        cache_key = classification_cache.make_key(self.model, gesture_type, features, context)
         try:
-            # Create prompt for intention classification
-            prompt = self._build_classification_prompt(gesture_type, features, context)
-            
+            classification = await self.flights.do(
+                cache_key,
+                lambda: self._classify_cached(cache_key, gesture_type, features, context)
+            )
+        except Exception as e:
+            logger.error("Intention classification failed", error=str(e))
+            return {
+                "intention": "unknown",
+                "confidence": 0.0,
+                "text": "Unable to process gesture"
+            }
+        return dict(classification)
+    
+    async def prefetch(self, requests: Iterable[Tuple[str, List[float]]], context: str = ""):
+        """Warm the local classification cache for many (gesture_type, features) at once"""
+        await classification_cache.prefetch([
+            classification_cache.make_key(self.model, gesture_type, features, context)
+            for gesture_type, features in requests
+        ])
+    
+    async def _classify_cached(
+        self,
+        cache_key: str,
+        gesture_type: str,
+        features: List[float],
+        context: str
+    ) -> Dict[str, Any]:
+        cached = await classification_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Classification cache hit", gesture_type=gesture_type)
+            return cached
+        
+        classification = await self.batcher.submit((gesture_type, features, context))
+        await classification_cache.set(cache_key, classification)
+        return classification
+    
+    async def _request_classification(
+        self,
+        gesture_type: str,
+        features: List[float],
+        context: str
+    ) -> Dict[str, Any]:
+        """Send one classification request to the chat completions API"""
+        # Create prompt for intention classification
+        prompt = self._build_classification_prompt(gesture_type, features, context)
+        
+        with track_call("cerebras", "classify"):
             response = await self.client.post(
                 f"{self.api_url}/chat/completions",
                 headers={
@@ -72,24 +135,99 @@ class CerebrasClient:
                 }
             )
             response.raise_for_status()
-            
-            result = response.json()
-            content = result["choices"][0]["message"]["content"]
-            
-            # Parse JSON response
-            import json
-            classification = json.loads(content)
-            
-            logger.info("Intention classified", intention=classification.get("intention"))
-            return classification
-            
-        except Exception as e:
-            logger.error("Intention classification failed", error=str(e))
-            return {
-                "intention": "unknown",
-                "confidence": 0.0,
-                "text": "Unable to process gesture"
-            }
+        
+        result = response.json()
+        content = result["choices"][0]["message"]["content"]
+        
+        # Parse JSON response
+        classification = json.loads(content)
+        
+        logger.info("Intention classified", intention=classification.get("intention"))
+        return classification
+    
+    async def _classify_batch(
+        self,
+        items: List[Tuple[str, List[float], str]]
+    ) -> List[Dict[str, Any]]:
+        """Classify a micro-batch of gestures with one completion"""
+        if len(items) == 1:
+            return [await self._request_classification(*items[0])]
+        
+        prompt = self._build_batch_prompt(items)
+        with track_call("cerebras", "classify_batch"):
+            response = await self.client.post(
+                f"{self.api_url}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+                json={
+                    "model": self.model,
+                    "messages": [
+                        {
+                            "role": "system",
+                            "content": "You are an AI that classifies gesture intentions for assistive communication. Respond with JSON only."
+                        },
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    "temperature": 0.3,
+                    "max_tokens": 150 * len(items),
+                }
+            )
+            response.raise_for_status()
+        
+        result = response.json()
+        content = result["choices"][0]["message"]["content"]
+        
+        try:
+            classifications = json.loads(content)
+            if isinstance(classifications, dict):
+                classifications = classifications.get("results", [])
+            if len(classifications) != len(items) or not all(isinstance(c, dict) for c in classifications):
+                raise ValueError("batch response does not match request")
+        except ValueError as e:
+            # Model did not follow the batch format; classify individually instead
+            logger.warning("Batch classification unparseable, retrying individually", size=len(items), error=str(e))
+            return await asyncio.gather(*(self._request_classification(*item) for item in items))
+        
+        logger.info("Intentions classified", batch_size=len(items))
+        return classifications
+    
+    def _build_batch_prompt(self, items: List[Tuple[str, List[float], str]]) -> str:
+        """Build prompt classifying several gestures at once"""
+        gestures = "\n".join(
+            f"{i}. Gesture Type: {gesture_type} | Features: {self._format_features(features)} | Context: {context or 'None'}"
+            for i, (gesture_type, features, context) in enumerate(items, start=1)
+        )
+        return f"""Classify each of these {len(items)} gestures into a communication intention:
+
+{gestures}
+
+Common intentions:
+- "yes" / "no" / "maybe"
+- "help" / "stop" / "continue"
+- "hello" / "goodbye"
+- "thank_you" / "please"
+- "pain" / "discomfort" / "comfortable"
+- "hungry" / "thirsty"
+- "tired" / "alert"
+
+Respond with a JSON array containing exactly {len(items)} objects, in the same order:
+[
+  {{
+    "intention": "the_intention",
+    "confidence": 0.0-1.0,
+    "text": "Natural language text to speak"
+  }}
+]"""
+    
+    @staticmethod
+    def _format_features(features: List[float]) -> str:
+        """Render features compactly (micro-gesture descriptors are long)"""
+        return "[" + ", ".join(f"{float(f):.3g}" for f in features) + "]"
     
     def _build_classification_prompt(
         self,
@@ -101,7 +239,7 @@ class CerebrasClient:
         return f"""Classify this gesture into a communication intention:
 
 Gesture Type: {gesture_type}
-Features: {features}
+Features: {self._format_features(features)}
 Context: {context or "None"}
 
 Common intentions:
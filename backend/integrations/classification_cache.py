@@ -0,0 +1,116 @@
+"""Two-level cache for Cerebras gesture classifications"""
+from typing import Dict, Any, Optional, Sequence
+import hashlib
+import numpy as np
+import structlog
+
+from backend.config import settings
+from backend.cache import cache, LocalLRUCache
+
+logger = structlog.get_logger()
+
+ACTIVE_MODEL_KEY = "cls:active_model"
+
+
+def quantize_features(features: Sequence[float], quantum: float) -> bytes:
+    """Snap features onto a grid so near-identical vectors share a key"""
+    if not len(features):
+        return b""
+    grid = np.round(np.asarray(features, dtype=np.float64) / quantum)
+    return grid.astype(np.int64).tobytes()
+
+
+class ClassificationCache:
+    """In-process LRU in front of the shared Redis cache.
+
+    Keys are namespaced by model (``cls:<model>:<gesture_type>:<digest>``)
+    so a ``CEREBRAS_MODEL`` change never serves answers from the old model,
+    and :meth:`invalidate` can drop one model's entries from both tiers.
+    """
+
+    def __init__(self):
+        self.enabled = settings.CLASSIFICATION_CACHE_ENABLED
+        self.quantum = settings.CLASSIFICATION_CACHE_QUANTUM
+        self.ttl = settings.CLASSIFICATION_CACHE_TTL
+        self.local = LocalLRUCache(
+            maxsize=settings.CLASSIFICATION_CACHE_SIZE,
+            ttl=settings.CLASSIFICATION_CACHE_LOCAL_TTL,
+        )
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def make_key(self, model: str, gesture_type: str, features: Sequence[float], context: str = "") -> str:
+        """Build the cache key for a classification request"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(quantize_features(features, self.quantum))
+        digest.update(b"\0")
+        digest.update(context.encode())
+        return f"cls:{model}:{gesture_type}:{digest.hexdigest()}"
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a classification, promoting Redis hits into the local tier"""
+        if not self.enabled:
+            return None
+
+        value = self.local.get(key)
+        if value is not None:
+            self.local_hits += 1
+            return dict(value)
+
+        value = await cache.get(key)
+        if value is not None:
+            self.redis_hits += 1
+            self.local.set(key, value)
+            return value
+
+        self.misses += 1
+        return None
+
+    async def prefetch(self, keys: Sequence[str]):
+        """Load entries missing locally with one Redis round trip
+        
+        Found entries go into the local tier, so the ``get`` calls that
+        follow are answered (and counted) there.
+        """
+        if not self.enabled:
+            return
+        missing = [key for key in dict.fromkeys(keys) if self.local.get(key) is None]
+        for key, value in (await cache.get_many(missing)).items():
+            self.local.set(key, value)
+
+    async def set(self, key: str, classification: Dict[str, Any]):
+        """Store a classification in both tiers"""
+        if not self.enabled:
+            return
+        self.local.set(key, classification)
+        await cache.set(key, classification, ttl=self.ttl)
+
+    async def invalidate(self, model: str) -> int:
+        """Drop every cached classification produced by a model"""
+        prefix = f"cls:{model}:"
+        self.local.delete_prefix(prefix)
+        deleted = await cache.delete_pattern(f"{prefix}*")
+        logger.info("Classification cache invalidated", model=model, deleted=deleted)
+        return deleted
+
+    async def sync_model(self, model: str):
+        """Flush entries from a previously configured model"""
+        previous = await cache.get(ACTIVE_MODEL_KEY)
+        if previous and previous != model:
+            await self.invalidate(previous)
+        await cache.set(ACTIVE_MODEL_KEY, model, ttl=365 * 86400)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters"""
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.local_hits + self.redis_hits) / lookups if lookups else 0.0,
+            "local_size": len(self.local),
+        }
+
+
+classification_cache = ClassificationCache()
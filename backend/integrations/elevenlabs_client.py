@@ -1,25 +1,89 @@
 """ElevenLabs Text-to-Speech client"""
-from elevenlabs.client import ElevenLabs
-from elevenlabs import save
+from typing import AsyncIterator, Dict, List, Optional
+from urllib.parse import urlencode
+import asyncio
 import os
 import hashlib
+import hmac
+import httpx
 import structlog
 
 from backend.config import settings
-from backend.cache import cache
+from backend.metrics import AUDIO_CACHE_LOOKUPS, track_call
+from backend.utils.audio_store import audio_store
+from backend.utils.single_flight import SingleFlight
+from backend.utils.stage_scheduler import spawn_background
 
 logger = structlog.get_logger()
 
 
+class SpeechStream:
+    """One upstream generation, replayed to any number of readers as it arrives"""
+    
+    def __init__(self, key: str):
+        self.key = key
+        self.chunks: List[bytes] = []
+        self.done = False
+        self.error: Optional[Exception] = None
+        self.filename: Optional[str] = None
+        self._changed = asyncio.Event()
+    
+    def _notify(self):
+        # Readers wait on the current event; swap in a fresh one for the next change
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+    
+    def append(self, chunk: bytes):
+        self.chunks.append(chunk)
+        self._notify()
+    
+    def finish(self, filename: Optional[str] = None, error: Optional[Exception] = None):
+        self.filename = filename
+        self.error = error
+        self.done = True
+        self._notify()
+    
+    async def read(self) -> AsyncIterator[bytes]:
+        """Every chunk from the start, then new ones until generation ends"""
+        index = 0
+        while True:
+            while index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._changed.wait()
+    
+    async def wait(self) -> str:
+        """Filename of the finished audio"""
+        while not self.done:
+            await self._changed.wait()
+        if self.error is not None:
+            raise self.error
+        return self.filename
+
+
 class ElevenLabsClient:
-    """ElevenLabs TTS client"""
+    """ElevenLabs TTS client
+    
+    Speech is requested from the streaming endpoint with a non-blocking
+    HTTP client. Each generation is written to the audio store as chunks
+    arrive and can be read by any number of callers at the same time, so
+    ``stream_speech`` starts yielding audio before generation finishes.
+    Audio store calls (SQLite manifest, file hashing) run in worker threads.
+    """
     
     def __init__(self):
-        self.client = ElevenLabs(api_key=settings.ELEVENLABS_API_KEY)
+        self.api_key = settings.ELEVENLABS_API_KEY
+        self.api_url = settings.ELEVENLABS_API_URL
         self.default_voice_id = settings.ELEVENLABS_VOICE_ID
         self.model = settings.ELEVENLABS_MODEL
-        self.audio_cache_dir = "backend/static/audio_cache"
-        os.makedirs(self.audio_cache_dir, exist_ok=True)
+        self.client = httpx.AsyncClient(timeout=httpx.Timeout(30.0, connect=5.0))
+        self.store = audio_store
+        self._streams: Dict[str, SpeechStream] = {}
+        self.flights = SingleFlight("elevenlabs_tts")
     
     async def text_to_speech(
         self,
@@ -27,43 +91,133 @@ class ElevenLabsClient:
         user_id: int,
         voice_id: str = None
     ) -> str:
-        """Convert text to speech and return audio URL"""
-        voice_id = voice_id or self.default_voice_id
+        """Convert text to speech and return audio URL
         
-        # Check cache first
+        Concurrent requests for the same text and voice share one store
+        lookup and one generation (and its result or error).
+        """
+        voice_id = voice_id or self.default_voice_id
         cache_key = self._get_cache_key(text, voice_id)
-        cached_url = await cache.get(f"audio:{cache_key}")
+        try:
+            filename = await self.flights.do(cache_key, lambda: self._speak(text, voice_id, cache_key))
+            return self._url(filename)
+        except Exception as e:
+            logger.error("TTS generation failed", error=str(e))
+            return ""
+    
+    async def _speak(self, text: str, voice_id: str, cache_key: str) -> str:
+        # Check the audio store first
+        filename = await asyncio.to_thread(self.store.lookup, cache_key)
         
-        if cached_url:
+        if filename:
+            AUDIO_CACHE_LOOKUPS.inc(result="hit")
             logger.debug("Audio cache hit", text=text[:30])
-            return cached_url
+            return filename
+        AUDIO_CACHE_LOOKUPS.inc(result="miss")
         
+        # Join a generation a stream reader may already have started
+        return await self._generation(text, voice_id, cache_key).wait()
+    
+    async def stream_speech(self, text: str, voice_id: str = None) -> AsyncIterator[bytes]:
+        """Yield audio chunks as they are generated (or the stored file)"""
+        voice_id = voice_id or self.default_voice_id
+        cache_key = self._get_cache_key(text, voice_id)
+        
+        stream = self._streams.get(cache_key)
+        if stream is None:
+            filename = await asyncio.to_thread(self.store.lookup, cache_key)
+            if filename:
+                AUDIO_CACHE_LOOKUPS.inc(result="hit")
+                path = os.path.join(self.store.directory, filename)
+                yield await asyncio.to_thread(self._read_file, path)
+                return
+            AUDIO_CACHE_LOOKUPS.inc(result="miss")
+            stream = self._generation(text, voice_id, cache_key)
+        
+        async for chunk in stream.read():
+            yield chunk
+    
+    def stream_url(self, text: str, voice_id: str = None) -> str:
+        """URL of the chunked audio endpoint for a phrase, signed so only
+        text the server chose to speak can be generated through it"""
+        params = {"text": text}
+        if voice_id:
+            params["voice_id"] = voice_id
+        params["sig"] = self.stream_signature(text, voice_id)
+        return f"/api/audio/stream?{urlencode(params)}"
+    
+    def stream_signature(self, text: str, voice_id: str = None) -> str:
+        message = f"{text}:{voice_id or self.default_voice_id}".encode()
+        return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+    
+    async def has_audio(self, text: str, voice_id: str = None) -> bool:
+        """Whether audio for this phrase and voice is already stored"""
+        cache_key = self._get_cache_key(text, voice_id or self.default_voice_id)
+        return await asyncio.to_thread(self.store.contains, cache_key)
+    
+    @staticmethod
+    def _url(filename: str) -> str:
+        return f"/static/audio_cache/{filename}"
+    
+    @staticmethod
+    def _read_file(path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+    
+    def _generation(self, text: str, voice_id: str, cache_key: str) -> SpeechStream:
+        """Join the generation in progress for this key, or start one"""
+        stream = self._streams.get(cache_key)
+        if stream is None:
+            stream = self._streams[cache_key] = SpeechStream(cache_key)
+            spawn_background(self._produce(stream, text, voice_id), name="tts_generate")
+        return stream
+    
+    async def _produce(self, stream: SpeechStream, text: str, voice_id: str):
         try:
-            # Generate audio
-            audio = self.client.generate(
-                text=text,
-                voice=voice_id,
-                model=self.model
-            )
-            
-            # Save to file
-            filename = f"{cache_key}.mp3"
-            filepath = os.path.join(self.audio_cache_dir, filename)
-            save(audio, filepath)
-            
-            # Generate URL
-            audio_url = f"/static/audio_cache/{filename}"
-            
-            # Cache URL
-            await cache.set(f"audio:{cache_key}", audio_url, ttl=86400)  # 24 hours
+            with track_call("elevenlabs", "tts"):
+                async with self.client.stream(
+                    "POST",
+                    f"{self.api_url}/text-to-speech/{voice_id}/stream",
+                    headers={
+                        "xi-api-key": self.api_key,
+                        "Accept": "audio/mpeg",
+                    },
+                    json={
+                        "text": text,
+                        "model_id": self.model,
+                    }
+                ) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes():
+                        stream.append(chunk)
             
+            # Readers are served from memory; the file is written once, off the loop
+            filename = await asyncio.to_thread(self._save, stream.key, stream.chunks)
             logger.info("Audio generated", text=text[:30], voice_id=voice_id)
-            return audio_url
-            
+            stream.finish(filename)
         except Exception as e:
-            logger.error("TTS generation failed", error=str(e))
-            return ""
-
+            stream.finish(error=e)
+        finally:
+            if not stream.done:
+                stream.finish(error=RuntimeError("TTS generation cancelled"))
+            self._streams.pop(stream.key, None)
+    
+    def _save(self, key: str, chunks: List[bytes]) -> str:
+        """Write finished audio and index it (blocking; run in a thread)"""
+        path = self.store.path_for(key)
+        # Write to a temporary name so a partial file is never served
+        partial = f"{path}.part"
+        try:
+            with open(partial, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            os.replace(partial, path)
+        except Exception:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        # Index it (may evict older audio to stay under the size cap)
+        return self.store.add(key)
     
     def _get_cache_key(self, text: str, voice_id: str) -> str:
         """Generate cache key for audio"""
@@ -73,8 +227,13 @@ class ElevenLabsClient:
     async def get_available_voices(self):
         """Get list of available voices"""
         try:
-            voices = self.client.voices.get_all()
-            return [{"id": v.voice_id, "name": v.name} for v in voices.voices]
+            with track_call("elevenlabs", "voices"):
+                response = await self.client.get(
+                    f"{self.api_url}/voices",
+                    headers={"xi-api-key": self.api_key}
+                )
+                response.raise_for_status()
+            return [{"id": v["voice_id"], "name": v["name"]} for v in response.json()["voices"]]
         except Exception as e:
             logger.error("Failed to get voices", error=str(e))
             return []
@@ -4,6 +4,7 @@ from typing import Dict, Any
 import structlog
 
 from backend.config import settings
+from backend.metrics import track_call
 
 logger = structlog.get_logger()
 
@@ -24,18 +25,19 @@ class RaindropClient:
     ) -> Dict[str, Any]:
         """Execute a Raindrop SmartFlow"""
         try:
-            response = await self.client.post(
-                f"{self.api_url}/smartflows/{self.smartflow_id}/execute",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "flow_name": flow_name,
-                    "input": input_data,
-                }
-            )
-            response.raise_for_status()
+            with track_call("raindrop", "smartflow"):
+                response = await self.client.post(
+                    f"{self.api_url}/smartflows/{self.smartflow_id}/execute",
+                    headers={
+                        "Authorization": f"Bearer {self.api_key}",
+                        "Content-Type": "application/json",
+                    },
+                    json={
+                        "flow_name": flow_name,
+                        "input": input_data,
+                    }
+                )
+                response.raise_for_status()
             result = response.json()
             logger.info("SmartFlow executed", flow_name=flow_name)
             return result
@@ -63,11 +65,12 @@ class RaindropClient:
     async def get_secret(self, secret_name: str) -> str:
         """Retrieve secret from Raindrop"""
         try:
-            response = await self.client.get(
-                f"{self.api_url}/secrets/{secret_name}",
-                headers={"Authorization": f"Bearer {self.api_key}"}
-            )
-            response.raise_for_status()
+            with track_call("raindrop", "get_secret"):
+                response = await self.client.get(
+                    f"{self.api_url}/secrets/{secret_name}",
+                    headers={"Authorization": f"Bearer {self.api_key}"}
+                )
+                response.raise_for_status()
             return response.json().get("value", "")
         except Exception as e:
             logger.error("Secret retrieval failed", secret=secret_name, error=str(e))
@@ -76,15 +79,16 @@ class RaindropClient:
     async def store_secret(self, secret_name: str, secret_value: str) -> bool:
         """Store secret in Raindrop"""
         try:
-            response = await self.client.post(
-                f"{self.api_url}/secrets",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={"name": secret_name, "value": secret_value}
-            )
-            response.raise_for_status()
+            with track_call("raindrop", "store_secret"):
+                response = await self.client.post(
+                    f"{self.api_url}/secrets",
+                    headers={
+                        "Authorization": f"Bearer {self.api_key}",
+                        "Content-Type": "application/json",
+                    },
+                    json={"name": secret_name, "value": secret_value}
+                )
+                response.raise_for_status()
             logger.info("Secret stored", secret=secret_name)
             return True
         except Exception as e:
@@ -3,7 +3,9 @@ import httpx
 from typing import Dict, List, Any
 import structlog
 
+from backend.cache import cache
 from backend.config import settings
+from backend.metrics import track_call
 
 logger = structlog.get_logger()
 
@@ -17,33 +19,54 @@ class SearchableClient:
         self.index_name = settings.SEARCHABLE_INDEX_NAME
         self.client = httpx.AsyncClient(timeout=30.0)
     
+    @staticmethod
+    def build_document(gesture) -> Dict[str, Any]:
+        """Build the search document for a gesture"""
+        return {
+            "id": str(gesture.id),
+            "user_id": gesture.user_id,
+            "gesture_type": gesture.gesture_type,
+            "intention": gesture.intention,
+            "text": gesture.generated_text,
+            "confidence": gesture.confidence_score,
+            "timestamp": gesture.created_at.isoformat(),
+        }
+    
     async def index_gesture(self, gesture) -> bool:
         """Index gesture for search"""
         try:
-            document = {
-                "id": str(gesture.id),
-                "user_id": gesture.user_id,
-                "gesture_type": gesture.gesture_type,
-                "intention": gesture.intention,
-                "text": gesture.generated_text,
-                "confidence": gesture.confidence_score,
-                "timestamp": gesture.created_at.isoformat(),
-            }
-            
-            response = await self.client.post(
-                f"{self.api_url}/indexes/{self.index_name}/documents",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
-                json=document
-            )
-            response.raise_for_status()
-            logger.debug("Gesture indexed", gesture_id=gesture.id)
+            document = self.build_document(gesture)
+        except Exception as e:
+            logger.error("Indexing failed", error=str(e))
+            return False
+        return await self.index_document(document)
+    
+    async def index_document(self, document: Dict[str, Any]) -> bool:
+        """Index a prebuilt gesture document"""
+        try:
+            with track_call("searchable", "index"):
+                response = await self.client.post(
+                    f"{self.api_url}/indexes/{self.index_name}/documents",
+                    headers={
+                        "Authorization": f"Bearer {self.api_key}",
+                        "Content-Type": "application/json",
+                    },
+                    json=document
+                )
+                response.raise_for_status()
+            logger.debug("Gesture indexed", gesture_id=document["id"])
             return True
         except Exception as e:
             logger.error("Indexing failed", error=str(e))
             return False
+    
+    async def index_documents(self, documents: List[Dict[str, Any]]) -> int:
+        """Index documents one after another, returning how many succeeded"""
+        indexed = 0
+        for document in documents:
+            if await self.index_document(document):
+                indexed += 1
+        return indexed
 
     
     async def search_gestures(
@@ -58,19 +81,20 @@ class SearchableClient:
             if user_id:
                 filters["user_id"] = user_id
             
-            response = await self.client.post(
-                f"{self.api_url}/indexes/{self.index_name}/search",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "query": query,
-                    "filters": filters,
-                    "limit": limit,
-                }
-            )
-            response.raise_for_status()
+            with track_call("searchable", "search"):
+                response = await self.client.post(
+                    f"{self.api_url}/indexes/{self.index_name}/search",
+                    headers={
+                        "Authorization": f"Bearer {self.api_key}",
+                        "Content-Type": "application/json",
+                    },
+                    json={
+                        "query": query,
+                        "filters": filters,
+                        "limit": limit,
+                    }
+                )
+                response.raise_for_status()
             results = response.json()
             return results.get("hits", [])
         except Exception as e:
@@ -78,18 +102,26 @@ class SearchableClient:
             return []
     
     async def get_analytics(self, user_id: int) -> Dict[str, Any]:
-        """Get gesture analytics for user"""
+        """Get gesture analytics for user (cached, refreshed before it expires)"""
         try:
+            return await cache.get_or_compute(
+                f"analytics:searchable:{user_id}",
+                lambda: self._fetch_analytics(user_id),
+                ttl=settings.ANALYTICS_CACHE_TTL,
+            )
+        except Exception as e:
+            logger.error("Analytics retrieval failed", error=str(e))
+            return {}
+    
+    async def _fetch_analytics(self, user_id: int) -> Dict[str, Any]:
+        with track_call("searchable", "analytics"):
             response = await self.client.get(
                 f"{self.api_url}/indexes/{self.index_name}/analytics",
                 headers={"Authorization": f"Bearer {self.api_key}"},
                 params={"user_id": user_id}
             )
             response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            logger.error("Analytics retrieval failed", error=str(e))
-            return {}
+        return response.json()
 
 
 searchable_client = SearchableClient()
@@ -4,6 +4,7 @@ from typing import Dict, Any
 import structlog
 
 from backend.config import settings
+from backend.metrics import track_call
 
 logger = structlog.get_logger()
 
@@ -17,10 +18,11 @@ class StripeClient:
     async def create_customer(email: str, user_id: int) -> str:
         """Create Stripe customer"""
         try:
-            customer = stripe.Customer.create(
-                email=email,
-                metadata={"user_id": user_id}
-            )
+            with track_call("stripe", "create_customer"):
+                customer = stripe.Customer.create(
+                    email=email,
+                    metadata={"user_id": user_id}
+                )
             logger.info("Stripe customer created", customer_id=customer.id)
             return customer.id
         except Exception as e:
@@ -36,14 +38,15 @@ class StripeClient:
     ) -> Dict[str, Any]:
         """Create Stripe checkout session"""
         try:
-            session = stripe.checkout.Session.create(
-                customer=customer_id,
-                payment_method_types=["card"],
-                line_items=[{"price": price_id, "quantity": 1}],
-                mode="subscription",
-                success_url=success_url,
-                cancel_url=cancel_url,
-            )
+            with track_call("stripe", "create_checkout_session"):
+                session = stripe.checkout.Session.create(
+                    customer=customer_id,
+                    payment_method_types=["card"],
+                    line_items=[{"price": price_id, "quantity": 1}],
+                    mode="subscription",
+                    success_url=success_url,
+                    cancel_url=cancel_url,
+                )
             logger.info("Checkout session created", session_id=session.id)
             return {"session_id": session.id, "url": session.url}
         except Exception as e:
@@ -55,10 +58,11 @@ class StripeClient:
     async def cancel_subscription(subscription_id: str) -> bool:
         """Cancel Stripe subscription"""
         try:
-            stripe.Subscription.modify(
-                subscription_id,
-                cancel_at_period_end=True
-            )
+            with track_call("stripe", "cancel_subscription"):
+                stripe.Subscription.modify(
+                    subscription_id,
+                    cancel_at_period_end=True
+                )
             logger.info("Subscription canceled", subscription_id=subscription_id)
             return True
         except Exception as e:
@@ -5,6 +5,7 @@ from typing import Optional, Dict
 import structlog
 
 from backend.config import settings
+from backend.metrics import track_call
 
 logger = structlog.get_logger()
 
@@ -46,9 +47,10 @@ class WorkOSAuth:
     async def authenticate_with_code(code: str) -> Dict:
         """Exchange authorization code for user profile"""
         try:
-            profile = workos_client.user_management.authenticate_with_code(
-                code=code,
-            )
+            with track_call("workos", "authenticate"):
+                profile = workos_client.user_management.authenticate_with_code(
+                    code=code,
+                )
             
             user_data = {
                 "workos_id": profile.user.id,
@@ -69,7 +71,8 @@ class WorkOSAuth:
     async def get_user_profile(access_token: str) -> Dict:
         """Get user profile from access token"""
         try:
-            user = workos_client.user_management.get_user(access_token)
+            with track_call("workos", "get_user"):
+                user = workos_client.user_management.get_user(access_token)
             return {
                 "workos_id": user.id,
                 "email": user.email,
@@ -83,9 +86,10 @@ class WorkOSAuth:
     async def refresh_token(refresh_token: str) -> Dict:
         """Refresh access token"""
         try:
-            result = workos_client.user_management.authenticate_with_refresh_token(
-                refresh_token=refresh_token,
-            )
+            with track_call("workos", "refresh_token"):
+                result = workos_client.user_management.authenticate_with_refresh_token(
+                    refresh_token=refresh_token,
+                )
             return {
                 "access_token": result.access_token,
                 "refresh_token": result.refresh_token,
@@ -8,12 +8,22 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import structlog
 
 from backend.config import settings
+from backend.cache import cache
+from backend.database import SessionLocal, async_engine, upgrade_schema
 from backend.middleware.logging import LoggingMiddleware
 from backend.middleware.rate_limit import RateLimitMiddleware
-from backend.routes import auth, gestures, users, payments, search, admin, health, analytics
+from backend.routes import auth, gestures, users, payments, search, admin, health, analytics, metrics, audio
+from backend.integrations.classification_cache import classification_cache
+from backend.services.gesture_hub import gesture_hub
+from backend.services.gesture_writer import gesture_writer
+from backend.services.tts_warmer import tts_warmer
+from backend.utils.audio_store import audio_store
+from backend.utils.local_classifier import local_classifier
+from backend.utils.stage_scheduler import drain_background
 
 logger = structlog.get_logger()
 
@@ -22,8 +32,29 @@ logger = structlog.get_logger()
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     logger.info("Starting Silent Signal API", env=settings.APP_ENV)
+    # Existing databases get columns added since they were created
+    await asyncio.to_thread(upgrade_schema)
+    await cache.connect()
+    await classification_cache.sync_model(settings.CEREBRAS_MODEL)
+    await gesture_hub.start()
+    await asyncio.to_thread(audio_store.rebuild)
+    tts_warmer.schedule()
+    if settings.LOCAL_CLASSIFIER_ENABLED:
+        db = SessionLocal()
+        try:
+            local_classifier.fit_from_history(db)
+        except Exception as e:
+            logger.warning("Local classifier seeding failed", error=str(e))
+        finally:
+            db.close()
     yield
     logger.info("Shutting down Silent Signal API")
+    await tts_warmer.stop()
+    await gesture_writer.drain()
+    await drain_background()
+    await gesture_hub.stop()
+    await async_engine.dispose()
+    await cache.disconnect()
 
 
 app = FastAPI(
@@ -60,6 +91,8 @@ app.include_router(payments.router, prefix="/api/payments", tags=["Payments"])
 app.include_router(search.router, prefix="/api/search", tags=["Search"])
 app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 app.include_router(analytics.router, prefix="/api", tags=["Analytics"])
+app.include_router(metrics.router, prefix="/api", tags=["Monitoring"])
+app.include_router(audio.router, prefix="/api/audio", tags=["Audio"])
 
 # Page Routes
 @app.get("/")
@@ -114,6 +147,7 @@ async def user_settings(request: Request):
     return templates.TemplateResponse("settings.html", {"request": request})
 
 # Static files (mount last to avoid catching other routes)
+app.mount("/static/audio_cache", StaticFiles(directory=settings.AUDIO_CACHE_DIR), name="audio_cache")
 app.mount("/static", StaticFiles(directory="frontend/static"), name="static")
 
 
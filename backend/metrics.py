@@ -0,0 +1,286 @@
+"""In-process metrics with Prometheus text exposition"""
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import math
+import time
+import threading
+import structlog
+
+logger = structlog.get_logger()
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set"""
+
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class CallbackMetric(_Metric):
+    """Metric whose samples are read from a callback at scrape time
+
+    The callback returns ``{label_values_tuple: value}``; use it to expose
+    counters that components already keep (cache stats, pool usage).
+    """
+
+    def __init__(self, name, documentation, labelnames, callback, type_name="gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self.type_name = type_name
+
+    def render(self) -> List[str]:
+        try:
+            samples = self.callback()
+        except Exception as e:
+            logger.warning("Metric callback failed", metric=self.name, error=str(e))
+            return []
+        lines = self.header()
+        for key, value in sorted(samples.items()):
+            key = key if isinstance(key, tuple) else (key,)
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class _HdrBuckets:
+    """Log-linear bucket counts: ``per_octave`` buckets per power of two
+
+    Recording is O(1) (index computed from log2), and each bucket's
+    relative width is bounded by ``2 ** (1 / per_octave)``.
+    """
+
+    __slots__ = ("counts", "total", "sum", "max")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+
+class Histogram(_Metric):
+    """HDR-style latency histogram (values in seconds)"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        lowest: float = 50e-6,
+        highest: float = 120.0,
+        per_octave: int = 4,
+        exposed_per_octave: int = 2,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.lowest = lowest
+        self.per_octave = per_octave
+        self.size = int(math.ceil(math.log2(highest / lowest) * per_octave)) + 1
+        self.bounds = [lowest * 2 ** (i / per_octave) for i in range(self.size)]
+        # Exposed `le` boundaries are a subset of internal ones so they are exact
+        self._exposed = list(range(0, self.size, max(1, per_octave // exposed_per_octave)))
+        self._series: Dict[LabelValues, _HdrBuckets] = {}
+
+    def _index(self, value: float) -> int:
+        if value <= self.lowest:
+            return 0
+        return min(self.size - 1, int(math.ceil(math.log2(value / self.lowest) * self.per_octave - 1e-9)))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HdrBuckets(self.size)
+            series.counts[self._index(value)] += 1
+            series.total += 1
+            series.sum += value
+            if value > series.max:
+                series.max = value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a ``with`` block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def percentile(self, p: float, **labels) -> Optional[float]:
+        """Upper bound of the bucket holding the p-th percentile (0-100)"""
+        series = self._series.get(self._key(labels))
+        if series is None or not series.total:
+            return None
+        target = series.total * p / 100.0
+        running = 0
+        for index, count in enumerate(series.counts):
+            running += count
+            if running >= target:
+                return min(self.bounds[index], series.max)
+        return series.max
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for key, series in sorted(self._series.items()):
+            running = 0
+            exposed = iter(self._exposed)
+            next_exposed = next(exposed, None)
+            for index, count in enumerate(series.counts):
+                running += count
+                if index == next_exposed:
+                    le = f'le="{self.bounds[index]:.6g}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {running}")
+                    next_exposed = next(exposed, None)
+            inf = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf} {series.total}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series.sum)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series.total}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together"""
+
+    def __init__(self, prefix: str = "silentsignal"):
+        self.prefix = prefix
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def _name(self, name: str) -> str:
+        return f"{self.prefix}_{name}" if self.prefix else name
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(self._name(name), documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(self._name(name), documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), **kwargs) -> Histogram:
+        return self._register(Histogram(self._name(name), documentation, labelnames, **kwargs))
+
+    def callback(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str],
+        callback: Callable[[], Dict],
+        type_name: str = "gauge",
+    ) -> CallbackMetric:
+        return self._register(CallbackMetric(self._name(name), documentation, labelnames, callback, type_name))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+# Shared instruments
+GESTURE_STAGE_SECONDS = metrics.histogram(
+    "gesture_stage_seconds", "Duration of each gesture pipeline stage", ["stage"]
+)
+INTEGRATION_CALL_SECONDS = metrics.histogram(
+    "integration_call_seconds", "Duration of external service calls", ["service", "operation"]
+)
+INTEGRATION_ERRORS = metrics.counter(
+    "integration_errors_total", "Failed external service calls", ["service", "operation"]
+)
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "http_request_seconds", "HTTP request duration by route", ["method", "route", "status"]
+)
+WEBSOCKETS_OPEN = metrics.gauge(
+    "websockets_open", "Currently open WebSocket connections", ["endpoint"]
+)
+WS_MESSAGES_REJECTED = metrics.counter(
+    "websocket_messages_rejected_total", "Gesture messages refused by the in-flight window", ["reason"]
+)
+AUDIO_CACHE_LOOKUPS = metrics.counter(
+    "audio_cache_lookups_total", "TTS audio cache lookups", ["result"]
+)
+
+
+@contextmanager
+def track_call(service: str, operation: str):
+    """Time an external call; count it as an error if the block raises"""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        INTEGRATION_ERRORS.inc(service=service, operation=operation)
+        raise
+    finally:
+        INTEGRATION_CALL_SECONDS.observe(time.perf_counter() - start, service=service, operation=operation)
@@ -1,31 +1,43 @@
 """Authentication middleware and dependencies"""
-from fastapi import Depends, HTTPException, Request
+from fastapi import Depends, HTTPException, Request, WebSocket
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from datetime import datetime
 from typing import Optional
+import time
 
-from backend.database import get_db
+from backend.cache import cache
+from backend.database import get_db, get_async_db, AsyncSessionLocal
 from backend.models.user import User
 from backend.models.session import Session as UserSession
 
+# How long a session lookup is reused before the database is asked again
+SESSION_CACHE_TTL = 300
+
 
 async def get_current_user(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
-    """Dependency to get current authenticated user"""
+    """Dependency to get current authenticated user
+    
+    The token's user id is cached (see ``_session_user_id``), so a
+    request normally costs one primary-key lookup of the user. The user
+    stays attached to the request's ``get_async_db`` session, so routes
+    sharing that dependency can modify and commit it.
+    """
     session_token = request.cookies.get("session_token")
     
     if not session_token:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    user_session = db.query(UserSession).filter(
-        UserSession.session_token == session_token
-    ).first()
+    user_id = await _session_user_id(db, session_token)
     
-    if not user_session or user_session.is_expired:
+    if user_id is None:
         raise HTTPException(status_code=401, detail="Session expired")
     
-    user = db.query(User).filter(User.id == user_session.user_id).first()
+    user = await db.get(User, user_id)
     
     if not user or not user.is_active:
         raise HTTPException(status_code=401, detail="User not found or inactive")
@@ -33,6 +45,70 @@ async def get_current_user(
     return user
 
 
+async def _load_session(db: AsyncSession, session_token: str):
+    """(session, user) row for a session token, or None"""
+    return (await db.execute(
+        select(UserSession, User)
+        .outerjoin(User, User.id == UserSession.user_id)
+        .where(UserSession.session_token == session_token)
+    )).first()
+
+
+async def _session_user_id(db: AsyncSession, session_token: str) -> Optional[int]:
+    """User id of a live session, or None if unknown or expired
+    
+    Lookups are cached under ``session:<token>`` for up to
+    ``SESSION_CACHE_TTL`` seconds (never past the session's expiry).
+    Without the cache invalidation channel (e.g. Redis is down) a logout
+    handled by another worker could not evict this worker's copy, so the
+    cache is bypassed. On a miss the user is loaded along with the
+    session, so the caller's ``db.get`` is answered from the identity map.
+    """
+    key = f"session:{session_token}"
+    shared = cache.invalidation_connected
+    if shared:
+        cached = await cache.get(key)
+        if cached is not None:
+            if time.time() < cached["expires_at"]:
+                return cached["user_id"]
+            await cache.delete(key)
+            return None
+    
+    row = await _load_session(db, session_token)
+    if not row or row[0].is_expired:
+        return None
+    if not shared:
+        return row[0].user_id
+    
+    remaining = (row[0].expires_at - datetime.utcnow()).total_seconds()
+    await cache.set(
+        key,
+        {"user_id": row[0].user_id, "expires_at": time.time() + remaining},
+        ttl=max(1, int(min(SESSION_CACHE_TTL, remaining))),
+    )
+    return row[0].user_id
+
+
+async def forget_session(session_token: str):
+    """Drop a session's cached lookup in every worker (on logout)"""
+    await cache.delete(f"session:{session_token}")
+
+
+async def get_websocket_user(websocket: WebSocket) -> Optional[User]:
+    """Authenticate a WebSocket handshake from its session cookie"""
+    session_token = websocket.cookies.get("session_token")
+    if not session_token:
+        return None
+    
+    async with AsyncSessionLocal() as db:
+        user_id = await _session_user_id(db, session_token)
+        user = await db.get(User, user_id) if user_id is not None else None
+    
+    if not user or not user.is_active:
+        return None
+    return user
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
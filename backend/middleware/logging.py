@@ -4,6 +4,8 @@ from starlette.requests import Request
 import time
 import structlog
 
+from backend.metrics import HTTP_REQUEST_SECONDS
+
 logger = structlog.get_logger()
 
 
@@ -25,6 +27,13 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         
         # Log response
         duration = time.time() - start_time
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            duration,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=response.status_code,
+        )
         logger.info(
             "request_completed",
             method=request.method,
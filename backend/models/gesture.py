@@ -1,7 +1,11 @@
 """Gesture model"""
-from sqlalchemy import Column, String, Integer, Float, JSON, ForeignKey
+from sqlalchemy import Column, String, Integer, Float, JSON, LargeBinary, ForeignKey
 from sqlalchemy.orm import relationship
+from typing import Optional, Sequence
+import numpy as np
+
 from backend.models.base import Base, TimestampMixin
+from backend.utils.embedding_codec import encode_embedding, decode_embedding
 
 
 class Gesture(Base, TimestampMixin):
@@ -15,7 +19,8 @@ class Gesture(Base, TimestampMixin):
     raw_data = Column(JSON, nullable=True)  # Raw sensor/camera data
     
     # AI Processing
-    embedding = Column(JSON, nullable=True)  # Cerebras embedding
+    embedding = Column(JSON, nullable=True)  # Legacy JSON embedding (see migrate_embeddings.py)
+    embedding_blob = Column("embedding_bin", LargeBinary, nullable=True)  # Packed float32/int8 embedding
     intention = Column(String, nullable=True)  # Classified intention
     confidence_score = Column(Float, nullable=True)
     
@@ -29,5 +34,19 @@ class Gesture(Base, TimestampMixin):
     
     user = relationship("User", backref="gestures")
     
+    @property
+    def embedding_vector(self) -> Optional[np.ndarray]:
+        """Embedding as a NumPy array (zero-copy for float32 blobs)"""
+        if self.embedding_blob is not None:
+            return decode_embedding(self.embedding_blob)
+        if self.embedding:
+            return np.asarray(self.embedding, dtype=np.float32)
+        return None
+    
+    def set_embedding(self, values: Optional[Sequence[float]], quantize: bool = False):
+        """Store an embedding in the packed binary column"""
+        self.embedding_blob = encode_embedding(values, quantize=quantize) if values is not None else None
+        self.embedding = None
+    
     def __repr__(self):
         return f"<Gesture {self.gesture_type} - {self.intention}>"
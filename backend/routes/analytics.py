@@ -1,18 +1,20 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Query
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Optional
+import asyncio
 import random
 
-from backend.database import get_db
+from backend.cache import cache
+from backend.config import settings
+from backend.database import SessionLocal
 from backend.models import User, Gesture
 
 router = APIRouter()
 
 @router.get("/analytics")
 async def get_analytics(
-    days: int = Query(default=30, ge=1, le=365),
-    db: Session = Depends(get_db)
+    days: int = Query(default=30, ge=1, le=365)
 ):
     """
     Get analytics data for the dashboard
@@ -25,15 +27,27 @@ async def get_analytics(
         # For now, return demo data
         # TODO: Replace with actual database queries when gesture logging is implemented
         
-        stats = calculate_stats(days, db)
-        charts = generate_chart_data(days, db)
-        recent_activity = get_recent_activity(db)
+        def build():
+            # Own session: background refreshes outlive the request
+            with SessionLocal() as db:
+                return {
+                    "stats": calculate_stats(days, db),
+                    "charts": generate_chart_data(days, db),
+                    "recent_activity": get_recent_activity(db),
+                }
+        
+        async def compute():
+            # The session and its queries are synchronous; keep them off the event loop
+            return await asyncio.to_thread(build)
+        
+        # One caller rebuilds an expiring dashboard; the rest get the cached one
+        dashboard = await cache.get_or_compute(
+            f"analytics:dashboard:{days}", compute, ttl=settings.ANALYTICS_CACHE_TTL
+        )
         
         return {
             "success": True,
-            "stats": stats,
-            "charts": charts,
-            "recent_activity": recent_activity
+            **dashboard
         }
     except Exception as e:
         return {
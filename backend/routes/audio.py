@@ -0,0 +1,84 @@
+"""Speech audio routes"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from collections import defaultdict
+from typing import AsyncIterator, Dict, List, Optional
+import hmac
+import time
+import structlog
+
+from backend.config import settings
+from backend.middleware.auth import get_current_user
+from backend.models.user import User
+from backend.integrations.elevenlabs_client import elevenlabs_client
+from backend.services.tts_warmer import tts_warmer
+
+logger = structlog.get_logger()
+router = APIRouter()
+
+# Recent /stream request times per user (sliding one-minute window)
+_stream_requests: Dict[int, List[float]] = defaultdict(list)
+
+
+@router.get("/stream")
+async def stream_audio(
+    text: str = Query(..., min_length=1, max_length=500),
+    voice_id: Optional[str] = Query(None, max_length=64),
+    sig: Optional[str] = Query(None, max_length=128),
+    current_user: User = Depends(get_current_user)
+):
+    """Speech for ``text`` as chunked MP3, sent while it is being generated
+    
+    Only the default voice or the user's preferred voice may be used, and
+    only intention phrases, already stored audio or text signed by
+    ``elevenlabs_client.stream_url`` can be spoken, so the endpoint cannot
+    spend TTS quota on arbitrary text. Requests are rate-limited per user.
+    """
+    if not _within_rate_limit(current_user.id):
+        raise HTTPException(status_code=429, detail="Rate limit exceeded")
+    if voice_id not in (None, elevenlabs_client.default_voice_id, current_user.preferred_voice_id):
+        raise HTTPException(status_code=403, detail="Voice not available")
+    if not await _may_speak(text, voice_id, sig):
+        raise HTTPException(status_code=403, detail="Text not available for streaming")
+    
+    chunks = elevenlabs_client.stream_speech(text, voice_id)
+
+    # Wait for the first chunk so upstream failures become an error status
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = b""
+    except Exception as e:
+        logger.error("Audio stream failed", error=str(e))
+        raise HTTPException(status_code=502, detail="Speech generation failed")
+
+    async def body() -> AsyncIterator[bytes]:
+        yield first
+        try:
+            async for chunk in chunks:
+                yield chunk
+        except Exception as e:
+            # Headers are already sent; ending the body early is all we can do
+            logger.error("Audio stream interrupted", error=str(e))
+
+    return StreamingResponse(body(), media_type="audio/mpeg", headers={"Cache-Control": "no-store"})
+
+
+def _within_rate_limit(user_id: int) -> bool:
+    now = time.time()
+    recent = [t for t in _stream_requests[user_id] if now - t < 60]
+    if len(recent) >= settings.AUDIO_STREAM_REQUESTS_PER_MINUTE:
+        _stream_requests[user_id] = recent
+        return False
+    recent.append(now)
+    _stream_requests[user_id] = recent
+    return True
+
+
+async def _may_speak(text: str, voice_id: Optional[str], sig: Optional[str]) -> bool:
+    if text in tts_warmer.phrases():
+        return True
+    if sig and hmac.compare_digest(sig, elevenlabs_client.stream_signature(text, voice_id)):
+        return True
+    # Stored audio costs nothing to serve
+    return await elevenlabs_client.has_audio(text, voice_id)
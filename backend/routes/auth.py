@@ -7,6 +7,7 @@ import structlog
 
 from backend.database import get_db
 from backend.integrations.workos_client import workos_auth
+from backend.middleware.auth import forget_session
 from backend.models.user import User
 from backend.models.session import Session as UserSession
 from backend.schemas.auth import TokenResponse
@@ -123,6 +124,8 @@ async def logout(request: Request, db: Session = Depends(get_db)):
         if user_session:
             db.delete(user_session)
             db.commit()
+        
+        await forget_session(session_token)
     
     response = Response(content="Logged out successfully")
     response.delete_cookie("session_token")
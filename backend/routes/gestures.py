@@ -1,62 +1,339 @@
 """Gesture processing routes"""
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException, Request
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import asyncio
 import json
 import time
 import structlog
 
-from backend.database import get_db
-from backend.middleware.auth import get_current_user
+from backend.config import settings
+from backend.database import get_async_db, AsyncSessionLocal
+from backend.metrics import WEBSOCKETS_OPEN, WS_MESSAGES_REJECTED
+from backend.middleware.auth import get_current_user, get_websocket_user
 from backend.models.user import User
 from backend.models.gesture import Gesture
-from backend.schemas.gesture import GestureCreate, GestureResponse
+from backend.schemas.gesture import (
+    GestureCreate, GestureResponse, GestureBatchItem, GestureBatchResult, GestureBatchResponse
+)
+from backend.services.gesture_hub import gesture_hub
 from backend.services.gesture_service import gesture_service
+from backend.utils import wire_codec
+from backend.utils.inflight_window import InFlightWindow
+from backend.utils.stream_segmenter import create_segmenter
 
 logger = structlog.get_logger()
 router = APIRouter()
 
 
 @router.websocket("/ws")
-async def gesture_websocket(websocket: WebSocket, db: Session = Depends(get_db)):
-    """WebSocket endpoint for real-time gesture streaming"""
-    await websocket.accept()
+async def gesture_websocket(websocket: WebSocket):
+    """WebSocket endpoint for real-time gesture streaming
+    
+    Messages carrying a client ``id`` get progressive frames correlated by
+    that id: ``intention`` as soon as classification returns, then ``audio``
+    and ``saved``, and finally ``complete`` with the full result. Messages
+    without an id get the single combined result, in the order they were
+    sent.
+    
+    Up to ``WS_MAX_IN_FLIGHT`` messages are processed concurrently, each
+    with its own short-lived database session. When the window is full the
+    ``WS_BACKPRESSURE_POLICY`` applies: ``reject`` replies with an ``error``
+    frame (``code: "window_full"``), ``drop`` ignores the message and
+    ``coalesce`` keeps only the newest waiting message (the one it replaces
+    gets ``code: "coalesced"``).
+    
+    Offering the ``silentsignal.msgpack.v1`` subprotocol switches both
+    directions to MessagePack binary frames (see ``wire_codec``).
+    """
+    codec = await wire_codec.accept(websocket)
+    WEBSOCKETS_OPEN.inc(endpoint="gestures")
     logger.info("WebSocket connection established")
     
+    send_lock = asyncio.Lock()
+    window = InFlightWindow(
+        settings.WS_MAX_IN_FLIGHT,
+        policy=settings.WS_BACKPRESSURE_POLICY,
+        name="gesture_ws",
+    )
+    # Resolved once the previous id-less reply has been sent, so legacy
+    # clients still receive results in order
+    ordered_tail: Optional[asyncio.Future] = None
+    
+    async def send(payload: dict):
+        async with send_lock:
+            try:
+                await codec.send(websocket, payload)
+            except Exception as e:
+                logger.debug("WebSocket send failed", error=str(e))
+    
+    def make_job(gesture_data: dict, previous: Optional[asyncio.Future], turn: Optional[asyncio.Future]):
+        message_id = gesture_data.get("id")
+        start_time = time.time()
+        
+        async def reply(payload: Optional[dict]):
+            # Id-less replies wait for their turn; correlated ones go out at once
+            try:
+                if previous is not None:
+                    await previous
+                if payload is not None:
+                    await send(payload)
+            finally:
+                if turn is not None and not turn.done():
+                    turn.set_result(None)
+        
+        on_event = None
+        if message_id is not None:
+            async def on_event(event_type, payload):
+                await send({
+                    "type": event_type,
+                    "id": message_id,
+                    "elapsed_ms": (time.time() - start_time) * 1000,
+                    **payload,
+                })
+        
+        async def job():
+            try:
+                # Process gesture through pipeline in its own unit of work
+                async with AsyncSessionLocal() as db:
+                    result = await gesture_service.process_gesture_stream(
+                        db=db,
+                        user_id=gesture_data.get("user_id"),
+                        gesture_type=gesture_data.get("gesture_type"),
+                        raw_data=gesture_data.get("data"),
+                        on_event=on_event
+                    )
+            except ValueError as e:
+                # Malformed gesture data (e.g. keypoints of the wrong shape)
+                await reply({"type": "error", "id": message_id, "code": "invalid_gesture", "error": str(e)})
+                return
+            except Exception as e:
+                logger.error("Gesture processing failed", error=str(e))
+                await reply({"type": "error", "id": message_id, "code": "processing_failed", "error": str(e)})
+                return
+            
+            result["processing_time_ms"] = (time.time() - start_time) * 1000
+            if message_id is not None:
+                result["type"] = "complete"
+                result["id"] = message_id
+            await reply(result)
+        
+        async def on_rejected(reason: str):
+            WS_MESSAGES_REJECTED.inc(reason=reason)
+            if reason == "dropped":
+                await reply(None)
+                return
+            await reply({
+                "type": "error",
+                "id": message_id,
+                "code": reason,
+                "error": "Too many gestures in flight",
+            })
+        
+        return job, on_rejected
+    
     try:
         while True:
-            # Receive gesture data
-            data = await websocket.receive_text()
-            gesture_data = json.loads(data)
-            
-            start_time = time.time()
-            
-            # Process gesture through pipeline
-            result = await gesture_service.process_gesture_stream(
-                db=db,
-                user_id=gesture_data.get("user_id"),
-                gesture_type=gesture_data.get("gesture_type"),
-                raw_data=gesture_data.get("data")
-            )
-            
-            processing_time = (time.time() - start_time) * 1000
-            result["processing_time_ms"] = processing_time
-            
-            # Send response back
-            await websocket.send_json(result)
+            # Receive gesture data; never blocks on the pipeline
+            gesture_data = await codec.receive(websocket)
+            previous = turn = None
+            if gesture_data.get("id") is None:
+                previous, ordered_tail = ordered_tail, asyncio.get_running_loop().create_future()
+                turn = ordered_tail
+            job, on_rejected = make_job(gesture_data, previous, turn)
+            window.submit(job, on_rejected)
             
     except WebSocketDisconnect:
-        logger.info("WebSocket connection closed")
+        logger.info("WebSocket connection closed", in_flight=len(window))
+        # Let gestures already accepted finish persisting
+        await window.drain()
     except Exception as e:
         logger.error("WebSocket error", error=str(e))
+        window.cancel()
+        await websocket.close(code=1011, reason=str(e))
+    finally:
+        WEBSOCKETS_OPEN.dec(endpoint="gestures")
+
+
+@router.websocket("/ws/stream")
+async def gesture_stream_websocket(websocket: WebSocket):
+    """WebSocket endpoint for continuous per-frame signal streams
+    
+    The first message configures the stream (``user_id``, ``signal`` of
+    blink/tap/micro_gesture, optional ``fps`` up to 240 and ``points`` up
+    to 64); an invalid config gets an ``error`` frame and close code 1003.
+    Every later
+    message is one frame or ``{"frames": [...]}``; ``{"end": true}`` flushes
+    a pending gesture. Gestures completed before the client disconnects
+    are still processed (for up to ``STREAM_DRAIN_SECONDS``). A malformed frame is skipped and answered with an
+    ``invalid_frame`` error; the stream stays open. Gesture boundaries are detected server-side and only
+    completed gestures go through the pipeline. The wire format is
+    negotiated as for ``/ws``.
+    """
+    codec = await wire_codec.accept(websocket)
+    try:
+        # Undecodable JSON and MessagePack raise ValueError subclasses; a frame
+        # of the wrong kind (text vs binary) raises KeyError
+        config = await codec.receive(websocket)
+        user_id = config.get("user_id")
+        segmenter = create_segmenter(
+            config.get("signal"),
+            fps=float(config.get("fps", 30)),
+            buffer_seconds=settings.STREAM_BUFFER_SECONDS,
+            points=int(config.get("points", 21)),
+        )
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        await codec.send(websocket, {"type": "error", "code": "invalid_config", "error": str(e)})
+        await websocket.close(code=1003, reason="Invalid stream config")
+        return
+    if segmenter is None:
+        await websocket.close(code=1003, reason="Unsupported signal")
+        return
+    logger.info("Gesture stream established", signal=segmenter.gesture_type)
+    WEBSOCKETS_OPEN.inc(endpoint="stream")
+    
+    # Completed gestures are processed in order by one worker so frame intake
+    # never waits on the pipeline
+    pending: asyncio.Queue = asyncio.Queue(maxsize=settings.STREAM_MAX_PENDING_GESTURES)
+    connected = True
+    
+    async def process_completed():
+        while True:
+            gesture = await pending.get()
+            start_time = time.time()
+            try:
+                async with AsyncSessionLocal() as db:
+                    result = await gesture_service.process_gesture_stream(
+                        db=db,
+                        user_id=user_id,
+                        gesture_type=gesture["gesture_type"],
+                        raw_data=gesture["data"]
+                    )
+                result["type"] = "gesture"
+                result["gesture_type"] = gesture["gesture_type"]
+                result["processing_time_ms"] = (time.time() - start_time) * 1000
+                if connected:
+                    await codec.send(websocket, result)
+            except Exception as e:
+                logger.error("Stream gesture processing failed", error=str(e))
+            finally:
+                pending.task_done()
+    
+    def enqueue(gesture):
+        if gesture is None:
+            return
+        try:
+            pending.put_nowait(gesture)
+        except asyncio.QueueFull:
+            logger.warning("Stream gesture dropped, pipeline backlog full", signal=segmenter.gesture_type)
+    
+    worker = asyncio.create_task(process_completed())
+    try:
+        while True:
+            message = await codec.receive(websocket)
+            if message.get("end"):
+                enqueue(segmenter.flush())
+                continue
+            for frame in _stream_frames(message):
+                try:
+                    gesture = segmenter.push(frame)
+                except (AttributeError, TypeError, ValueError) as e:
+                    await codec.send(websocket, {"type": "error", "code": "invalid_frame", "error": str(e)})
+                    continue
+                enqueue(gesture)
+    except WebSocketDisconnect:
+        connected = False
+        logger.info("Gesture stream closed", pending=pending.qsize())
+        # Gestures already completed (e.g. just flushed by {"end": true}) are still saved
+        try:
+            await asyncio.wait_for(pending.join(), timeout=settings.STREAM_DRAIN_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning("Stream gestures abandoned on close", pending=pending.qsize())
+    except Exception as e:
+        logger.error("Gesture stream error", error=str(e))
         await websocket.close(code=1011, reason=str(e))
+    finally:
+        worker.cancel()
+        WEBSOCKETS_OPEN.dec(endpoint="stream")
+
+
+@router.websocket("/ws/subscribe/{patient_id}")
+async def gesture_subscribe_websocket(websocket: WebSocket, patient_id: int):
+    """Live feed of a patient's gesture results for caregiver devices
+    
+    Requires a logged-in session cookie for a user allowed to watch the
+    patient (see ``_may_watch``); others are closed with code 1008.
+    Subscribers receive the same ``intention``, ``audio``, ``saved`` and ``complete`` frames as the
+    patient's device (each tagged with ``patient_id``) from whichever
+    worker processed the gesture. Each event is encoded once per wire
+    format; a subscriber that falls behind loses its oldest frames rather
+    than slowing anyone else down.
+    """
+    user = await get_websocket_user(websocket)
+    if user is None:
+        await websocket.close(code=4401, reason="Not authenticated")
+        return
+    if not _may_watch(user, patient_id):
+        logger.warning("Gesture subscription refused", patient_id=patient_id, subscriber_id=user.id)
+        await websocket.close(code=1008, reason="Not allowed to watch this patient")
+        return
+    
+    codec = await wire_codec.accept(websocket)
+    subscription = gesture_hub.subscribe(patient_id)
+    WEBSOCKETS_OPEN.inc(endpoint="subscribe")
+    logger.info("Gesture subscription opened", patient_id=patient_id, subscriber_id=user.id)
+    
+    async def forward():
+        while True:
+            frame = await subscription.get()
+            await codec.send_encoded(websocket, frame.encoded(codec))
+    
+    async def wait_for_close():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass  # Subscribers have nothing to say; ignore pings and stray frames
+    
+    tasks = [asyncio.create_task(forward()), asyncio.create_task(wait_for_close())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        gesture_hub.unsubscribe(subscription)
+        WEBSOCKETS_OPEN.dec(endpoint="subscribe")
+        logger.info("Gesture subscription closed", patient_id=patient_id, dropped=subscription.dropped)
+
+
+def _may_watch(user: User, patient_id: int) -> bool:
+    """Whether ``user`` may see ``patient_id``'s live gestures
+    
+    There is no caregiver-patient relationship yet, so only the patient
+    may watch their own feed (e.g. on a second device).
+    """
+    return user.id == patient_id
+
+
+def _stream_frames(message: dict):
+    """Frames in a stream message: the message itself, a list, or columns
+    
+    Columnar batches (``{"frames": {"t": [...], "keypoints": <N x P x 3>}}``)
+    let binary clients send one packed array for many frames.
+    """
+    frames = message.get("frames")
+    if not frames:
+        return (message,)
+    if isinstance(frames, dict):
+        count = min(len(values) for values in frames.values())
+        return ({key: values[i] for key, values in frames.items()} for i in range(count))
+    return frames
 
 
 @router.post("/", response_model=GestureResponse)
 async def create_gesture(
     gesture: GestureCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """HTTP endpoint for gesture submission (fallback)"""
     start_time = time.time()
@@ -65,7 +342,8 @@ async def create_gesture(
         db=db,
         user_id=current_user.id,
         gesture_type=gesture.gesture_type,
-        raw_data=gesture.raw_data
+        raw_data=gesture.raw_data,
+        sensitivity=current_user.gesture_sensitivity
     )
     
     processing_time = (time.time() - start_time) * 1000
@@ -74,32 +352,111 @@ async def create_gesture(
     return result
 
 
+@router.post("/batch", response_model=GestureBatchResponse)
+async def create_gestures_batch(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Bulk gesture submission for devices replaying buffered events
+    
+    Accepts a JSON array of ``GestureBatchItem`` objects, or NDJSON (one
+    object per line) with ``Content-Type: application/x-ndjson``. All valid
+    items are inserted in a single transaction; results are per item.
+    """
+    start_time = time.time()
+    
+    raw_items = await _read_batch_body(request)
+    if len(raw_items) > settings.GESTURE_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {settings.GESTURE_BATCH_MAX_ITEMS} gestures"
+        )
+    
+    results: List[dict] = [None] * len(raw_items)
+    valid_indices, valid_items = [], []
+    for index, raw_item in enumerate(raw_items):
+        try:
+            item = GestureBatchItem.model_validate(raw_item)
+        except ValidationError as e:
+            results[index] = {"index": index, "status": "error", "error": str(e.errors()[0]["msg"])}
+            continue
+        valid_indices.append(index)
+        valid_items.append(item.model_dump())
+    
+    processed = await gesture_service.process_gesture_batch(db, current_user.id, valid_items)
+    for index, result in zip(valid_indices, processed):
+        result["index"] = index
+        results[index] = result
+    
+    failed = sum(1 for result in results if result["status"] != "ok")
+    return GestureBatchResponse(
+        results=[GestureBatchResult(**result) for result in results],
+        processed=len(results) - failed,
+        failed=failed,
+        processing_time_ms=(time.time() - start_time) * 1000,
+    )
+
+
+async def _read_batch_body(request: Request) -> List[dict]:
+    """Parse a JSON array or an NDJSON stream into a list of objects"""
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        items, buffer = [], b""
+        try:
+            async for chunk in request.stream():
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                items.extend(json.loads(line) for line in lines if line.strip())
+            if buffer.strip():
+                items.append(json.loads(buffer))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid NDJSON body")
+        return items
+    
+    try:
+        body = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if isinstance(body, dict):
+        body = body.get("gestures")
+    if not isinstance(body, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of gestures")
+    return body
+
+
 @router.get("/", response_model=List[GestureResponse])
 async def get_user_gestures(
     skip: int = 0,
     limit: int = 50,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user's gesture history"""
-    gestures = db.query(Gesture).filter(
-        Gesture.user_id == current_user.id
-    ).order_by(Gesture.created_at.desc()).offset(skip).limit(limit).all()
+    result = await db.execute(
+        select(Gesture)
+        .where(Gesture.user_id == current_user.id)
+        .order_by(Gesture.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
     
-    return gestures
+    return result.scalars().all()
 
 
 @router.get("/{gesture_id}", response_model=GestureResponse)
 async def get_gesture(
     gesture_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get specific gesture by ID"""
-    gesture = db.query(Gesture).filter(
-        Gesture.id == gesture_id,
-        Gesture.user_id == current_user.id
-    ).first()
+    gesture = (await db.execute(
+        select(Gesture).where(
+            Gesture.id == gesture_id,
+            Gesture.user_id == current_user.id
+        )
+    )).scalar_one_or_none()
     
     if not gesture:
         raise HTTPException(status_code=404, detail="Gesture not found")
@@ -111,18 +468,20 @@ async def get_gesture(
 async def delete_gesture(
     gesture_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a gesture"""
-    gesture = db.query(Gesture).filter(
-        Gesture.id == gesture_id,
-        Gesture.user_id == current_user.id
-    ).first()
+    gesture = (await db.execute(
+        select(Gesture).where(
+            Gesture.id == gesture_id,
+            Gesture.user_id == current_user.id
+        )
+    )).scalar_one_or_none()
     
     if not gesture:
         raise HTTPException(status_code=404, detail="Gesture not found")
     
-    db.delete(gesture)
-    db.commit()
+    await db.delete(gesture)
+    await db.commit()
     
     return {"message": "Gesture deleted successfully"}
@@ -4,6 +4,7 @@ from datetime import datetime
 import structlog
 
 from backend.config import settings
+from backend.services.tts_warmer import tts_warmer
 
 logger = structlog.get_logger()
 router = APIRouter()
@@ -34,5 +35,6 @@ async def system_status():
             "raindrop": "operational",
             "stripe": "operational",
             "searchable": "operational",
-        }
+        },
+        "tts_prewarm": tts_warmer.status(),
     }
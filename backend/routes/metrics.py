@@ -0,0 +1,107 @@
+"""Prometheus metrics route"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+import asyncio
+import structlog
+
+from backend.cache import cache
+from backend.database import async_engine, engine
+from backend.metrics import metrics
+from backend.integrations.cerebras_client import cerebras_client
+from backend.integrations.classification_cache import classification_cache
+from backend.utils.audio_store import audio_store
+from backend.utils.local_classifier import local_classifier
+
+logger = structlog.get_logger()
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def _pool_stats():
+    # The async pool serves ingestion, history and auth; the sync pool the remaining routes
+    stats = {}
+    for label, pool in (("async", async_engine.pool), ("sync", engine.pool)):
+        for name in ("size", "checkedout", "checkedin", "overflow"):
+            method = getattr(pool, name, None)
+            if callable(method):
+                stats[(label, name)] = method()
+    return stats
+
+
+def _classification_cache_stats():
+    stats = classification_cache.stats()
+    return {(result,): stats[key] for result, key in (
+        ("local_hit", "local_hits"), ("redis_hit", "redis_hits"), ("miss", "misses")
+    )}
+
+
+def _tiered_cache_stats():
+    return {("l1_hit",): cache.l1_hits, ("l2_hit",): cache.l2_hits, ("miss",): cache.misses}
+
+
+def _cache_compute_stats():
+    return {(result,): count for result, count in cache.compute_stats.items()}
+
+
+def _local_classifier_stats():
+    stats = local_classifier.stats()
+    return {("hit",): stats["hits"], ("miss",): stats["misses"]}
+
+
+metrics.callback(
+    "db_pool_connections", "Database connection pool usage", ["engine", "state"], _pool_stats
+)
+metrics.callback(
+    "classification_cache_lookups_total", "Classification cache lookups", ["result"],
+    _classification_cache_stats, type_name="counter",
+)
+metrics.callback(
+    "classification_cache_local_entries", "Entries in the in-process classification cache", [],
+    lambda: {(): len(classification_cache.local)},
+)
+metrics.callback(
+    "cache_lookups_total", "Shared cache lookups by the tier that answered", ["result"],
+    _tiered_cache_stats, type_name="counter",
+)
+metrics.callback(
+    "cache_l1_entries", "Entries in the in-process cache tier per key prefix", ["prefix"],
+    lambda: {(prefix,): count for prefix, count in cache.l1_entries().items()},
+)
+metrics.callback(
+    "cache_compute_total", "get_or_compute outcomes (fresh hit, early/stale refresh, computed, waited on a lease)",
+    ["result"], _cache_compute_stats, type_name="counter",
+)
+metrics.callback(
+    "local_classifier_predictions_total", "Local classifier predictions", ["result"],
+    _local_classifier_stats, type_name="counter",
+)
+metrics.callback(
+    "cerebras_batches_total", "Classification micro-batches sent to Cerebras", [],
+    lambda: {(): cerebras_client.batcher.batches}, type_name="counter",
+)
+metrics.callback(
+    "cerebras_batched_items_total", "Classifications sent in micro-batches", [],
+    lambda: {(): cerebras_client.batcher.items}, type_name="counter",
+)
+
+metrics.callback(
+    "audio_cache_bytes", "Size of the on-disk TTS audio store", [],
+    lambda: {(): audio_store.stored_bytes},
+)
+metrics.callback(
+    "audio_cache_files", "Files in the on-disk TTS audio store", [],
+    lambda: {(): audio_store.stored_files},
+)
+metrics.callback(
+    "audio_cache_evictions_total", "Audio files evicted to stay under the size cap", [],
+    lambda: {(): audio_store.evicted}, type_name="counter",
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Metrics in Prometheus text exposition format"""
+    # The audio store totals come from SQLite (and may wait on an eviction's lock)
+    await asyncio.to_thread(audio_store.refresh_stats)
+    return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
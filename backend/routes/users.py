@@ -1,11 +1,13 @@
 """User management routes"""
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from backend.database import get_db
+from backend.database import get_db, get_async_db
 from backend.middleware.auth import get_current_user
 from backend.models.user import User
 from backend.schemas.user import UserResponse, UserUpdate
+from backend.services.gesture_dedupe import gesture_deduper
 from backend.services.user_service import user_service
 
 router = APIRouter()
@@ -30,6 +32,7 @@ async def update_current_user(
     
     if not updated_user:
         raise HTTPException(status_code=404, detail="User not found")
+    gesture_deduper.forget_user(current_user.id)
     
     return updated_user
 
@@ -49,7 +52,7 @@ async def get_user_preferences(
 async def update_user_preferences(
     preferences: dict,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update user preferences"""
     if "preferred_voice_id" in preferences:
@@ -57,5 +60,6 @@ async def update_user_preferences(
     if "gesture_sensitivity" in preferences:
         current_user.gesture_sensitivity = preferences["gesture_sensitivity"]
     
-    db.commit()
+    await db.commit()
+    gesture_deduper.forget_user(current_user.id)
     return {"message": "Preferences updated successfully"}
@@ -1,9 +1,12 @@
 from backend.schemas.user import UserCreate, UserResponse, UserUpdate
-from backend.schemas.gesture import GestureCreate, GestureResponse
+from backend.schemas.gesture import (
+    GestureCreate, GestureResponse, GestureBatchItem, GestureBatchResult, GestureBatchResponse
+)
 from backend.schemas.auth import LoginRequest, TokenResponse
 
 __all__ = [
     "UserCreate", "UserResponse", "UserUpdate",
     "GestureCreate", "GestureResponse",
+    "GestureBatchItem", "GestureBatchResult", "GestureBatchResponse",
     "LoginRequest", "TokenResponse"
 ]
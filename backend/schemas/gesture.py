@@ -1,12 +1,27 @@
 """Gesture schemas"""
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 
+from backend.utils.keypoint_features import as_keypoint_array
+
 
 class GestureCreate(BaseModel):
     gesture_type: str  # blink, tap, micro_gesture
     raw_data: Optional[Dict[str, Any]] = None
+    
+    @field_validator("raw_data")
+    @classmethod
+    def check_keypoints(cls, raw_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Reject malformed keypoints up front (422) instead of failing mid-pipeline"""
+        if raw_data and "keypoints" in raw_data:
+            as_keypoint_array(raw_data["keypoints"])
+        return raw_data
+
+
+class GestureBatchItem(GestureCreate):
+    """One gesture in a bulk submission"""
+    generate_audio: bool = False  # Replayed events usually don't need speech
 
 
 class GestureResponse(BaseModel):
@@ -37,3 +52,18 @@ class IntentionResponse(BaseModel):
     confidence: float
     text: str
     audio_url: Optional[str] = None
+
+
+class GestureBatchResult(BaseModel):
+    """Per-item outcome of a bulk submission"""
+    index: int
+    status: str  # ok, error
+    gesture: Optional[GestureResponse] = None
+    error: Optional[str] = None
+
+
+class GestureBatchResponse(BaseModel):
+    results: List[GestureBatchResult]
+    processed: int
+    failed: int
+    processing_time_ms: float
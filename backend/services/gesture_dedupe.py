@@ -0,0 +1,129 @@
+"""Suppression of repeated gestures sent within a short window"""
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Sequence, Tuple
+import asyncio
+import hashlib
+import time
+import structlog
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.cache import LocalLRUCache
+from backend.config import settings
+from backend.integrations.classification_cache import quantize_features
+from backend.metrics import metrics
+from backend.models.user import User
+
+logger = structlog.get_logger()
+
+
+def _user_key(user_id: Any) -> Any:
+    # HTTP and sessions give ints, WebSocket JSON may give "7"; key both the same
+    try:
+        return int(user_id)
+    except (TypeError, ValueError):
+        return user_id
+
+
+class GestureDeduper:
+    """Per-user coalescing of identical gestures.
+
+    A gesture is identified by user, type and its quantized features. While
+    one is being processed, identical ones wait for and share its result;
+    for the rest of the user's window (counted from when the first arrived)
+    they get the finished result straight away. The window depends on the
+    user's ``gesture_sensitivity``; 0 disables suppression.
+    """
+
+    def __init__(self):
+        self.quantum = settings.GESTURE_DEDUPE_QUANTUM
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._recent = LocalLRUCache(maxsize=settings.GESTURE_DEDUPE_MAX_ENTRIES, ttl=1.0)
+        self._sensitivity = LocalLRUCache(maxsize=settings.GESTURE_DEDUPE_MAX_ENTRIES, ttl=60)
+
+    def key(self, user_id: Any, gesture_type: str, features: Sequence[float]) -> Tuple:
+        digest = hashlib.blake2b(quantize_features(features, self.quantum), digest_size=16).hexdigest()
+        return (_user_key(user_id), gesture_type, digest)
+
+    @staticmethod
+    def window_for(sensitivity: Optional[str]) -> float:
+        """Suppression window in seconds for a sensitivity level"""
+        window_ms = {
+            "low": settings.GESTURE_DEDUPE_WINDOW_LOW_MS,
+            "high": settings.GESTURE_DEDUPE_WINDOW_HIGH_MS,
+        }.get(sensitivity, settings.GESTURE_DEDUPE_WINDOW_MEDIUM_MS)
+        return max(0.0, window_ms) / 1000.0
+
+    async def sensitivity_for(self, db: AsyncSession, user_id: Any) -> Optional[str]:
+        """The user's gesture_sensitivity, cached for a minute"""
+        if user_id is None:
+            return None
+        user_id = _user_key(user_id)
+        sensitivity = self._sensitivity.get(user_id)
+        if sensitivity is None:
+            try:
+                sensitivity = await db.scalar(select(User.gesture_sensitivity).where(User.id == user_id))
+            except Exception as e:
+                logger.warning("Sensitivity lookup failed", user_id=user_id, error=str(e))
+                return None
+            self._sensitivity.set(user_id, sensitivity or "medium")
+        return sensitivity
+
+    def forget_user(self, user_id: Any):
+        """Drop a cached sensitivity after the user changes it"""
+        self._sensitivity.delete(_user_key(user_id))
+
+    async def run(
+        self,
+        key: Hashable,
+        window: float,
+        compute: Callable[[], Awaitable[Any]],
+    ) -> Tuple[Any, bool]:
+        """Return ``(result, reused)``, computing only if no match is in the window"""
+        if window <= 0:
+            return await compute(), False
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            try:
+                result = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The original was abandoned; process this one instead
+                return await self.run(key, window, compute)
+            GESTURES_DEDUPED.inc(result="in_flight")
+            return result, True
+
+        recent = self._recent.get(key)
+        if recent is not None:
+            GESTURES_DEDUPED.inc(result="recent")
+            return recent, True
+
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        # Mark failures as retrieved when nobody else was waiting
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._in_flight[key] = future
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+        future.set_result(result)
+        remaining = window - (time.monotonic() - started)
+        if remaining > 0:
+            self._recent.set(key, result, ttl=remaining)
+        return result, False
+
+
+gesture_deduper = GestureDeduper()
+
+GESTURES_DEDUPED = metrics.counter(
+    "gestures_deduplicated_total", "Repeated gestures answered from an earlier identical one", ["result"]
+)
@@ -0,0 +1,178 @@
+"""Live fan-out of a patient's gesture results to subscribed devices"""
+from typing import Any, Dict, Optional, Set
+import asyncio
+import json
+import uuid
+import structlog
+
+from backend.cache import cache
+from backend.config import settings
+from backend.metrics import metrics
+from backend.utils.wire_codec import JsonCodec
+
+logger = structlog.get_logger()
+
+CHANNEL_PREFIX = "gestures:"
+
+
+class Frame:
+    """One published event, encoded at most once per wire format"""
+
+    __slots__ = ("event", "_encoded")
+
+    def __init__(self, event: Dict[str, Any], json_text: Optional[str] = None):
+        self.event = event
+        self._encoded: Dict[str, Any] = {}
+        if json_text is not None:
+            self._encoded[JsonCodec.subprotocol] = json_text
+
+    def encoded(self, codec) -> Any:
+        data = self._encoded.get(codec.subprotocol)
+        if data is None:
+            data = self._encoded[codec.subprotocol] = codec.encode(self.event)
+        return data
+
+
+class Subscription:
+    """A subscriber's bounded mailbox; the oldest frame is dropped when full"""
+
+    def __init__(self, patient_id: int, maxsize: int):
+        self.patient_id = patient_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def deliver(self, frame: Frame):
+        # Never awaits: a slow consumer only loses its own oldest frames
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            FANOUT_DROPPED.inc()
+        self.queue.put_nowait(frame)
+
+    async def get(self) -> Frame:
+        return await self.queue.get()
+
+
+class GestureHub:
+    """In-process broadcast with Redis pub/sub between workers.
+
+    ``publish`` delivers to local subscribers immediately and forwards the
+    JSON-encoded event to Redis; other workers receive it on
+    ``gestures:<patient_id>`` and deliver to their own subscribers.
+    Events published by this worker are skipped when they come back.
+    """
+
+    def __init__(self):
+        self.worker_id = uuid.uuid4().hex[:12]
+        self.queue_size = settings.FANOUT_SUBSCRIBER_QUEUE_SIZE
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._outbox: Optional[asyncio.Queue] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._pubsub = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    def subscribe(self, patient_id: int) -> Subscription:
+        patient_id = int(patient_id)
+        subscription = Subscription(patient_id, self.queue_size)
+        self._subscribers.setdefault(patient_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subs = self._subscribers.get(subscription.patient_id)
+        if subs is not None:
+            subs.discard(subscription)
+            if not subs:
+                del self._subscribers[subscription.patient_id]
+
+    def publish(self, patient_id: Optional[int], event: Dict[str, Any]):
+        """Fan an event out to every subscriber of ``patient_id`` (non-blocking)"""
+        if patient_id is None:
+            return
+        # Device clients may send their id as a string; subscribers are keyed by int
+        try:
+            patient_id = int(patient_id)
+        except (TypeError, ValueError):
+            logger.warning("Fan-out skipped, patient id is not an integer", patient_id=patient_id)
+            return
+        event = {"patient_id": patient_id, **event}
+        text = JsonCodec.encode(event)
+        self._deliver_local(patient_id, Frame(event, text))
+
+        if self._outbox is not None:
+            try:
+                self._outbox.put_nowait((patient_id, text))
+            except asyncio.QueueFull:
+                FANOUT_DROPPED.inc()
+                logger.warning("Fan-out outbox full, event not forwarded", patient_id=patient_id)
+
+    def _deliver_local(self, patient_id: int, frame: Frame):
+        for subscription in list(self._subscribers.get(patient_id, ())):
+            subscription.deliver(frame)
+
+    async def start(self):
+        """Bridge to Redis pub/sub if Redis is connected"""
+        if cache.redis is None:
+            logger.info("Gesture fan-out running in-process only")
+            return
+        self._outbox = asyncio.Queue(maxsize=1000)
+        self._pubsub = cache.redis.pubsub()
+        await self._pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+        for coro in (self._forward(), self._listen()):
+            task = asyncio.create_task(coro)
+            self._tasks.add(task)
+        logger.info("Gesture fan-out bridged to Redis", worker_id=self.worker_id)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._outbox = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except Exception as e:
+                logger.warning("Fan-out pub/sub close failed", error=str(e))
+            self._pubsub = None
+
+    async def _forward(self):
+        # One publisher keeps events for a patient in order
+        while True:
+            patient_id, text = await self._outbox.get()
+            try:
+                await cache.redis.publish(f"{CHANNEL_PREFIX}{patient_id}", f"{self.worker_id}|{text}")
+            except Exception as e:
+                logger.warning("Fan-out publish failed", patient_id=patient_id, error=str(e))
+
+    async def _listen(self):
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Fan-out listener error", error=str(e))
+                await asyncio.sleep(1.0)
+                continue
+            if message is None:
+                continue
+            origin, _, text = message["data"].decode().partition("|")
+            if origin == self.worker_id:
+                continue
+            patient_id = int(message["channel"].decode()[len(CHANNEL_PREFIX):])
+            if patient_id in self._subscribers:
+                self._deliver_local(patient_id, Frame(json.loads(text), text))
+
+
+gesture_hub = GestureHub()
+
+FANOUT_DROPPED = metrics.counter(
+    "fanout_dropped_total", "Fan-out frames dropped for slow subscribers or a full outbox"
+)
+metrics.callback(
+    "fanout_subscribers", "Live gesture subscribers on this worker", [],
+    lambda: {(): gesture_hub.subscriber_count},
+)
@@ -1,92 +1,307 @@
 """Gesture processing service"""
-from sqlalchemy.orm import Session
-from typing import Dict, Any, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+import asyncio
+import time
 import structlog
 
+from backend.config import settings
+from backend.metrics import GESTURE_STAGE_SECONDS
 from backend.models.gesture import Gesture
 from backend.utils.gesture_preprocessor import gesture_preprocessor
 from backend.integrations.cerebras_client import cerebras_client
+from backend.utils.local_classifier import local_classifier
 from backend.utils.intention_mapper import intention_mapper
 from backend.integrations.elevenlabs_client import elevenlabs_client
 from backend.integrations.raindrop_client import raindrop_client
 from backend.integrations.searchable_client import searchable_client
+from backend.services.gesture_dedupe import gesture_deduper
+from backend.services.gesture_hub import gesture_hub
+from backend.services.gesture_writer import gesture_writer
+from backend.utils.stage_scheduler import StageScheduler, spawn_background
+from backend.utils.wire_codec import to_builtin
 
 logger = structlog.get_logger()
 
+# Callback receiving (event_type, payload) as pipeline results become available
+EventCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
 
 class GestureService:
     """Service for processing gestures through the full pipeline"""
     
     async def process_gesture(
         self,
-        db: Session,
+        db: AsyncSession,
         user_id: int,
         gesture_type: str,
-        raw_data: Optional[Dict[str, Any]] = None
+        raw_data: Optional[Dict[str, Any]] = None,
+        on_event: Optional[EventCallback] = None,
+        sensitivity: Optional[str] = None
     ) -> Gesture:
-        """Process gesture through full pipeline"""
+        """Process gesture through full pipeline
+        
+        Stages run as a dependency graph: TTS and the initial insert overlap,
+        and Searchable indexing happens in the background after the response.
+        With ``GESTURE_BATCHED_WRITE_ENABLED`` the finished row (audio URL
+        included) is instead inserted with other gestures in one statement
+        (write-through: the pipeline waits for that commit, so ``saved`` and
+        the result carry the real id); ``db`` is then unused.
+        ``on_event`` is awaited with ``intention``, ``audio`` and ``saved``
+        events as soon as each partial result exists.
+        
+        A repeat of a gesture the user sent moments ago (same type and
+        quantized features, within the window for ``sensitivity``, looked up
+        when not given) shares that gesture's result instead of running the
+        pipeline again; its events are replayed to ``on_event`` only.
+        """
+        async def emit(event_type: str, payload: Dict[str, Any]):
+            gesture_hub.publish(user_id, {"type": event_type, **payload})
+            if on_event is None:
+                return
+            try:
+                await on_event(event_type, payload)
+            except Exception as e:
+                logger.warning("Gesture event delivery failed", event_type=event_type, error=str(e))
+        
         # Validate and normalize
         if not gesture_preprocessor.validate_gesture_data(gesture_type, raw_data or {}):
             logger.warning("Invalid gesture data", gesture_type=gesture_type)
         
         # Normalize based on type
-        normalized_data = self._normalize_gesture(gesture_type, raw_data or {})
+        with GESTURE_STAGE_SECONDS.time(stage="normalize"):
+            normalized_data = self._normalize_gesture(gesture_type, raw_data or {})
         
         # Extract features
-        features = gesture_preprocessor.extract_features(gesture_type, normalized_data)
-
+        with GESTURE_STAGE_SECONDS.time(stage="features"):
+            features = gesture_preprocessor.extract_features(gesture_type, normalized_data)
         
-        # Classify intention via Cerebras
-        classification = await cerebras_client.classify_intention(
-            gesture_type=gesture_type,
-            features=features,
-            context=""
-        )
+        async def classify() -> Dict[str, Any]:
+            return await self._classify(gesture_type, features)
         
-        intention = classification.get("intention", "unknown")
-        confidence = classification.get("confidence", 0.0)
+        async def map_text(classify: Dict[str, Any]) -> str:
+            # Map to text
+            text = intention_mapper.map_intention_to_text(
+                classify.get("intention", "unknown"),
+                classify.get("text")
+            )
+            await emit("intention", {
+                "intention": classify.get("intention", "unknown"),
+                "confidence": classify.get("confidence", 0.0),
+                "text": text,
+            })
+            return text
         
-        # Map to text
-        text = intention_mapper.map_intention_to_text(
-            intention,
-            classification.get("text")
-        )
+        async def tts(map_text: str) -> str:
+            # Let the device start playback while new audio is still generating
+            if on_event is not None and map_text and not await elevenlabs_client.has_audio(map_text):
+                await emit("audio_stream", {"stream_url": elevenlabs_client.stream_url(map_text)})
+            # Generate speech via ElevenLabs
+            audio_url = await elevenlabs_client.text_to_speech(map_text, user_id)
+            await emit("audio", {"audio_url": audio_url})
+            return audio_url
         
-        # Generate speech via ElevenLabs
-        audio_url = await elevenlabs_client.text_to_speech(text, user_id)
+        def build(classify: Dict[str, Any], map_text: str) -> Gesture:
+            gesture = Gesture(
+                user_id=user_id,
+                gesture_type=gesture_type,
+                raw_data=to_builtin(raw_data),
+                intention=classify.get("intention", "unknown"),
+                confidence_score=classify.get("confidence", 0.0),
+                generated_text=map_text,
+            )
+            gesture.set_embedding(features, quantize=settings.EMBEDDING_QUANTIZE)
+            return gesture
         
-        # Create gesture record
-        gesture = Gesture(
-            user_id=user_id,
-            gesture_type=gesture_type,
-            raw_data=raw_data,
-            embedding=features,
-            intention=intention,
-            confidence_score=confidence,
-            generated_text=text,
-            audio_url=audio_url,
-        )
+        async def batched_write(classify: Dict[str, Any], map_text: str, tts: str) -> Gesture:
+            # One batched insert once every field is known; waits for the commit
+            gesture = build(classify, map_text)
+            gesture.audio_url = tts or None
+            gesture = await gesture_writer.save(gesture)
+            await emit("saved", {"gesture_id": gesture.id})
+            return gesture
+        
+        async def commit(classify: Dict[str, Any], map_text: str) -> Gesture:
+            # Create gesture record while audio is still being generated
+            gesture = build(classify, map_text)
+            db.add(gesture)
+            await db.commit()
+            await emit("saved", {"gesture_id": gesture.id})
+            return gesture
         
-        db.add(gesture)
-        db.commit()
-        db.refresh(gesture)
+        async def attach_audio(commit: Gesture, tts: str) -> Gesture:
+            # Attach the audio URL once both branches have finished
+            if tts:
+                commit.audio_url = tts
+                await db.commit()
+            return commit
         
-        # Index in Searchable
-        await searchable_client.index_gesture(gesture)
+        final_stage = "batched_write" if settings.GESTURE_BATCHED_WRITE_ENABLED else "attach_audio"
         
-        logger.info("Gesture processed", gesture_id=gesture.id, intention=intention)
+        async def index(**stages: Gesture) -> bool:
+            # Index in Searchable (nobody waits on this)
+            return await searchable_client.index_gesture(stages[final_stage])
+        
+        async def run_pipeline() -> Gesture:
+            # Everything after feature extraction; skipped for suppressed repeats
+            scheduler = (
+                StageScheduler(observer=self._observe_stage)
+                .add("classify", classify)
+                .add("map_text", map_text, depends_on=["classify"])
+                .add("tts", tts, depends_on=["map_text"])
+            )
+            if settings.GESTURE_BATCHED_WRITE_ENABLED:
+                scheduler.add("batched_write", batched_write, depends_on=["classify", "map_text", "tts"])
+            else:
+                scheduler.add("commit", commit, depends_on=["classify", "map_text"])
+                scheduler.add("attach_audio", attach_audio, depends_on=["commit", "tts"])
+            scheduler.add("index", index, depends_on=[final_stage], background=True)
+            results = await scheduler.run()
+            gesture = results[final_stage]
+            gesture_hub.publish(user_id, {"type": "complete", **self._result(gesture)})
+            return gesture
+        
+        if sensitivity is None:
+            sensitivity = await gesture_deduper.sensitivity_for(db, user_id)
+        gesture, reused = await gesture_deduper.run(
+            gesture_deduper.key(user_id, gesture_type, features),
+            gesture_deduper.window_for(sensitivity),
+            run_pipeline,
+        )
+        if reused:
+            await self._replay(gesture, on_event)
+            logger.info("Repeated gesture suppressed", gesture_id=gesture.id, intention=gesture.intention)
+            return gesture
+        
+        logger.info("Gesture processed", gesture_id=gesture.id, intention=gesture.intention)
         return gesture
     
     async def process_gesture_stream(
         self,
-        db: Session,
+        db: AsyncSession,
         user_id: int,
         gesture_type: str,
-        raw_data: Optional[Dict[str, Any]] = None
+        raw_data: Optional[Dict[str, Any]] = None,
+        on_event: Optional[EventCallback] = None
     ) -> Dict[str, Any]:
         """Process gesture for WebSocket streaming"""
-        gesture = await self.process_gesture(db, user_id, gesture_type, raw_data)
+        gesture = await self.process_gesture(db, user_id, gesture_type, raw_data, on_event)
+        
+        return self._result(gesture)
+    
+    async def process_gesture_batch(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        items: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Process many gestures with batched stages and a single transaction
         
+        ``items`` hold ``gesture_type``, ``raw_data`` and ``generate_audio``.
+        Returns one result dict per item, in order; if the insert fails every
+        item is reported as an error.
+        """
+        if not items:
+            return []
+        
+        gesture_types = [item["gesture_type"] for item in items]
+        raw_items = [item.get("raw_data") or {} for item in items]
+        
+        # Normalize and extract features per gesture type in one pass
+        features: List[List[float]] = [[] for _ in items]
+        with GESTURE_STAGE_SECONDS.time(stage="batch_preprocess"):
+            grouped = gesture_preprocessor.preprocess_batch(gesture_types, raw_items)
+        for _, (indices, matrix) in grouped.items():
+            for index, row in zip(indices.tolist(), matrix.tolist()):
+                features[index] = row
+        
+        # One MGET for cached answers; concurrent misses are combined by the Cerebras micro-batcher
+        with GESTURE_STAGE_SECONDS.time(stage="batch_classify"):
+            await cerebras_client.prefetch(zip(gesture_types, features))
+            classifications = await asyncio.gather(*(
+                self._classify(gesture_type, item_features)
+                for gesture_type, item_features in zip(gesture_types, features)
+            ))
+        texts = [
+            intention_mapper.map_intention_to_text(c.get("intention", "unknown"), c.get("text"))
+            for c in classifications
+        ]
+        
+        # Speech only where requested, once per distinct phrase
+        wanted = {text for text, item in zip(texts, items) if item.get("generate_audio")}
+        audio_urls = dict(zip(wanted, await asyncio.gather(*(
+            elevenlabs_client.text_to_speech(text, user_id) for text in wanted
+        ))))
+        
+        gestures = []
+        for item, item_features, classification, text in zip(items, features, classifications, texts):
+            gesture = Gesture(
+                user_id=user_id,
+                gesture_type=item["gesture_type"],
+                raw_data=item.get("raw_data"),
+                intention=classification.get("intention", "unknown"),
+                confidence_score=classification.get("confidence", 0.0),
+                generated_text=text,
+                audio_url=audio_urls.get(text) if item.get("generate_audio") else None,
+            )
+            gesture.set_embedding(item_features, quantize=settings.EMBEDDING_QUANTIZE)
+            gestures.append(gesture)
+        
+        try:
+            commit_started = time.perf_counter()
+            db.add_all(gestures)
+            await db.flush()
+            results = [
+                {"index": index, "status": "ok", "gesture": self._snapshot(gesture)}
+                for index, gesture in enumerate(gestures)
+            ]
+            documents = [searchable_client.build_document(gesture) for gesture in gestures]
+            await db.commit()
+            GESTURE_STAGE_SECONDS.observe(time.perf_counter() - commit_started, stage="batch_commit")
+        except Exception as e:
+            await db.rollback()
+            logger.error("Gesture batch insert failed", size=len(items), error=str(e))
+            return [{"index": index, "status": "error", "error": "Insert failed"} for index in range(len(items))]
+        
+        spawn_background(searchable_client.index_documents(documents), name="index_batch")
+        logger.info("Gesture batch processed", size=len(items), audio=len(audio_urls))
+        return results
+    
+    async def _classify(self, gesture_type: str, features: List[float]) -> Dict[str, Any]:
+        """Classify locally when confident, otherwise via Cerebras"""
+        # Try the local classifier before paying for an LLM round trip
+        local = local_classifier.predict(gesture_type, features)
+        if local:
+            return local
+        
+        # Classify intention via Cerebras
+        classification = await cerebras_client.classify_intention(
+            gesture_type=gesture_type,
+            features=features,
+            context=""
+        )
+        local_classifier.observe(gesture_type, features, classification)
+        return classification
+    
+    @staticmethod
+    async def _replay(gesture: Gesture, on_event: Optional[EventCallback]):
+        """Send a shared result's events to the caller of a suppressed repeat"""
+        if on_event is None:
+            return
+        try:
+            await on_event("intention", {
+                "intention": gesture.intention,
+                "confidence": gesture.confidence_score,
+                "text": gesture.generated_text,
+            })
+            await on_event("audio", {"audio_url": gesture.audio_url})
+            await on_event("saved", {"gesture_id": gesture.id})
+        except Exception as e:
+            logger.warning("Gesture event delivery failed", error=str(e))
+    
+    @staticmethod
+    def _result(gesture: Gesture) -> Dict[str, Any]:
+        """Live result fields sent to the device and to subscribers"""
         return {
             "gesture_id": gesture.id,
             "intention": gesture.intention,
@@ -95,6 +310,25 @@ class GestureService:
             "audio_url": gesture.audio_url,
         }
     
+    @staticmethod
+    def _observe_stage(stage: str, seconds: float):
+        GESTURE_STAGE_SECONDS.observe(seconds, stage=stage)
+    
+    @staticmethod
+    def _snapshot(gesture: Gesture) -> Dict[str, Any]:
+        """Plain dict of a gesture's response fields"""
+        return {
+            "id": gesture.id,
+            "user_id": gesture.user_id,
+            "gesture_type": gesture.gesture_type,
+            "intention": gesture.intention,
+            "confidence_score": gesture.confidence_score,
+            "generated_text": gesture.generated_text,
+            "audio_url": gesture.audio_url,
+            "processing_time_ms": gesture.processing_time_ms,
+            "created_at": gesture.created_at,
+        }
+    
     def _normalize_gesture(self, gesture_type: str, raw_data: Dict) -> Dict:
         """Normalize gesture data based on type"""
         if gesture_type == "blink":
@@ -0,0 +1,87 @@
+"""Batched write-through persistence for live gestures"""
+from typing import List, Optional
+import structlog
+
+from backend.config import settings
+from backend.database import AsyncSessionLocal
+from backend.metrics import GESTURE_STAGE_SECONDS, metrics
+from backend.models.gesture import Gesture
+from backend.utils.micro_batcher import MicroBatcher
+
+logger = structlog.get_logger()
+
+
+class GestureWriter:
+    """Insert finished gestures in batches, write-through.
+
+    Rows collected within ``GESTURE_BATCHED_WRITE_INTERVAL_MS`` (or as soon as
+    ``GESTURE_BATCHED_WRITE_MAX_ROWS`` are waiting) go out as one multi-row
+    INSERT in one transaction; primary keys come back from that statement,
+    so each caller gets its saved gesture, id included. This is not
+    write-behind: ``save`` returns only after the commit, so a caller waits
+    up to one interval plus the insert. At most
+    ``GESTURE_BATCHED_WRITE_MAX_PENDING`` rows wait at once; further callers
+    wait for a flush. ``drain`` is called on shutdown so nothing buffered is
+    lost.
+    """
+
+    def __init__(self):
+        self.batcher = MicroBatcher(
+            self._insert_batch,
+            max_batch_size=settings.GESTURE_BATCHED_WRITE_MAX_ROWS,
+            window_ms=settings.GESTURE_BATCHED_WRITE_INTERVAL_MS,
+            name="gesture_batched_write",
+            max_pending=settings.GESTURE_BATCHED_WRITE_MAX_PENDING,
+        )
+        self.failed = 0
+
+    async def save(self, gesture: Gesture) -> Gesture:
+        """Queue a gesture for insertion and wait until it is committed"""
+        saved = await self.batcher.submit(gesture)
+        if saved is None:
+            raise RuntimeError("Gesture insert failed")
+        return saved
+
+    async def drain(self):
+        """Flush buffered gestures and wait for in-flight inserts"""
+        await self.batcher.drain()
+
+    async def _insert_batch(self, gestures: List[Gesture]) -> List[Optional[Gesture]]:
+        with GESTURE_STAGE_SECONDS.time(stage="batched_write_flush"):
+            try:
+                async with AsyncSessionLocal() as db:
+                    db.add_all(gestures)
+                    await db.commit()
+                return gestures
+            except Exception as e:
+                logger.warning("Gesture batch insert failed, retrying rows", size=len(gestures), error=str(e))
+
+            # One bad row must not lose the rest of the batch
+            return [await self._insert_one(gesture) for gesture in gestures]
+
+    async def _insert_one(self, gesture: Gesture) -> Optional[Gesture]:
+        try:
+            async with AsyncSessionLocal() as db:
+                db.add(gesture)
+                await db.commit()
+            return gesture
+        except Exception as e:
+            self.failed += 1
+            logger.error("Gesture insert failed", user_id=gesture.user_id, error=str(e))
+            return None
+
+
+gesture_writer = GestureWriter()
+
+metrics.callback(
+    "gesture_batched_write_flushes_total", "Batched gesture inserts", [],
+    lambda: {(): gesture_writer.batcher.batches}, type_name="counter",
+)
+metrics.callback(
+    "gesture_batched_write_rows_total", "Gestures inserted through batched writes", [],
+    lambda: {(): gesture_writer.batcher.items}, type_name="counter",
+)
+metrics.callback(
+    "gesture_batched_write_failed_total", "Gestures the batched writer could not insert", [],
+    lambda: {(): gesture_writer.failed}, type_name="counter",
+)
@@ -0,0 +1,103 @@
+"""Background pre-generation of speech for the fixed intention phrases"""
+from typing import Any, Dict, List, Optional
+import asyncio
+import time
+import structlog
+
+from backend.config import settings
+from backend.integrations.elevenlabs_client import elevenlabs_client
+from backend.metrics import metrics
+from backend.utils.intention_mapper import IntentionMapper
+
+logger = structlog.get_logger()
+
+# Spoken when an intention is missing from the map
+FALLBACK_PHRASE = "I'm trying to communicate"
+
+
+class TTSWarmer:
+    """Generate and cache audio for every map phrase in the default voice.
+
+    The gesture pipeline always speaks in ``ELEVENLABS_VOICE_ID``, so that
+    is the only voice worth warming. ``schedule`` starts a single background
+    run if none is active. At most ``TTS_PREWARM_CONCURRENCY`` phrases are
+    generated at once, and ``status`` reports progress for the current or
+    last run.
+    """
+
+    def __init__(self):
+        self.concurrency = max(1, settings.TTS_PREWARM_CONCURRENCY)
+        self._task: Optional[asyncio.Task] = None
+        self.progress: Dict[str, Any] = {
+            "state": "idle",
+            "voices": [],
+            "total": 0,
+            "cached": 0,
+            "generated": 0,
+            "failed": 0,
+            "started_at": None,
+            "finished_at": None,
+        }
+
+    @staticmethod
+    def phrases() -> List[str]:
+        return sorted(set(IntentionMapper.INTENTION_MAP.values()) | {FALLBACK_PHRASE})
+
+    def schedule(self):
+        """Start warming the default voice unless a run is already active"""
+        if not settings.TTS_PREWARM_ENABLED or not settings.ELEVENLABS_API_KEY:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._warm([elevenlabs_client.default_voice_id]))
+
+    async def stop(self):
+        """Cancel a run in progress (used on shutdown)"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def status(self) -> Dict[str, Any]:
+        return dict(self.progress)
+
+    async def _warm(self, voices: List[str]):
+        phrases = self.phrases()
+        progress = self.progress
+        progress.update(
+            state="running", voices=voices, total=len(voices) * len(phrases),
+            cached=0, generated=0, failed=0, started_at=time.time(), finished_at=None,
+        )
+        logger.info("TTS pre-warm started", voices=len(voices), phrases=len(phrases))
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def warm_one(text: str, voice_id: str):
+            async with slots:
+                if await elevenlabs_client.has_audio(text, voice_id):
+                    progress["cached"] += 1
+                elif await elevenlabs_client.text_to_speech(text, user_id=None, voice_id=voice_id):
+                    progress["generated"] += 1
+                else:
+                    progress["failed"] += 1
+                finished = progress["cached"] + progress["generated"] + progress["failed"]
+                if finished % 25 == 0:
+                    logger.info("TTS pre-warm progress", finished=finished, total=progress["total"])
+
+        try:
+            await asyncio.gather(*(warm_one(text, voice) for voice in voices for text in phrases))
+        finally:
+            progress.update(state="idle", finished_at=time.time())
+        logger.info(
+            "TTS pre-warm finished",
+            cached=progress["cached"], generated=progress["generated"], failed=progress["failed"],
+            seconds=round(progress["finished_at"] - progress["started_at"], 1),
+        )
+
+
+tts_warmer = TTSWarmer()
+
+metrics.callback(
+    "tts_prewarm_phrases", "TTS pre-warm progress for the current or last run", ["state"],
+    lambda: {
+        (state,): tts_warmer.progress[state]
+        for state in ("total", "cached", "generated", "failed")
+    },
+)
@@ -0,0 +1,214 @@
+"""Size-bounded on-disk store for generated speech with an SQLite manifest"""
+from typing import Optional
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import structlog
+
+from backend.config import settings
+
+logger = structlog.get_logger()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audio (
+    key TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS audio_last_access ON audio (last_access);
+CREATE INDEX IF NOT EXISTS audio_hits ON audio (hits, last_access);
+"""
+
+# Partial files younger than this may still be written by another worker
+_STALE_PART_SECONDS = 600
+
+_EVICTION_ORDER = {
+    "lru": "last_access",
+    "lfu": "hits, last_access",
+}
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AudioStore:
+    """Audio files in one directory, indexed by a persistent manifest.
+
+    Each entry maps a request key (hash of text and voice) to its file,
+    the SHA-256 of the file's bytes, its size and access statistics. When
+    the total size passes ``max_bytes`` the least recently (``lru``) or
+    least frequently (``lfu``) used files are removed until it is back
+    under 90% of the cap. The manifest lives outside the served directory
+    and is shared by every worker on the host (SQLite WAL mode).
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        manifest_path: str,
+        max_bytes: int,
+        policy: str = "lru",
+    ):
+        if policy not in _EVICTION_ORDER:
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.policy = policy
+        os.makedirs(directory, exist_ok=True)
+        os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(manifest_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self.evicted = 0
+        # Totals as of the last refresh_stats (for metrics, read without I/O)
+        self.stored_bytes = 0
+        self.stored_files = 0
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Filename for a key, recording the access; None if not stored"""
+        with self._lock:
+            row = self._db.execute("SELECT filename FROM audio WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if not os.path.exists(os.path.join(self.directory, row[0])):
+                self._db.execute("DELETE FROM audio WHERE key = ?", (key,))
+                return None
+            self._db.execute(
+                "UPDATE audio SET last_access = ?, hits = hits + 1 WHERE key = ?",
+                (time.time(), key),
+            )
+            return row[0]
+
+    def contains(self, key: str) -> bool:
+        """Whether a key is stored (does not count as an access)"""
+        with self._lock:
+            row = self._db.execute("SELECT 1 FROM audio WHERE key = ?", (key,)).fetchone()
+        return row is not None
+
+    def add(self, key: str) -> str:
+        """Index the file just written at ``path_for(key)`` and enforce the cap"""
+        filename = os.path.basename(self.path_for(key))
+        path = os.path.join(self.directory, filename)
+        content_hash = file_digest(path)
+        size = os.path.getsize(path)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO audio (key, filename, content_hash, size, created_at, last_access, hits)"
+                " VALUES (?, ?, ?, ?, ?, ?, 1)",
+                (key, filename, content_hash, size, now, now),
+            )
+            self._evict(protect=key)
+        return filename
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM audio").fetchone()[0]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM audio").fetchone()[0]
+
+    def refresh_stats(self):
+        """Re-read ``stored_bytes`` and ``stored_files`` from the shared manifest (blocking)"""
+        with self._lock:
+            self.stored_bytes, self.stored_files = self._db.execute(
+                "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM audio"
+            ).fetchone()
+
+    def _evict(self, protect: Optional[str] = None):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM audio").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        rows = self._db.execute(
+            f"SELECT key, filename, size FROM audio ORDER BY {_EVICTION_ORDER[self.policy]}"
+        )
+        victims = []
+        for key, filename, size in rows:
+            if total <= target:
+                break
+            if key == protect:
+                continue
+            victims.append((key, filename))
+            total -= size
+        rows.close()
+        for key, filename in victims:
+            try:
+                os.remove(os.path.join(self.directory, filename))
+            except FileNotFoundError:
+                pass
+            self._db.execute("DELETE FROM audio WHERE key = ?", (key,))
+        self.evicted += len(victims)
+        if victims:
+            logger.info("Audio cache evicted", files=len(victims), policy=self.policy, total_bytes=total)
+
+    def rebuild(self):
+        """Reconcile the manifest with the directory (run at startup)
+
+        Entries whose file is gone are dropped, files without an entry are
+        indexed (their mtime standing in for the last access), abandoned
+        partial files are removed, and the size cap is applied.
+        """
+        started = time.perf_counter()
+        on_disk = {}
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            if entry.name.endswith(".part"):
+                if time.time() - entry.stat().st_mtime > _STALE_PART_SECONDS:
+                    os.remove(entry.path)
+            elif entry.name.endswith(".mp3"):
+                on_disk[entry.name] = entry
+
+        with self._lock:
+            self._db.execute("BEGIN")
+            indexed = dict(self._db.execute("SELECT filename, key FROM audio"))
+            missing = [key for filename, key in indexed.items() if filename not in on_disk]
+            self._db.executemany("DELETE FROM audio WHERE key = ?", [(key,) for key in missing])
+
+            adopted = 0
+            for filename, entry in on_disk.items():
+                if filename in indexed:
+                    continue
+                stat = entry.stat()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO audio (key, filename, content_hash, size, created_at, last_access, hits)"
+                    " VALUES (?, ?, ?, ?, ?, ?, 0)",
+                    (filename[:-len(".mp3")], filename, file_digest(entry.path),
+                     stat.st_size, stat.st_mtime, stat.st_mtime),
+                )
+                adopted += 1
+            self._evict()
+            self._db.execute("COMMIT")
+
+        logger.info(
+            "Audio cache manifest rebuilt",
+            files=len(on_disk), dropped=len(missing), adopted=adopted,
+            seconds=round(time.perf_counter() - started, 3),
+        )
+
+
+audio_store = AudioStore(
+    settings.AUDIO_CACHE_DIR,
+    settings.AUDIO_CACHE_MANIFEST,
+    settings.AUDIO_CACHE_MAX_MB * 1024 * 1024,
+    settings.AUDIO_CACHE_EVICTION,
+)
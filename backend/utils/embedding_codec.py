@@ -0,0 +1,56 @@
+"""Compact binary encoding for gesture embeddings"""
+from typing import Optional, Sequence, Tuple, Union
+import struct
+import numpy as np
+
+MAGIC = b"SE"
+VERSION = 1
+
+DTYPE_FLOAT32 = 1
+DTYPE_INT8 = 2
+
+# magic, version, dtype code, dimension, int8 scale (1.0 for float32)
+_HEADER = struct.Struct("<2sBBIf")
+HEADER_SIZE = _HEADER.size  # 12 bytes keeps the payload 4-byte aligned
+
+
+def encode_embedding(values: Union[Sequence[float], np.ndarray], quantize: bool = False) -> bytes:
+    """Pack an embedding as little-endian float32 (or symmetric int8) bytes"""
+    vector = np.asarray(values, dtype=np.float32).ravel()
+
+    if quantize:
+        peak = float(np.abs(vector).max()) if vector.size else 0.0
+        scale = peak / 127.0 if peak > 0 else 1.0
+        payload = np.clip(np.round(vector / scale), -127, 127).astype(np.int8)
+        return _HEADER.pack(MAGIC, VERSION, DTYPE_INT8, vector.size, scale) + payload.tobytes()
+
+    return _HEADER.pack(MAGIC, VERSION, DTYPE_FLOAT32, vector.size, 1.0) + vector.astype("<f4", copy=False).tobytes()
+
+
+def read_header(blob: bytes) -> Tuple[int, int, int, float]:
+    """Return (version, dtype code, dimension, scale) for an encoded embedding"""
+    magic, version, dtype_code, dim, scale = _HEADER.unpack_from(blob)
+    if magic != MAGIC:
+        raise ValueError("Not an encoded embedding")
+    if version != VERSION:
+        raise ValueError(f"Unsupported embedding version {version}")
+    return version, dtype_code, dim, scale
+
+
+def decode_embedding(blob: Optional[bytes], dequantize: bool = True) -> Optional[np.ndarray]:
+    """Decode an embedding into a NumPy array
+
+    float32 payloads are returned as a read-only view over ``blob`` (no
+    copy). int8 payloads are scaled back to float32 unless ``dequantize`` is
+    False, in which case the raw int8 view is returned.
+    """
+    if blob is None:
+        return None
+    _, dtype_code, dim, scale = read_header(blob)
+
+    if dtype_code == DTYPE_FLOAT32:
+        return np.frombuffer(blob, dtype="<f4", count=dim, offset=HEADER_SIZE)
+    if dtype_code == DTYPE_INT8:
+        raw = np.frombuffer(blob, dtype=np.int8, count=dim, offset=HEADER_SIZE)
+        return raw.astype(np.float32) * np.float32(scale) if dequantize else raw
+    raise ValueError(f"Unknown embedding dtype {dtype_code}")
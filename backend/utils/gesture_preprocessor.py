@@ -1,10 +1,40 @@
 """Gesture data preprocessing utilities"""
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Sequence, Tuple
 import numpy as np
 import structlog
 
+from backend.utils.keypoint_features import as_keypoint_array, keypoint_descriptor, DESCRIPTOR_SIZE
+
 logger = structlog.get_logger()
 
+# Raw field -> (normalized field, default) for the numeric columns of each type
+RAW_NUMERIC_FIELDS = {
+    "blink": [("duration", "duration_ms", 0), ("intensity", "intensity", 0.5), ("timestamp", "timestamp", 0)],
+    "tap": [("count", "tap_count", 1), ("interval", "interval_ms", 0), ("pressure", "pressure", 0.5), ("timestamp", "timestamp", 0)],
+    "micro_gesture": [("confidence", "confidence", 0.0), ("timestamp", "timestamp", 0)],
+}
+
+# Per-type (normalized field, default) numeric columns read back out of normalized dicts
+NORMALIZED_NUMERIC_FIELDS = {
+    gesture_type: [(normalized, default) for _, normalized, default in fields]
+    for gesture_type, fields in RAW_NUMERIC_FIELDS.items()
+}
+
+
+def _as_float(value, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float(default)
+
+
+def _numeric_column(items: Sequence[Dict[str, Any]], key: str, default: float) -> np.ndarray:
+    return np.fromiter(
+        (_as_float(item.get(key, default), default) for item in items),
+        dtype=np.float32,
+        count=len(items),
+    )
+
 
 class GesturePreprocessor:
     """Preprocess and normalize gesture data"""
@@ -85,12 +115,123 @@ class GesturePreprocessor:
                 normalized_data.get("pressure", 0.5),
             ]
         elif gesture_type == "micro_gesture":
+            keypoints = as_keypoint_array(normalized_data.get("keypoints", []))
             features = [
                 normalized_data.get("confidence", 0.0),
-                len(normalized_data.get("keypoints", [])),
-            ]
+                keypoints.shape[0],
+            ] + keypoint_descriptor(keypoints).tolist()
         
         return features
+    
+    @staticmethod
+    def normalize_batch(gesture_type: str, raw_items: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Normalize many raw gestures of one type into columnar arrays
+        
+        Returns the same fields as the per-item normalizers, one array per
+        field (float32 for numeric fields).
+        """
+        columns = {
+            normalized: _numeric_column(raw_items, raw, default)
+            for raw, normalized, default in RAW_NUMERIC_FIELDS.get(gesture_type, [])
+        }
+        if gesture_type == "blink":
+            columns["eye"] = np.array([item.get("eye", "both") for item in raw_items], dtype=object)
+        elif gesture_type == "tap":
+            columns["location"] = np.array([item.get("location", "unknown") for item in raw_items], dtype=object)
+        elif gesture_type == "micro_gesture":
+            columns["gesture_name"] = np.array([item.get("name", "unknown") for item in raw_items], dtype=object)
+            columns["keypoints"] = _object_column([item.get("keypoints", []) for item in raw_items])
+        return columns
+    
+    @staticmethod
+    def columns_from_normalized(gesture_type: str, normalized_items: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Turn already-normalized dicts of one type into columnar arrays"""
+        columns = {
+            key: _numeric_column(normalized_items, key, default)
+            for key, default in NORMALIZED_NUMERIC_FIELDS.get(gesture_type, [])
+        }
+        if gesture_type == "blink":
+            columns["eye"] = np.array([item.get("eye", "both") for item in normalized_items], dtype=object)
+        elif gesture_type == "micro_gesture":
+            columns["keypoints"] = _object_column([item.get("keypoints", []) for item in normalized_items])
+        return columns
+    
+    @staticmethod
+    def feature_matrix(gesture_type: str, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Build the float32 feature matrix for one type from normalized columns
+        
+        Row ``i`` equals ``extract_features`` for item ``i``.
+        """
+        if gesture_type == "blink":
+            return np.column_stack([
+                columns["duration_ms"] / np.float32(1000.0),
+                columns["intensity"],
+                np.where(columns["eye"] == "both", 1.0, 0.5),
+            ]).astype(np.float32, copy=False)
+        if gesture_type == "tap":
+            return np.column_stack([
+                columns["tap_count"],
+                columns["interval_ms"] / np.float32(1000.0),
+                columns["pressure"],
+            ]).astype(np.float32, copy=False)
+        if gesture_type == "micro_gesture":
+            size = len(columns["keypoints"])
+            matrix = np.empty((size, 2 + DESCRIPTOR_SIZE), dtype=np.float32)
+            matrix[:, 0] = columns["confidence"]
+            for row, keypoints in enumerate(columns["keypoints"]):
+                keypoints = as_keypoint_array(keypoints)
+                matrix[row, 1] = keypoints.shape[0]
+                matrix[row, 2:] = keypoint_descriptor(keypoints)
+            return matrix
+        
+        size = len(next(iter(columns.values()))) if columns else 0
+        return np.zeros((size, 0), dtype=np.float32)
+    
+    @staticmethod
+    def extract_features_batch(
+        gesture_types: Sequence[str],
+        normalized_items: Sequence[Dict[str, Any]]
+    ) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Extract features for many normalized gestures of mixed types
+        
+        Returns ``{gesture_type: (indices, matrix)}`` where ``indices`` are
+        positions in the input and ``matrix`` is float32 with one row each.
+        """
+        return GesturePreprocessor._grouped(
+            gesture_types,
+            normalized_items,
+            GesturePreprocessor.columns_from_normalized,
+        )
+    
+    @staticmethod
+    def preprocess_batch(
+        gesture_types: Sequence[str],
+        raw_items: Sequence[Dict[str, Any]]
+    ) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Normalize and extract features for many raw gestures in one pass"""
+        return GesturePreprocessor._grouped(
+            gesture_types,
+            raw_items,
+            GesturePreprocessor.normalize_batch,
+        )
+    
+    @staticmethod
+    def _grouped(gesture_types, items, to_columns) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        types = np.asarray(gesture_types, dtype=object)
+        grouped = {}
+        for gesture_type in dict.fromkeys(gesture_types):
+            indices = np.flatnonzero(types == gesture_type)
+            group = [items[i] or {} for i in indices]
+            columns = to_columns(gesture_type, group)
+            grouped[gesture_type] = (indices, GesturePreprocessor.feature_matrix(gesture_type, columns))
+        return grouped
+
+
+def _object_column(values: List[Any]) -> np.ndarray:
+    # np.array() would try to broadcast nested lists; fill an object array instead
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
 
 
 gesture_preprocessor = GesturePreprocessor()
@@ -0,0 +1,87 @@
+"""Bounded window of concurrently running jobs with explicit back-pressure"""
+import asyncio
+from typing import Awaitable, Callable, Optional, Set, Tuple
+import structlog
+
+logger = structlog.get_logger()
+
+Job = Callable[[], Awaitable[None]]
+RejectCallback = Callable[[str], Awaitable[None]]
+
+POLICIES = ("reject", "drop", "coalesce")
+
+
+class InFlightWindow:
+    """Run up to ``limit`` jobs at once; never queue more than one extra.
+
+    When the window is full, ``policy`` decides what happens to a new job:
+
+    * ``reject``: the job is refused and its ``on_rejected("window_full")``
+      is awaited (the caller replies with an error code)
+    * ``drop``: the job is refused with reason ``"dropped"``
+    * ``coalesce``: the job waits in a single pending slot, replacing (and
+      rejecting with ``"coalesced"``) whatever was waiting there
+
+    Memory per connection is therefore bounded by ``limit + 1`` jobs.
+    """
+
+    def __init__(self, limit: int, policy: str = "reject", name: str = "window"):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown back-pressure policy: {policy}")
+        self.limit = max(1, limit)
+        self.policy = policy
+        self.name = name
+        self._running: Set[asyncio.Task] = set()
+        self._pending: Optional[Tuple[Job, RejectCallback]] = None
+        self._callbacks: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._running)
+
+    def submit(self, job: Job, on_rejected: RejectCallback) -> str:
+        """Start, park or refuse a job; returns ``started``, ``pending`` or the refusal reason"""
+        if len(self._running) < self.limit:
+            self._start(job)
+            return "started"
+
+        if self.policy == "coalesce":
+            if self._pending is not None:
+                self._notify(self._pending[1], "coalesced")
+            self._pending = (job, on_rejected)
+            return "pending"
+
+        reason = "window_full" if self.policy == "reject" else "dropped"
+        logger.warning("In-flight window full", window=self.name, policy=self.policy)
+        self._notify(on_rejected, reason)
+        return reason
+
+    def _start(self, job: Job):
+        task = asyncio.ensure_future(job())
+        self._running.add(task)
+        task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task):
+        self._running.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("In-flight job failed", window=self.name, error=str(task.exception()))
+        if self._pending is not None and len(self._running) < self.limit:
+            job, _ = self._pending
+            self._pending = None
+            self._start(job)
+
+    def _notify(self, on_rejected: RejectCallback, reason: str):
+        task = asyncio.ensure_future(on_rejected(reason))
+        self._callbacks.add(task)
+        task.add_done_callback(self._callbacks.discard)
+
+    async def drain(self):
+        """Wait for running jobs (and the parked one) to finish"""
+        while self._running or self._callbacks:
+            await asyncio.gather(*self._running, *self._callbacks, return_exceptions=True)
+
+    def cancel(self):
+        """Cancel everything still running"""
+        if self._pending is not None:
+            self._pending = None
+        for task in list(self._running):
+            task.cancel()
@@ -0,0 +1,117 @@
+"""Fixed-length descriptors for micro-gesture keypoint sequences"""
+from functools import lru_cache
+from typing import Any
+import numpy as np
+
+# Wrist and the five fingertips of a 21-point (MediaPipe-style) hand
+HAND_ANCHORS = (0, 4, 8, 12, 16, 20)
+N_ANCHORS = len(HAND_ANCHORS)
+N_PAIRS = N_ANCHORS * (N_ANCHORS - 1) // 2
+
+# Layout: centroid displacement (3), centroid speed mean/std/max (3),
+# centroid path length (1), mean per-point speed (1),
+# mean anchor distances (N_PAIRS), last-minus-first anchor distances (N_PAIRS)
+DESCRIPTOR_SIZE = 8 + 2 * N_PAIRS
+
+_EPS = np.float32(1e-6)
+
+
+def as_keypoint_array(keypoints: Any) -> np.ndarray:
+    """Coerce keypoints into a float32 ``(frames, points, 3)`` array
+
+    Accepts an ndarray, nested lists of ``[x, y(, z)]`` (one frame or a
+    sequence of frames) or ``{"x", "y", "z"}`` dicts. ``None`` and empty
+    input give an empty array; anything else that is not shaped like
+    keypoints raises ``ValueError``.
+    """
+    if keypoints is None:
+        return np.zeros((0, 0, 3), dtype=np.float32)
+
+    if not isinstance(keypoints, np.ndarray):
+        if not isinstance(keypoints, (list, tuple)):
+            raise ValueError(f"keypoints must be a list, not {type(keypoints).__name__}")
+        if not keypoints:
+            return np.zeros((0, 0, 3), dtype=np.float32)
+        if isinstance(keypoints[0], dict):
+            keypoints = [keypoints]
+        frames = []
+        for frame in keypoints:
+            if not isinstance(frame, (list, tuple)):
+                raise ValueError("keypoints must be a list of points or a list of frames")
+            if frame and isinstance(frame[0], dict):
+                if not all(isinstance(p, dict) for p in frame):
+                    raise ValueError("keypoint frames must not mix dicts and lists")
+                frame = [(p.get("x", 0.0), p.get("y", 0.0), p.get("z", 0.0)) for p in frame]
+            frames.append(frame)
+        try:
+            keypoints = np.asarray(frames, dtype=np.float32)
+        except (TypeError, ValueError):
+            raise ValueError("keypoints must be numbers with the same number of points in every frame")
+    else:
+        keypoints = keypoints.astype(np.float32, copy=False)
+
+    if keypoints.ndim == 2:
+        keypoints = keypoints[None]
+    if keypoints.ndim != 3 or keypoints.shape[2] < 2:
+        raise ValueError(f"keypoints must have shape (frames, points, 2 or 3), got {keypoints.shape}")
+
+    dims = keypoints.shape[2]
+    if dims == 3:
+        return keypoints
+    if dims > 3:
+        return keypoints[:, :, :3]
+    padded = np.zeros(keypoints.shape[:2] + (3,), dtype=np.float32)
+    padded[:, :, :2] = keypoints
+    return padded
+
+
+@lru_cache(maxsize=64)
+def _anchor_layout(n_points: int):
+    if n_points == 21:
+        anchors = np.array(HAND_ANCHORS)
+    else:
+        anchors = np.unique(np.linspace(0, n_points - 1, min(n_points, N_ANCHORS)).round().astype(np.intp))
+    left, right = np.triu_indices(len(anchors), k=1)
+    return anchors[left], anchors[right]
+
+
+def keypoint_descriptor(keypoints: Any) -> np.ndarray:
+    """Compute a float32 descriptor of length ``DESCRIPTOR_SIZE``
+
+    Positions are expressed relative to the first frame's centroid and
+    scaled by the mean point spread, so the descriptor is invariant to
+    where the hand is in frame and how far it is from the camera.
+    """
+    descriptor = np.zeros(DESCRIPTOR_SIZE, dtype=np.float32)
+    K = as_keypoint_array(keypoints)
+    if K.size == 0:
+        return descriptor
+
+    frames, points, _ = K.shape
+    centroids = K.mean(axis=1)
+    centered = K - centroids[:, None, :]
+    spread = np.sqrt(np.einsum("tpd,tpd->t", centered, centered) / points)
+    scale = max(float(spread.mean()), float(_EPS))
+
+    track = (centroids - centroids[0]) / scale
+    descriptor[0:3] = track[-1]
+
+    if frames > 1:
+        speed = np.linalg.norm(np.diff(track, axis=0), axis=1)
+        descriptor[3] = speed.mean()
+        descriptor[4] = speed.std()
+        descriptor[5] = speed.max()
+        descriptor[6] = speed.sum()
+        point_steps = np.diff(K, axis=0)
+        descriptor[7] = np.sqrt(np.einsum("tpd,tpd->tp", point_steps, point_steps)).mean() / scale
+
+    if points > 1:
+        left, right = _anchor_layout(points)
+        pair_vectors = K[:, left] - K[:, right]
+        distances = np.sqrt(np.einsum("tkd,tkd->tk", pair_vectors, pair_vectors))
+        distances /= np.maximum(spread, _EPS)[:, None]
+        n_pairs = distances.shape[1]
+        descriptor[8:8 + n_pairs] = distances.mean(axis=0)
+        descriptor[8 + N_PAIRS:8 + N_PAIRS + n_pairs] = distances[-1] - distances[0]
+
+    return descriptor
@@ -0,0 +1,181 @@
+"""Local nearest-centroid intention classifier over gesture feature vectors"""
+from typing import Dict, Any, List, Optional, Sequence
+import numpy as np
+import structlog
+
+from backend.config import settings
+
+logger = structlog.get_logger()
+
+
+class _CentroidModel:
+    """Running per-intention feature sums for a single gesture type"""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.labels: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.counts = np.zeros(0, dtype=np.float64)
+        self.sums = np.zeros((0, dim), dtype=np.float64)
+        self.sumsq = np.zeros((0, dim), dtype=np.float64)
+
+    def _row(self, label: str) -> int:
+        row = self.index.get(label)
+        if row is None:
+            row = len(self.labels)
+            self.labels.append(label)
+            self.index[label] = row
+            self.counts = np.append(self.counts, 0.0)
+            self.sums = np.vstack([self.sums, np.zeros((1, self.dim))])
+            self.sumsq = np.vstack([self.sumsq, np.zeros((1, self.dim))])
+        return row
+
+    def add(self, x: np.ndarray, label: str):
+        row = self._row(label)
+        self.counts[row] += 1
+        self.sums[row] += x
+        self.sumsq[row] += x * x
+
+    def add_many(self, X: np.ndarray, labels: Sequence[str]):
+        rows = np.fromiter((self._row(label) for label in labels), dtype=np.intp, count=len(labels))
+        np.add.at(self.counts, rows, 1.0)
+        np.add.at(self.sums, rows, X)
+        np.add.at(self.sumsq, rows, X * X)
+
+    def predict(self, x: np.ndarray, min_samples: int, max_distance: float):
+        eligible = self.counts >= min_samples
+        if eligible.sum() < 2:
+            return None  # Nothing to tell the answer apart from yet
+
+        counts = self.counts[eligible][:, None]
+        centroids = self.sums[eligible] / counts
+        # Pooled within-class variance, floored so constant features don't explode
+        within = (self.sumsq[eligible] - counts * centroids ** 2).sum(axis=0)
+        variance = np.maximum(within / max(counts.sum() - len(counts), 1.0), 1e-4)
+
+        # RMS distance in within-class standard deviations
+        distance = np.sqrt((((x - centroids) ** 2) / variance).sum(axis=1) / self.dim)
+        best, second = np.argsort(distance)[:2]
+        if distance[best] > max_distance:
+            return None  # Outside everything seen so far
+
+        # Margin over the runner-up: 0 when equidistant, 1 at the best centroid
+        confidence = 1.0 - distance[best] / max(distance[second], 1e-12)
+        labels = [label for label, ok in zip(self.labels, eligible) if ok]
+        return labels[best], float(confidence)
+
+
+class LocalIntentClassifier:
+    """Classify gestures locally when history makes the answer obvious.
+
+    Centroids are learned from confident Cerebras classifications (online)
+    and from labelled gesture history (at startup). Confidence is the
+    margin of the nearest centroid over the runner-up, so nothing is
+    answered locally until at least two intentions have enough samples.
+    Predictions below ``LOCAL_CLASSIFIER_THRESHOLD`` are rejected so the
+    caller falls back to the LLM.
+    """
+
+    def __init__(self):
+        self.enabled = settings.LOCAL_CLASSIFIER_ENABLED
+        self.threshold = settings.LOCAL_CLASSIFIER_THRESHOLD
+        self.learn_confidence = settings.LOCAL_CLASSIFIER_LEARN_CONFIDENCE
+        self.min_samples = settings.LOCAL_CLASSIFIER_MIN_SAMPLES
+        self.max_distance = settings.LOCAL_CLASSIFIER_MAX_DISTANCE
+        self.models: Dict[str, _CentroidModel] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _model(self, gesture_type: str, dim: int) -> Optional[_CentroidModel]:
+        model = self.models.get(gesture_type)
+        if model is None:
+            model = self.models[gesture_type] = _CentroidModel(dim)
+        if model.dim != dim:
+            return None
+        return model
+
+    def predict(self, gesture_type: str, features: Sequence[float]) -> Optional[Dict[str, Any]]:
+        """Return a classification if confident enough, otherwise None"""
+        if not self.enabled or not len(features):
+            return None
+
+        model = self.models.get(gesture_type)
+        x = np.asarray(features, dtype=np.float64)
+        prediction = None
+        if model is not None and model.dim == x.shape[0]:
+            prediction = model.predict(x, self.min_samples, self.max_distance)
+
+        if prediction is None or prediction[1] < self.threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        intention, confidence = prediction
+        logger.debug("Local classification", gesture_type=gesture_type, intention=intention)
+        return {"intention": intention, "confidence": confidence, "source": "local"}
+
+    def observe(self, gesture_type: str, features: Sequence[float], classification: Dict[str, Any]):
+        """Learn from a remote classification if it was confident"""
+        intention = classification.get("intention")
+        if (
+            not self.enabled
+            or not len(features)
+            or not intention
+            or intention == "unknown"
+            or classification.get("confidence", 0.0) < self.learn_confidence
+        ):
+            return
+
+        x = np.asarray(features, dtype=np.float64)
+        model = self._model(gesture_type, x.shape[0])
+        if model is not None:
+            model.add(x, intention)
+
+    def fit(self, gesture_type: str, X: np.ndarray, labels: Sequence[str]):
+        """Add a block of labelled feature vectors"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or not len(X):
+            return
+        model = self._model(gesture_type, X.shape[1])
+        if model is not None:
+            model.add_many(X, labels)
+
+    def fit_from_history(self, db, limit: int = 50000):
+        """Seed centroids from confidently classified gestures in the database"""
+        from backend.models.gesture import Gesture
+        from backend.utils.embedding_codec import decode_embedding
+
+        rows = db.query(
+            Gesture.gesture_type, Gesture.embedding_blob, Gesture.embedding, Gesture.intention
+        ).filter(
+            Gesture.confidence_score >= self.learn_confidence,
+            Gesture.intention.isnot(None),
+            Gesture.intention != "unknown",
+            (Gesture.embedding_blob.isnot(None)) | (Gesture.embedding.isnot(None)),
+        ).order_by(Gesture.created_at.desc()).limit(limit).all()
+
+        grouped: Dict[tuple, List] = {}
+        for gesture_type, blob, embedding, intention in rows:
+            vector = decode_embedding(blob) if blob is not None else embedding
+            if vector is not None and len(vector):
+                grouped.setdefault((gesture_type, len(vector)), []).append((vector, intention))
+
+        for (gesture_type, _), items in grouped.items():
+            X = np.vstack([vector for vector, _ in items]).astype(np.float64)
+            self.fit(gesture_type, X, [intention for _, intention in items])
+
+        logger.info("Local classifier seeded", samples=len(rows), gesture_types=len(self.models))
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and per-type class counts"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "classes": {
+                gesture_type: dict(zip(model.labels, model.counts.astype(int).tolist()))
+                for gesture_type, model in self.models.items()
+            },
+        }
+
+
+local_classifier = LocalIntentClassifier()
@@ -0,0 +1,106 @@
+"""Gather concurrent requests into small batches for a single upstream call"""
+import asyncio
+from typing import Awaitable, Callable, Generic, List, Optional, Tuple, TypeVar
+import structlog
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """Collect items submitted within ``window_ms`` (up to ``max_batch_size``)
+    and resolve each caller with its slot of one ``handler(items)`` call.
+
+    ``handler`` must return one result per item, in order. If it raises,
+    every caller in that batch receives the exception. With ``max_pending``
+    set, ``submit`` waits while that many items are already queued or in
+    flight.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[T]], Awaitable[List[R]]],
+        max_batch_size: int = 16,
+        window_ms: float = 5.0,
+        name: str = "batch",
+        max_pending: Optional[int] = None,
+    ):
+        self.handler = handler
+        self.max_batch_size = max(1, max_batch_size)
+        self.window = max(0.0, window_ms) / 1000.0
+        self.name = name
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self._slots = asyncio.Semaphore(max_pending) if max_pending else None
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: T) -> R:
+        """Queue an item and wait for its result"""
+        if self._slots is None:
+            return await self._submit(item)
+        async with self._slots:
+            return await self._submit(item)
+
+    async def _submit(self, item: T) -> R:
+        if self.max_batch_size == 1:
+            self.batches += 1
+            self.items += 1
+            return (await self.handler([item]))[0]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[T, asyncio.Future]]):
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self.handler([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"{self.name} handler returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            logger.error("Batch failed", batcher=self.name, size=len(batch), error=str(e))
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def drain(self):
+        """Send whatever is queued and wait for every in-flight batch"""
+        self._flush()
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        """Batch counters"""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+        }
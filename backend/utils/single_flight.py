@@ -0,0 +1,61 @@
+"""Keyed single-flight: concurrent identical calls share one execution"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, TypeVar
+
+from backend.metrics import metrics
+
+R = TypeVar("R")
+
+
+class SingleFlight(Generic[R]):
+    """Run at most one call per key at a time; concurrent callers share it.
+
+    The first caller for a key starts ``fn()`` as a task; callers arriving
+    before it finishes await the same task and get its result or its
+    exception. A caller being cancelled does not cancel the shared call.
+    Nothing is kept after the call finishes, so caching is up to ``fn``.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.shared = 0
+        _flights.append(self)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[R]]) -> R:
+        task = self._calls.get(key)
+        if task is None:
+            self.leaders += 1
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+_flights: List[SingleFlight] = []
+
+metrics.callback(
+    "single_flight_calls_total", "Calls that started (leader) or joined (shared) an in-flight call",
+    ["name", "role"],
+    lambda: {
+        key: value
+        for flight in _flights
+        for key, value in (((flight.name, "leader"), flight.leaders), ((flight.name, "shared"), flight.shared))
+    },
+    type_name="counter",
+)
@@ -0,0 +1,137 @@
+"""Dependency-graph scheduler for async pipeline stages"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set
+import structlog
+
+logger = structlog.get_logger()
+
+# Strong references to detached stage tasks so they are not garbage collected
+# before they finish (asyncio only keeps weak references to running tasks).
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def spawn_background(coro: Awaitable[Any], name: Optional[str] = None) -> asyncio.Task:
+    """Run a coroutine off the response path, keeping a reference until done"""
+    task = asyncio.ensure_future(coro)
+    if name:
+        task.set_name(name)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_done)
+    return task
+
+
+def _background_done(task: asyncio.Task):
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(
+            "Background stage failed",
+            task=task.get_name(),
+            error=str(task.exception()),
+        )
+
+
+async def drain_background(timeout: float = 10.0):
+    """Wait for outstanding background stages (used on shutdown)"""
+    if not _background_tasks:
+        return
+    logger.info("Draining background stages", pending=len(_background_tasks))
+    _, pending = await asyncio.wait(set(_background_tasks), timeout=timeout)
+    for task in pending:
+        task.cancel()
+
+
+class Stage:
+    """A named pipeline step and the stages it depends on"""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Awaitable[Any]],
+        depends_on: Iterable[str] = (),
+        background: bool = False,
+    ):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+        self.background = background
+
+
+class StageScheduler:
+    """Run pipeline stages as soon as their dependencies have resolved.
+
+    Each stage is an async callable receiving its dependencies' results as
+    keyword arguments. Independent stages run concurrently; ``background``
+    stages are started once their inputs are ready but are not awaited by
+    :meth:`run`. ``observer`` is called with ``(stage_name, seconds)`` as
+    each stage (background ones included) finishes.
+    """
+
+    def __init__(self, observer: Optional[Callable[[str, float], None]] = None):
+        self._stages: Dict[str, Stage] = {}
+        self.observer = observer
+
+    def add(
+        self,
+        name: str,
+        func: Callable[..., Awaitable[Any]],
+        depends_on: Iterable[str] = (),
+        background: bool = False,
+    ) -> "StageScheduler":
+        """Register a stage"""
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        self._stages[name] = Stage(name, func, depends_on, background)
+        return self
+
+    async def _timed(self, name: str, coro: Awaitable[Any]) -> Any:
+        if self.observer is None:
+            return await coro
+        start = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            self.observer(name, time.perf_counter() - start)
+
+    def _validate(self):
+        for stage in self._stages.values():
+            for dep in stage.depends_on:
+                if dep not in self._stages:
+                    raise ValueError(f"Stage {stage.name} depends on unknown stage {dep}")
+                if self._stages[dep].background:
+                    raise ValueError(f"Stage {stage.name} cannot depend on background stage {dep}")
+
+    async def run(self) -> Dict[str, Any]:
+        """Execute the graph and return foreground stage results by name"""
+        self._validate()
+        results: Dict[str, Any] = {}
+        pending = dict(self._stages)
+        running: Dict[asyncio.Task, str] = {}
+
+        def launch_ready():
+            for name, stage in list(pending.items()):
+                if all(dep in results for dep in stage.depends_on):
+                    kwargs = {dep: results[dep] for dep in stage.depends_on}
+                    del pending[name]
+                    if stage.background:
+                        spawn_background(self._timed(name, stage.func(**kwargs)), name=name)
+                    else:
+                        task = asyncio.ensure_future(self._timed(name, stage.func(**kwargs)))
+                        running[task] = name
+
+        launch_ready()
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    results[name] = task.result()
+                launch_ready()
+        except BaseException:
+            for task in running:
+                task.cancel()
+            raise
+
+        if pending:
+            raise RuntimeError(f"Unresolvable stages: {sorted(pending)}")
+        return results
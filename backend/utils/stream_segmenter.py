@@ -0,0 +1,331 @@
+"""Incremental gesture segmentation over continuous per-frame signal streams"""
+from typing import Dict, Any, Optional, Tuple
+import math
+import time
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+# Upper bounds for client-supplied stream settings; the ring buffer is
+# preallocated from them, so they cap per-connection memory
+MAX_FPS = 240.0
+MAX_POINTS = 64
+
+
+class RingBuffer:
+    """Preallocated ring of timestamped frames
+
+    ``push`` writes in place (O(1), no allocation); ``since`` materializes a
+    chronological copy and is only meant to be called at gesture boundaries.
+    """
+
+    def __init__(self, capacity: int, shape: Tuple[int, ...] = (), dtype=np.float32):
+        self.capacity = capacity
+        self.data = np.zeros((capacity,) + tuple(shape), dtype=dtype)
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.count = 0  # Total frames ever pushed; doubles as a sequence number
+
+    def slot(self, t: float) -> np.ndarray:
+        """Claim the next row for timestamp ``t`` and return it for in-place writes
+
+        Only valid for buffers with a per-frame shape (rows are views).
+        """
+        idx = self.count % self.capacity
+        self.times[idx] = t
+        self.count += 1
+        return self.data[idx]
+
+    def push(self, t: float, value) -> int:
+        """Append a frame and return its sequence number"""
+        idx = self.count % self.capacity
+        self.times[idx] = t
+        self.data[idx] = value
+        self.count += 1
+        return self.count - 1
+
+    def row(self, seq: int) -> np.ndarray:
+        """View of a buffered frame by sequence number"""
+        return self.data[seq % self.capacity]
+
+    def since(self, seq: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Copy of (times, data) from ``seq`` to the newest frame, oldest first"""
+        start = max(seq, self.count - self.capacity)
+        indices = np.arange(start, self.count) % self.capacity
+        return self.times[indices], self.data[indices]
+
+
+def _frame_time(frame: Dict[str, Any]) -> float:
+    t = frame.get("t", frame.get("timestamp"))
+    return float(t) if t is not None else time.time() * 1000.0
+
+
+class SignalSegmenter:
+    """Base class: feed frames with ``push``, receive completed gestures"""
+
+    gesture_type = ""
+
+    def push(self, frame: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Consume one frame; return ``{"gesture_type", "data"}`` when a gesture completes"""
+        raise NotImplementedError
+
+    def flush(self) -> Optional[Dict[str, Any]]:
+        """Emit whatever gesture is pending at end of stream"""
+        return None
+
+    def _gesture(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {"gesture_type": self.gesture_type, "data": data}
+
+
+class BlinkSegmenter(SignalSegmenter):
+    """Detect blinks from eye openness (0 = closed, 1 = open) with hysteresis
+
+    Frames carry ``openness`` or per-eye ``left`` / ``right`` values.
+    """
+
+    gesture_type = "blink"
+
+    def __init__(
+        self,
+        capacity: int,
+        close_threshold: float = 0.3,
+        open_threshold: float = 0.5,
+        min_duration_ms: float = 50,
+        max_duration_ms: float = 2000,
+    ):
+        self.ring = RingBuffer(capacity, (2,))
+        self.close_threshold = close_threshold
+        self.open_threshold = open_threshold
+        self.min_duration_ms = min_duration_ms
+        self.max_duration_ms = max_duration_ms
+        self.start_seq = -1
+        self.start_t = 0.0
+
+    def push(self, frame: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        t = _frame_time(frame)
+        openness = frame.get("openness", 1.0)
+        left = float(frame.get("left", openness))
+        right = float(frame.get("right", openness))
+
+        row = self.ring.slot(t)
+        row[0] = left
+        row[1] = right
+        seq = self.ring.count - 1
+
+        if self.start_seq < 0:
+            if left < self.close_threshold or right < self.close_threshold:
+                self.start_seq = seq
+                self.start_t = t
+            return None
+
+        if left > self.open_threshold and right > self.open_threshold:
+            return self._close(t)
+        return None
+
+    def _close(self, t: float) -> Optional[Dict[str, Any]]:
+        start_seq, self.start_seq = self.start_seq, -1
+        duration = t - self.start_t
+        if not self.min_duration_ms <= duration <= self.max_duration_ms:
+            return None
+
+        _, values = self.ring.since(start_seq)
+        closed = values.min(axis=0)
+        left_closed = closed[0] < self.close_threshold
+        right_closed = closed[1] < self.close_threshold
+        eye = "both" if left_closed and right_closed else ("left" if left_closed else "right")
+        return self._gesture({
+            "duration": duration,
+            "intensity": float(1.0 - closed.min()),
+            "eye": eye,
+            "timestamp": self.start_t,
+        })
+
+
+class TapSegmenter(SignalSegmenter):
+    """Group pressure presses into multi-tap gestures
+
+    A gesture completes once no new press starts within ``group_gap_ms``
+    of the last release.
+    """
+
+    gesture_type = "tap"
+
+    def __init__(
+        self,
+        capacity: int,
+        press_threshold: float = 0.2,
+        release_threshold: float = 0.1,
+        group_gap_ms: float = 400,
+    ):
+        self.ring = RingBuffer(capacity)
+        self.press_threshold = press_threshold
+        self.release_threshold = release_threshold
+        self.group_gap_ms = group_gap_ms
+        self.pressed = False
+        self._reset_group()
+
+    def _reset_group(self):
+        self.count = 0
+        self.first_press_t = 0.0
+        self.last_press_t = 0.0
+        self.last_release_t = 0.0
+        self.peak = 0.0
+
+    def push(self, frame: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        t = _frame_time(frame)
+        pressure = float(frame.get("pressure", 0.0))
+        self.ring.push(t, pressure)
+
+        if self.pressed:
+            self.peak = max(self.peak, pressure)
+            if pressure < self.release_threshold:
+                self.pressed = False
+                self.last_release_t = t
+            return None
+
+        if pressure > self.press_threshold:
+            self.pressed = True
+            if self.count == 0:
+                self.first_press_t = t
+            self.count += 1
+            self.last_press_t = t
+            self.peak = max(self.peak, pressure)
+            return None
+
+        if self.count and t - self.last_release_t > self.group_gap_ms:
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[Dict[str, Any]]:
+        if not self.count:
+            return None
+        count = self.count
+        interval = (self.last_press_t - self.first_press_t) / (count - 1) if count > 1 else 0.0
+        gesture = self._gesture({
+            "count": count,
+            "interval": interval,
+            "pressure": self.peak,
+            "timestamp": self.first_press_t,
+        })
+        self._reset_group()
+        return gesture
+
+
+class MicroGestureSegmenter(SignalSegmenter):
+    """Cut keypoint streams into movements separated by stillness
+
+    Motion energy is the mean absolute keypoint displacement between
+    consecutive frames, computed into preallocated scratch buffers.
+    """
+
+    gesture_type = "micro_gesture"
+
+    def __init__(
+        self,
+        capacity: int,
+        points: int = 21,
+        motion_threshold: float = 0.01,
+        settle_frames: int = 5,
+        min_frames: int = 5,
+    ):
+        self.ring = RingBuffer(capacity, (points, 3))
+        self.points = points
+        self.motion_threshold = motion_threshold
+        self.settle_frames = settle_frames
+        self.min_frames = min_frames
+        self._scratch = np.zeros((points, 3), dtype=np.float32)
+        self.start_seq = -1
+        self.start_t = 0.0
+        self.still = 0
+        self.confidence_sum = 0.0
+        self.confidence_frames = 0
+
+    def push(self, frame: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Raises ``ValueError`` (before anything is buffered) for malformed keypoints"""
+        keypoints = frame.get("keypoints")
+        if keypoints is None:
+            return None
+        keypoints = self._check_keypoints(keypoints)
+
+        t = _frame_time(frame)
+        row = self.ring.slot(t)
+        # Slots are reused; clear z left over from an older frame
+        row[:] = 0
+        row[:, :keypoints.shape[1]] = keypoints
+        seq = self.ring.count - 1
+        if seq == 0:
+            return None
+
+        np.subtract(row, self.ring.row(seq - 1), out=self._scratch)
+        np.abs(self._scratch, out=self._scratch)
+        moving = self._scratch.mean() > self.motion_threshold
+
+        if self.start_seq < 0:
+            if moving:
+                self.start_seq = seq - 1
+                self.start_t = t
+                self.still = 0
+                self.confidence_sum = 0.0
+                self.confidence_frames = 0
+            else:
+                return None
+
+        self.confidence_sum += float(frame.get("confidence", 1.0))
+        self.confidence_frames += 1
+        self.still = 0 if moving else self.still + 1
+        if self.still >= self.settle_frames:
+            return self.flush()
+        return None
+
+    def _check_keypoints(self, keypoints) -> np.ndarray:
+        try:
+            keypoints = np.asarray(keypoints, dtype=np.float32)
+        except (TypeError, ValueError):
+            raise ValueError("keypoints must be lists of 2 or 3 numbers")
+        if keypoints.ndim != 2 or keypoints.shape[0] != self.points or keypoints.shape[1] not in (2, 3):
+            raise ValueError(f"keypoints must have shape ({self.points}, 2 or 3), got {keypoints.shape}")
+        if not np.isfinite(keypoints).all():
+            raise ValueError("keypoints must be finite")
+        return keypoints
+
+    def flush(self) -> Optional[Dict[str, Any]]:
+        if self.start_seq < 0:
+            return None
+        start_seq, self.start_seq = self.start_seq, -1
+        frames = self.ring.count - start_seq - self.still
+        if frames < self.min_frames:
+            return None
+
+        _, keypoints = self.ring.since(start_seq)
+        keypoints = keypoints[:len(keypoints) - self.still] if self.still else keypoints
+        return self._gesture({
+            "name": "stream",
+            "confidence": self.confidence_sum / max(self.confidence_frames, 1),
+            "keypoints": keypoints.tolist(),
+            "timestamp": self.start_t,
+        })
+
+
+def create_segmenter(
+    signal: str,
+    fps: float = 30,
+    buffer_seconds: float = 4.0,
+    points: int = 21,
+) -> Optional[SignalSegmenter]:
+    """Build the segmenter for a stream's signal type (None if unsupported)
+
+    Raises ``ValueError`` unless ``0 < fps <= MAX_FPS`` and
+    ``1 <= points <= MAX_POINTS``.
+    """
+    if not 0 < fps <= MAX_FPS:
+        raise ValueError(f"fps must be greater than 0 and at most {MAX_FPS:g}")
+    if not 1 <= points <= MAX_POINTS:
+        raise ValueError(f"points must be between 1 and {MAX_POINTS}")
+    capacity = max(8, int(math.ceil(fps * buffer_seconds)))
+    if signal == "blink":
+        return BlinkSegmenter(capacity)
+    if signal == "tap":
+        return TapSegmenter(capacity)
+    if signal == "micro_gesture":
+        return MicroGestureSegmenter(capacity, points=points)
+    return None
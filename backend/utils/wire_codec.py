@@ -0,0 +1,151 @@
+"""WebSocket wire formats: JSON text frames or MessagePack binary frames
+
+Clients pick a format with the WebSocket subprotocol header. In the
+MessagePack format, float arrays (keypoints, features) travel as a packed
+extension type and are decoded straight into NumPy arrays:
+
+    ext type 1: <dtype u8> <ndim u8> <reserved u16> <shape u32 * ndim> <little-endian data>
+
+Only float32 (dtype 1) is defined. Anything else in the message is plain
+MessagePack (maps, strings, numbers, lists).
+"""
+from typing import Any, Dict, Union
+import json
+import struct
+import numpy as np
+from fastapi import WebSocket
+
+try:
+    import msgpack
+except ImportError:  # MessagePack subprotocol unavailable; JSON still works
+    msgpack = None
+
+JSON_SUBPROTOCOL = "silentsignal.json.v1"
+MSGPACK_SUBPROTOCOL = "silentsignal.msgpack.v1"
+
+NDARRAY_EXT = 1
+DTYPE_FLOAT32 = 1
+
+_ARRAY_HEADER = struct.Struct("<BBH")
+
+
+def pack_array(array: np.ndarray) -> bytes:
+    """Encode an array as the ndarray extension payload (cast to float32)"""
+    array = np.ascontiguousarray(array, dtype="<f4")
+    shape = struct.pack(f"<{array.ndim}I", *array.shape)
+    return _ARRAY_HEADER.pack(DTYPE_FLOAT32, array.ndim, 0) + shape + array.tobytes()
+
+
+def unpack_array(payload: bytes) -> np.ndarray:
+    """Decode an ndarray extension payload into a read-only view (no copy)"""
+    dtype_code, ndim, _ = _ARRAY_HEADER.unpack_from(payload)
+    if dtype_code != DTYPE_FLOAT32:
+        raise ValueError(f"Unsupported array dtype code {dtype_code}")
+    shape = struct.unpack_from(f"<{ndim}I", payload, _ARRAY_HEADER.size)
+    offset = _ARRAY_HEADER.size + 4 * ndim
+    return np.frombuffer(payload, dtype="<f4", offset=offset).reshape(shape)
+
+
+def _ext_hook(code: int, payload: bytes):
+    if code == NDARRAY_EXT:
+        return unpack_array(payload)
+    return msgpack.ExtType(code, payload)
+
+
+def _default(value):
+    if isinstance(value, np.ndarray):
+        if np.issubdtype(value.dtype, np.floating):
+            return msgpack.ExtType(NDARRAY_EXT, pack_array(value))
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def to_builtin(value: Any) -> Any:
+    """Replace NumPy arrays and scalars with plain Python values (for JSON columns)"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {key: to_builtin(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_builtin(item) for item in value]
+    return value
+
+
+def _json_default(value):
+    if isinstance(value, (np.ndarray, np.generic)):
+        return to_builtin(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+class JsonCodec:
+    """Text frames carrying JSON"""
+
+    subprotocol = JSON_SUBPROTOCOL
+    binary = False
+
+    @staticmethod
+    def encode(payload: Dict[str, Any]) -> str:
+        return json.dumps(payload, default=_json_default, separators=(",", ":"), ensure_ascii=False)
+
+    @staticmethod
+    def decode(message: Union[str, bytes]) -> Any:
+        return json.loads(message)
+
+    async def receive(self, websocket: WebSocket) -> Any:
+        return self.decode(await websocket.receive_text())
+
+    async def send(self, websocket: WebSocket, payload: Dict[str, Any]):
+        await self.send_encoded(websocket, self.encode(payload))
+
+    @staticmethod
+    async def send_encoded(websocket: WebSocket, data: str):
+        await websocket.send_text(data)
+
+
+class MsgpackCodec:
+    """Binary frames carrying MessagePack with packed float32 arrays"""
+
+    subprotocol = MSGPACK_SUBPROTOCOL
+    binary = True
+
+    @staticmethod
+    def encode(payload: Dict[str, Any]) -> bytes:
+        return msgpack.packb(payload, default=_default, use_bin_type=True)
+
+    @staticmethod
+    def decode(message: bytes) -> Any:
+        return msgpack.unpackb(message, ext_hook=_ext_hook, raw=False)
+
+    async def receive(self, websocket: WebSocket) -> Any:
+        return self.decode(await websocket.receive_bytes())
+
+    async def send(self, websocket: WebSocket, payload: Dict[str, Any]):
+        await self.send_encoded(websocket, self.encode(payload))
+
+    @staticmethod
+    async def send_encoded(websocket: WebSocket, data: bytes):
+        await websocket.send_bytes(data)
+
+
+async def accept(websocket: WebSocket):
+    """Accept a WebSocket, negotiating the wire format from its subprotocols
+
+    MessagePack is chosen when the client offers it (and msgpack is
+    installed); otherwise JSON, which is also the default when no
+    subprotocol is requested.
+    """
+    offered = websocket.scope.get("subprotocols") or []
+    if MSGPACK_SUBPROTOCOL in offered and msgpack is not None:
+        codec = MsgpackCodec()
+    else:
+        codec = JsonCodec()
+    await websocket.accept(subprotocol=codec.subprotocol if codec.subprotocol in offered else None)
+    return codec
@@ -0,0 +1,316 @@
+"""
+Record and replay gesture WebSocket sessions for load and latency testing
+
+Record real sessions by pointing clients at a recording proxy:
+    python benchmark_ws.py record --target ws://localhost:8000 --out sessions.jsonl
+    (clients connect to ws://localhost:8765/api/gestures/ws instead)
+
+Replay them against a server, faster and with many simulated patients:
+    python benchmark_ws.py replay sessions.jsonl --url ws://localhost:8000 --speed 4 --patients 50
+
+Replayed gesture messages get a client ``id`` (unless they already have
+one) so the server answers with progressive frames; latency is reported
+per frame type (intention, saved, audio, complete) plus the server's own
+``processing_time_ms``.
+
+The wire format each client negotiated (``Sec-WebSocket-Protocol``) is
+forwarded by the proxy, stored with every recorded frame and requested
+again on replay, so MessagePack sessions stay MessagePack.
+"""
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import time
+from collections import defaultdict
+
+import websockets
+
+try:
+    import msgpack
+except ImportError:  # MessagePack sessions can still be replayed, just not correlated
+    msgpack = None
+
+JSON_SUBPROTOCOL = "silentsignal.json.v1"
+MSGPACK_SUBPROTOCOL = "silentsignal.msgpack.v1"
+# In the server's order of preference (see backend/utils/wire_codec.py)
+SUBPROTOCOLS = [MSGPACK_SUBPROTOCOL, JSON_SUBPROTOCOL]
+
+
+def _select_subprotocol(first, second):
+    """Pick the wire format the server would, from what the client offers
+
+    websockets' legacy server calls this with (client, server) lists, the
+    newer one with (connection, client list).
+    """
+    offered = first if isinstance(first, (list, tuple)) else second
+    for subprotocol in SUBPROTOCOLS:
+        if subprotocol in offered:
+            return subprotocol
+    return None
+
+
+def _path(ws) -> str:
+    request = getattr(ws, "request", None)
+    return request.path if request is not None else ws.path
+
+
+def _encode(message):
+    if isinstance(message, bytes):
+        return {"data": base64.b64encode(message).decode(), "binary": True}
+    return {"data": message}
+
+
+def _decode(record):
+    return base64.b64decode(record["data"]) if record.get("binary") else record["data"]
+
+
+# ---------------------------------------------------------------- recording
+
+async def record(args):
+    """Run a proxy that forwards sessions to the target and logs every frame"""
+    conn_ids = itertools.count(1)
+    out = open(args.out, "a", encoding="utf-8")
+
+    async def handle(client):
+        conn = next(conn_ids)
+        path = _path(client)
+        started = time.monotonic()
+
+        protocol = client.subprotocol
+
+        def log(direction, message):
+            entry = {"conn": conn, "t": round(time.monotonic() - started, 6), "dir": direction, "path": path}
+            if protocol:
+                entry["protocol"] = protocol
+            entry.update(_encode(message))
+            out.write(json.dumps(entry) + "\n")
+            out.flush()
+
+        async with websockets.connect(
+            args.target.rstrip("/") + path,
+            subprotocols=[protocol] if protocol else None,
+        ) as upstream:
+            if upstream.subprotocol != protocol:
+                print(f"Connection {conn}: server answered {upstream.subprotocol!r} to {protocol!r}")
+            async def pump(source, sink, direction):
+                async for message in source:
+                    log(direction, message)
+                    await sink.send(message)
+
+            tasks = [
+                asyncio.create_task(pump(client, upstream, "send")),
+                asyncio.create_task(pump(upstream, client, "recv")),
+            ]
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in tasks:
+                task.cancel()
+        print(f"Recorded connection {conn} ({path}, {protocol or 'no subprotocol'})")
+
+    async with websockets.serve(
+        handle, args.host, args.port,
+        subprotocols=SUBPROTOCOLS, select_subprotocol=_select_subprotocol,
+    ):
+        print(f"Recording proxy on ws://{args.host}:{args.port} -> {args.target}, writing {args.out}")
+        await asyncio.Future()
+
+
+# ---------------------------------------------------------------- replay
+
+def load_sessions(path):
+    """Group recorded client->server messages by connection
+
+    Returns ``(path, protocol, messages)`` per connection; ``protocol`` is
+    the negotiated subprotocol, or None.
+    """
+    sessions = defaultdict(list)
+    paths = {}
+    protocols = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            paths[record["conn"]] = record["path"]
+            protocols[record["conn"]] = record.get("protocol")
+            if record["dir"] == "send":
+                sessions[record["conn"]].append((record["t"], _decode(record)))
+    return [
+        (paths[conn], protocols[conn], messages)
+        for conn, messages in sorted(sessions.items()) if messages
+    ]
+
+
+class Codec:
+    """Decode and re-encode replayed messages in the session's wire format"""
+
+    def __init__(self, protocol):
+        self.binary = protocol == MSGPACK_SUBPROTOCOL
+        # Without msgpack, binary sessions are sent verbatim and not correlated
+        self.readable = not self.binary or msgpack is not None
+
+    def decode(self, message):
+        if isinstance(message, bytes):
+            return msgpack.unpackb(message, raw=False) if self.binary and msgpack else None
+        return json.loads(message)
+
+    def encode(self, payload):
+        if self.binary:
+            return msgpack.packb(payload, use_bin_type=True)
+        return json.dumps(payload)
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.sent = 0
+        self.completed = 0
+        self.uncorrelated = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.connection_failures = 0
+
+    @staticmethod
+    def percentile(values, p):
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        rank = (len(ordered) - 1) * p / 100.0
+        low = int(rank)
+        high = min(low + 1, len(ordered) - 1)
+        return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+    def summary(self, elapsed):
+        stages = {}
+        for stage, values in sorted(self.latencies.items()):
+            stages[stage] = {
+                "count": len(values),
+                **{f"p{p}": round(self.percentile(values, p), 2) for p in (50, 90, 95, 99)},
+                "max": round(max(values), 2),
+            }
+        failures = self.errors + self.timeouts
+        return {
+            "elapsed_s": round(elapsed, 3),
+            "sent": self.sent,
+            "completed": self.completed,
+            "uncorrelated_frames": self.uncorrelated,
+            "throughput_per_s": round(self.completed / elapsed, 2) if elapsed else 0.0,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "connection_failures": self.connection_failures,
+            "error_rate": round(failures / self.sent, 4) if self.sent else 0.0,
+            "latency_ms": stages,
+        }
+
+
+async def replay_patient(patient, url, path, protocol, messages, args, stats):
+    """Replay one recorded connection as one simulated patient"""
+    pending = {}
+    codec = Codec(protocol)
+    try:
+        async with websockets.connect(
+            url.rstrip("/") + path,
+            max_size=None,
+            subprotocols=[protocol] if protocol else None,
+        ) as ws:
+            if ws.subprotocol != protocol:
+                raise RuntimeError(f"server answered {ws.subprotocol!r} to {protocol!r}")
+
+            async def receive():
+                async for message in ws:
+                    now = time.perf_counter()
+                    frame = codec.decode(message)
+                    if not isinstance(frame, dict):
+                        stats.uncorrelated += 1
+                        continue
+                    message_id = frame.get("id")
+                    if frame.get("type") == "error" or "error" in frame:
+                        stats.errors += 1
+                        pending.pop(message_id, None)
+                        continue
+                    if message_id not in pending:
+                        stats.uncorrelated += 1
+                        continue
+                    stage = frame.get("type", "complete")
+                    stats.latencies[stage].append((now - pending[message_id]) * 1000)
+                    if stage == "complete":
+                        del pending[message_id]
+                        stats.completed += 1
+                        if "processing_time_ms" in frame:
+                            stats.latencies["server_total"].append(frame["processing_time_ms"])
+
+            receiver = asyncio.create_task(receive())
+            previous_t = messages[0][0]
+            for n, (t, message) in enumerate(messages):
+                await asyncio.sleep(max(0.0, (t - previous_t) / args.speed))
+                previous_t = t
+                if args.inject_ids and codec.readable:
+                    payload = codec.decode(message)
+                    if isinstance(payload, dict) and "gesture_type" in payload:
+                        payload.setdefault("id", f"p{patient}-{n}")
+                        if args.user_id is not None:
+                            payload["user_id"] = args.user_id
+                        pending[payload["id"]] = time.perf_counter()
+                        message = codec.encode(payload)
+                await ws.send(message)
+                stats.sent += 1
+
+            deadline = time.perf_counter() + args.drain_timeout
+            while pending and time.perf_counter() < deadline and not receiver.done():
+                await asyncio.sleep(0.05)
+            receiver.cancel()
+    except Exception as e:
+        stats.connection_failures += 1
+        print(f"Patient {patient}: {e}")
+    stats.timeouts += len(pending)
+
+
+async def replay(args):
+    """Replay recorded sessions with M concurrent patients at N x speed"""
+    sessions = load_sessions(args.file)
+    if not sessions:
+        raise SystemExit(f"No client messages recorded in {args.file}")
+
+    stats = Stats()
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        replay_patient(patient, args.url, *sessions[patient % len(sessions)], args, stats)
+        for patient in range(args.patients)
+    ))
+    summary = stats.summary(time.perf_counter() - started)
+    summary.update({"patients": args.patients, "speed": args.speed, "sessions": len(sessions)})
+
+    print(json.dumps(summary, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gesture WebSocket record/replay benchmark")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rec = commands.add_parser("record", help="Run a recording proxy")
+    rec.add_argument("--target", default="ws://localhost:8000", help="Server to forward to")
+    rec.add_argument("--host", default="0.0.0.0")
+    rec.add_argument("--port", type=int, default=8765)
+    rec.add_argument("--out", default="sessions.jsonl")
+
+    rep = commands.add_parser("replay", help="Replay recorded sessions")
+    rep.add_argument("file")
+    rep.add_argument("--url", default="ws://localhost:8000", help="Server to replay against")
+    rep.add_argument("--speed", type=float, default=1.0, help="Time compression factor")
+    rep.add_argument("--patients", type=int, default=10, help="Concurrent simulated patients")
+    rep.add_argument("--user-id", type=int, default=None, help="Override user_id in replayed gestures")
+    rep.add_argument("--no-inject-ids", dest="inject_ids", action="store_false",
+                     help="Send messages unchanged (only uncorrelated counts are reported)")
+    rep.add_argument("--drain-timeout", type=float, default=30.0, help="Seconds to wait for outstanding results")
+    rep.add_argument("--json", help="Also write the report to this file")
+
+    args = parser.parse_args()
+    asyncio.run(record(args) if args.command == "record" else replay(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ class WebSocketClient {
         this.reconnectAttempts = 0;
         this.maxReconnectAttempts = 5;
         this.reconnectDelay = 1000;
+        this.nextMessageId = 1;
+        this.streamingIds = new Set();
     }
     
     connect() {
@@ -21,7 +23,7 @@ class WebSocketClient {
         
         this.ws.onmessage = (event) => {
             const data = JSON.parse(event.data);
-            this.handleGestureResponse(data);
+            this.handleFrame(data);
         };
         
         this.ws.onerror = (error) => {
@@ -55,6 +57,7 @@ class WebSocketClient {
         const userId = localStorage.getItem('user_id') || 1;
         
         const message = {
+            id: this.nextMessageId++,
             user_id: userId,
             gesture_type: type,
             data: data
@@ -63,9 +66,51 @@ class WebSocketClient {
         this.ws.send(JSON.stringify(message));
     }
     
+    handleFrame(data) {
+        // Progressive frames share the client message id
+        switch (data.type) {
+            case 'intention':
+                this.showIntention(data);
+                this.addToHistory(data);
+                break;
+            case 'audio_stream':
+                // New audio: play it while it is still being generated
+                this.streamingIds.add(data.id);
+                this.playAudio(data.stream_url);
+                break;
+            case 'audio':
+                if (!this.streamingIds.delete(data.id)) {
+                    this.playAudio(data.audio_url);
+                }
+                break;
+            case 'saved':
+            case 'complete':
+                console.log('Gesture processed:', data);
+                break;
+            case 'error':
+                this.streamingIds.delete(data.id);
+                // window_full / coalesced: the server is busy with earlier gestures
+                console.warn('Gesture not processed:', data.code, data.error);
+                if (data.code === 'processing_failed') {
+                    showToast('Gesture could not be processed', 'error');
+                }
+                break;
+            default:
+                this.handleGestureResponse(data);
+        }
+    }
+    
     handleGestureResponse(data) {
         console.log('Gesture processed:', data);
         
+        this.showIntention(data);
+        this.playAudio(data.audio_url);
+        
+        // Add to history
+        this.addToHistory(data);
+    }
+    
+    showIntention(data) {
         // Update UI
         const outputText = document.getElementById('output-text');
         if (outputText && data.text) {
@@ -81,18 +126,16 @@ class WebSocketClient {
         if (confidence && data.confidence !== undefined) {
             confidence.textContent = `${Math.round(data.confidence * 100)}%`;
         }
-        
-        // Play audio
-        if (data.audio_url) {
+    }
+    
+    playAudio(audioUrl) {
+        if (audioUrl) {
             const audioPlayer = document.getElementById('audio-player');
             if (audioPlayer) {
-                audioPlayer.src = data.audio_url;
+                audioPlayer.src = audioUrl;
                 audioPlayer.play();
             }
         }
-        
-        // Add to history
-        this.addToHistory(data);
     }
     
     addToHistory(data) {
@@ -0,0 +1,52 @@
+"""Migrate gesture embeddings from the legacy JSON column to packed binary
+
+Adds the ``embedding_bin`` column if it is missing (the API also does this
+at startup), then converts rows in batches (keyset-paginated by id, one
+transaction per batch) and clears the JSON copy. Safe to re-run;
+already-converted rows are skipped.
+
+Usage: python migrate_embeddings.py [--batch-size 1000] [--quantize]
+"""
+import argparse
+
+from backend.database import SessionLocal, upgrade_schema
+from backend.models.gesture import Gesture
+
+
+def migrate(batch_size: int = 1000, quantize: bool = False) -> int:
+    """Convert legacy JSON embeddings, returning the number of rows migrated"""
+    migrated = 0
+    last_id = 0
+    db = SessionLocal()
+    try:
+        while True:
+            rows = db.query(Gesture).filter(
+                Gesture.id > last_id,
+                Gesture.embedding_blob.is_(None),
+            ).order_by(Gesture.id).limit(batch_size).all()
+            if not rows:
+                break
+
+            for gesture in rows:
+                if gesture.embedding:
+                    gesture.set_embedding(gesture.embedding, quantize=quantize)
+                    migrated += 1
+            last_id = rows[-1].id
+            db.commit()
+            db.expunge_all()
+            print(f"Migrated {migrated} embeddings (up to id {last_id})")
+    finally:
+        db.close()
+    return migrated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--quantize", action="store_true", help="Store int8 instead of float32")
+    args = parser.parse_args()
+
+    print("Migrating gesture embeddings...")
+    upgrade_schema()
+    total = migrate(args.batch_size, args.quantize)
+    print(f"Done: {total} embeddings migrated")
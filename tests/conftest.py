@@ -0,0 +1,80 @@
+"""Test settings: a throwaway SQLite database and audio store, no Redis"""
+import os
+import sys
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="silentsignal-tests-")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/test.db")
+os.environ.setdefault("REDIS_URL", "")
+os.environ.setdefault("AUDIO_CACHE_DIR", f"{_tmp}/audio")
+os.environ.setdefault("AUDIO_CACHE_MANIFEST", f"{_tmp}/audio.sqlite3")
+os.environ.setdefault("TTS_PREWARM_ENABLED", "false")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import secrets
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="session")
+def database():
+    from backend.database import init_db
+    init_db()
+
+
+@pytest.fixture
+def make_user(database):
+    """Create an active user with a live session; returns (user_id, session_token)"""
+    from backend.database import SessionLocal
+    from backend.models.user import User
+    from backend.models.session import Session as UserSession
+
+    def make():
+        token = secrets.token_urlsafe(16)
+        with SessionLocal() as db:
+            user = User(workos_id=f"workos-{token}", email=f"{token}@example.com")
+            db.add(user)
+            db.flush()
+            db.add(UserSession(
+                user_id=user.id,
+                session_token=token,
+                expires_at=datetime.utcnow() + timedelta(days=1),
+            ))
+            db.commit()
+            return user.id, token
+    return make
+
+
+@pytest.fixture
+def fake_integrations(monkeypatch):
+    """Answer classifications and speech without calling Cerebras or ElevenLabs"""
+    from backend.integrations.cerebras_client import cerebras_client
+    from backend.integrations.elevenlabs_client import elevenlabs_client
+
+    async def classify(items):
+        return [{"intention": "yes", "confidence": 0.95, "text": "Yes"} for _ in items]
+
+    async def text_to_speech(text, user_id, voice_id=None):
+        return "/static/audio_cache/test.mp3"
+
+    monkeypatch.setattr(cerebras_client.batcher, "handler", classify)
+    monkeypatch.setattr(elevenlabs_client, "text_to_speech", text_to_speech)
+
+
+@pytest.fixture
+def client(database):
+    """Test client for the gesture, user and audio routers"""
+    from backend.routes import audio, gestures, users
+
+    app = FastAPI()
+    app.include_router(gestures.router, prefix="/api/gestures")
+    app.include_router(users.router, prefix="/api/users")
+    app.include_router(audio.router, prefix="/api/audio")
+    with TestClient(app) as test_client:
+        yield test_client
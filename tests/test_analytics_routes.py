@@ -0,0 +1,62 @@
+"""Analytics dashboard route"""
+import asyncio
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.cache import cache
+from backend.routes import analytics
+
+
+@pytest.fixture
+def analytics_client(database):
+    app = FastAPI()
+    app.include_router(analytics.router, prefix="/api")
+    with TestClient(app) as test_client:
+        yield test_client
+    asyncio.run(cache.delete_pattern("analytics:*"))
+
+
+def test_dashboard_is_built_off_the_event_loop(analytics_client, monkeypatch):
+    threads = []
+    calculate_stats = analytics.calculate_stats
+
+    def recording_stats(days, db):
+        try:
+            asyncio.get_running_loop()
+            on_loop = True
+        except RuntimeError:
+            on_loop = False
+        threads.append((threading.current_thread(), on_loop))
+        return calculate_stats(days, db)
+
+    monkeypatch.setattr(analytics, "calculate_stats", recording_stats)
+    response = analytics_client.get("/api/analytics", params={"days": 3})
+
+    body = response.json()
+    assert body["success"] is True
+    assert len(body["charts"]["activity"]["labels"]) == 3
+    assert len(body["recent_activity"]) == 10
+    # The TestClient runs the app's loop in a portal thread; the build must not run on it
+    assert len(threads) == 1
+    thread, on_loop = threads[0]
+    assert thread is not threading.main_thread()
+    assert not on_loop
+
+
+def test_dashboard_is_served_from_cache(analytics_client, monkeypatch):
+    calls = []
+    calculate_stats = analytics.calculate_stats
+
+    def counting_stats(days, db):
+        calls.append(days)
+        return calculate_stats(days, db)
+
+    monkeypatch.setattr(analytics, "calculate_stats", counting_stats)
+    first = analytics_client.get("/api/analytics", params={"days": 5}).json()
+    second = analytics_client.get("/api/analytics", params={"days": 5}).json()
+
+    assert first["stats"] == second["stats"]
+    assert calls == [5]
@@ -0,0 +1,56 @@
+from backend.config import settings
+from backend.integrations.elevenlabs_client import elevenlabs_client
+
+
+def _fake_speech(monkeypatch):
+    async def stream_speech(text, voice_id=None):
+        yield b"ID3"
+
+    monkeypatch.setattr(elevenlabs_client, "stream_speech", stream_speech)
+
+
+def test_stream_intention_phrase(client, make_user, monkeypatch):
+    _fake_speech(monkeypatch)
+    _, token = make_user()
+    client.cookies.set("session_token", token)
+
+    response = client.get("/api/audio/stream", params={"text": "I need water"})
+    assert response.status_code == 200
+    assert response.content == b"ID3"
+
+
+def test_stream_signed_url(client, make_user, monkeypatch):
+    _fake_speech(monkeypatch)
+    _, token = make_user()
+    client.cookies.set("session_token", token)
+
+    response = client.get(elevenlabs_client.stream_url("Could you open the window"))
+    assert response.status_code == 200
+
+
+def test_stream_rejects_arbitrary_text(client, make_user, monkeypatch):
+    _fake_speech(monkeypatch)
+    _, token = make_user()
+    client.cookies.set("session_token", token)
+
+    response = client.get("/api/audio/stream", params={"text": "Anything at all", "sig": "0" * 64})
+    assert response.status_code == 403
+
+
+def test_stream_rejects_unknown_voice(client, make_user, monkeypatch):
+    _fake_speech(monkeypatch)
+    _, token = make_user()
+    client.cookies.set("session_token", token)
+
+    response = client.get("/api/audio/stream", params={"text": "I need water", "voice_id": "someone-else"})
+    assert response.status_code == 403
+
+
+def test_stream_is_rate_limited(client, make_user, monkeypatch):
+    _fake_speech(monkeypatch)
+    monkeypatch.setattr(settings, "AUDIO_STREAM_REQUESTS_PER_MINUTE", 2)
+    _, token = make_user()
+    client.cookies.set("session_token", token)
+
+    statuses = [client.get("/api/audio/stream", params={"text": "Yes"}).status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
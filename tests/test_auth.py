@@ -0,0 +1,18 @@
+from backend.cache import cache
+from backend.database import SessionLocal
+from backend.models.session import Session as UserSession
+
+
+def test_logout_in_another_worker_with_redis_down(client, make_user):
+    assert not cache.invalidation_connected
+    _, token = make_user()
+    client.cookies.set("session_token", token)
+    assert client.get("/api/users/me").status_code == 200
+
+    # Logout as another worker would do it: its forget_session cannot reach
+    # this worker's L1 without Redis, only the database row is gone
+    with SessionLocal() as db:
+        db.query(UserSession).filter(UserSession.session_token == token).delete()
+        db.commit()
+
+    assert client.get("/api/users/me").status_code == 401
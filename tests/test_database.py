@@ -0,0 +1,27 @@
+"""Schema upgrades for databases created by older releases"""
+from sqlalchemy import create_engine, inspect, text
+
+from backend.database import upgrade_schema
+
+
+def _columns(engine, table):
+    return {column["name"] for column in inspect(engine).get_columns(table)}
+
+
+def test_missing_embedding_column_is_added_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/old.db")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE gestures (id INTEGER PRIMARY KEY, embedding JSON)"))
+
+    upgrade_schema(engine)
+    assert "embedding_bin" in _columns(engine, "gestures")
+
+    # Re-running is a no-op
+    upgrade_schema(engine)
+    assert "embedding_bin" in _columns(engine, "gestures")
+
+
+def test_missing_tables_are_left_to_create_all(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/empty.db")
+    upgrade_schema(engine)
+    assert inspect(engine).get_table_names() == []
@@ -0,0 +1,41 @@
+import asyncio
+import os
+
+import httpx
+
+
+def test_generated_audio_is_written_and_indexed(monkeypatch):
+    from backend.integrations.elevenlabs_client import elevenlabs_client
+
+    def handler(request):
+        return httpx.Response(200, content=b"ID3" + b"\x00" * 4096)
+
+    async def run():
+        monkeypatch.setattr(elevenlabs_client, "client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        url = await elevenlabs_client.text_to_speech("Generated in a test", user_id=None)
+        chunks = [chunk async for chunk in elevenlabs_client.stream_speech("Generated in a test")]
+        return url, chunks
+
+    url, chunks = asyncio.run(run())
+    filename = url.rsplit("/", 1)[-1]
+    path = os.path.join(elevenlabs_client.store.directory, filename)
+    with open(path, "rb") as f:
+        assert f.read() == b"".join(chunks) == b"ID3" + b"\x00" * 4096
+    assert not os.path.exists(f"{path}.part")
+    assert asyncio.run(elevenlabs_client.has_audio("Generated in a test"))
+
+
+def test_failed_generation_leaves_no_file(monkeypatch):
+    from backend.integrations.elevenlabs_client import elevenlabs_client
+
+    def handler(request):
+        return httpx.Response(500)
+
+    async def run():
+        monkeypatch.setattr(elevenlabs_client, "client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        return await elevenlabs_client.text_to_speech("Fails in a test", user_id=None)
+
+    assert asyncio.run(run()) == ""
+    key = elevenlabs_client._get_cache_key("Fails in a test", elevenlabs_client.default_voice_id)
+    assert not os.path.exists(elevenlabs_client.store.path_for(key))
+    assert not asyncio.run(elevenlabs_client.has_audio("Fails in a test"))
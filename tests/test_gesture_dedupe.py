@@ -0,0 +1,56 @@
+"""Repeated-gesture suppression"""
+import asyncio
+
+from backend.services.gesture_dedupe import GestureDeduper
+
+
+class _Db:
+    """Answers one sensitivity query, then fails"""
+
+    def __init__(self, sensitivity):
+        self.sensitivity = sensitivity
+        self.queries = 0
+
+    async def scalar(self, statement):
+        self.queries += 1
+        if self.queries > 1:
+            raise AssertionError("sensitivity should have come from the cache")
+        return self.sensitivity
+
+
+def test_string_and_int_user_ids_share_a_key():
+    deduper = GestureDeduper()
+    features = [0.1, 0.2, 0.3]
+    assert deduper.key("7", "tap", features) == deduper.key(7, "tap", features)
+
+
+def test_repeat_with_string_user_id_is_suppressed():
+    deduper = GestureDeduper()
+    calls = []
+
+    async def compute():
+        calls.append(True)
+        return "result"
+
+    async def run():
+        first = await deduper.run(deduper.key(7, "tap", [0.5]), 1.0, compute)
+        repeat = await deduper.run(deduper.key("7", "tap", [0.5]), 1.0, compute)
+        return first, repeat
+
+    first, repeat = asyncio.run(run())
+    assert first == ("result", False)
+    assert repeat == ("result", True)
+    assert len(calls) == 1
+
+
+def test_sensitivity_cache_ignores_user_id_type():
+    deduper = GestureDeduper()
+    db = _Db("high")
+
+    async def run():
+        return await deduper.sensitivity_for(db, 7), await deduper.sensitivity_for(db, "7")
+
+    assert asyncio.run(run()) == ("high", "high")
+
+    deduper.forget_user("7")
+    assert deduper._sensitivity.get(7) is None
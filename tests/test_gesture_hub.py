@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from backend.services.gesture_hub import GestureHub
+
+
+def test_publish_with_string_patient_id_reaches_subscriber():
+    async def run():
+        hub = GestureHub()
+        subscription = hub.subscribe(7)
+        hub.publish("7", {"type": "intention", "text": "Yes"})
+        frame = await asyncio.wait_for(subscription.get(), timeout=1)
+        return frame.event
+
+    event = asyncio.run(run())
+    assert event["patient_id"] == 7
+    assert event["text"] == "Yes"
+
+
+def test_publish_with_non_numeric_patient_id_is_dropped():
+    hub = GestureHub()
+    subscription = hub.subscribe("7")
+    hub.publish("abc", {"type": "intention"})
+    assert subscription.patient_id == 7
+    assert subscription.queue.empty()
+
+
+def test_subscribe_to_another_patient_is_refused(client, make_user):
+    patient_id, _ = make_user()
+    _, token = make_user()
+    client.cookies.set("session_token", token)
+
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with client.websocket_connect(f"/api/gestures/ws/subscribe/{patient_id}") as ws:
+            ws.receive_text()
+    assert exc.value.code == 1008
+
+
+def test_subscribe_to_own_feed_is_accepted(client, make_user):
+    patient_id, token = make_user()
+    client.cookies.set("session_token", token)
+
+    with client.websocket_connect(f"/api/gestures/ws/subscribe/{patient_id}"):
+        pass
@@ -0,0 +1,78 @@
+"""Gesture HTTP routes"""
+import json
+
+from backend.config import settings
+
+
+def _login(client, make_user):
+    user_id, token = make_user()
+    client.cookies.set("session_token", token)
+    return user_id
+
+
+def _saved_types(user_id):
+    from backend.database import SessionLocal
+    from backend.models.gesture import Gesture
+
+    with SessionLocal() as db:
+        return sorted(g.gesture_type for g in db.query(Gesture).filter(Gesture.user_id == user_id))
+
+
+def test_batch_reports_errors_per_item(client, make_user, fake_integrations):
+    user_id = _login(client, make_user)
+    response = client.post("/api/gestures/batch", json=[
+        {"gesture_type": "tap", "raw_data": {"count": 2}},
+        {"gesture_type": "micro_gesture", "raw_data": {"keypoints": {"x": 1}}},
+        {"gesture_type": "blink", "raw_data": {"duration": 120}, "generate_audio": True},
+        {"raw_data": {"count": 1}},
+        {"gesture_type": "micro_gesture", "raw_data": {"keypoints": [[0.1, 0.2], [0.3, 0.4]]}},
+    ])
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["processed"], body["failed"]) == (3, 2)
+    results = body["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3, 4]
+    assert [r["status"] for r in results] == ["ok", "error", "ok", "error", "ok"]
+    assert results[1]["error"] and results[3]["error"]
+    assert results[0]["gesture"]["audio_url"] is None
+    assert results[2]["gesture"]["audio_url"] == "/static/audio_cache/test.mp3"
+    assert _saved_types(user_id) == ["blink", "micro_gesture", "tap"]
+
+
+def test_batch_accepts_ndjson(client, make_user, fake_integrations):
+    user_id = _login(client, make_user)
+    lines = [
+        {"gesture_type": "tap", "raw_data": {"count": 1}},
+        {"gesture_type": "tap", "raw_data": {"count": 3}},
+        {"gesture_type": "blink"},
+    ]
+    response = client.post(
+        "/api/gestures/batch",
+        content="\n".join(json.dumps(line) for line in lines) + "\n\n",
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["processed"], body["failed"]) == (3, 0)
+    assert [r["gesture"]["gesture_type"] for r in body["results"]] == ["tap", "tap", "blink"]
+    assert _saved_types(user_id) == ["blink", "tap", "tap"]
+
+
+def test_batch_rejects_malformed_ndjson(client, make_user, fake_integrations):
+    _login(client, make_user)
+    response = client.post(
+        "/api/gestures/batch",
+        content='{"gesture_type": "tap"}\n{not json\n',
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 400
+
+
+def test_batch_over_the_item_limit_is_413(client, make_user, fake_integrations, monkeypatch):
+    monkeypatch.setattr(settings, "GESTURE_BATCH_MAX_ITEMS", 2)
+    user_id = _login(client, make_user)
+    response = client.post("/api/gestures/batch", json={"gestures": [{"gesture_type": "tap"}] * 3})
+    assert response.status_code == 413
+    assert _saved_types(user_id) == []
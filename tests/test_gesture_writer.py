@@ -0,0 +1,99 @@
+"""Batched gesture inserts (GestureWriter)"""
+import asyncio
+
+from backend.config import settings
+from backend.database import SessionLocal
+from backend.models.gesture import Gesture
+from backend.services.gesture_writer import GestureWriter
+
+
+def _writer(monkeypatch, interval_ms=20.0, max_rows=200, max_pending=5000) -> GestureWriter:
+    monkeypatch.setattr(settings, "GESTURE_BATCHED_WRITE_INTERVAL_MS", interval_ms)
+    monkeypatch.setattr(settings, "GESTURE_BATCHED_WRITE_MAX_ROWS", max_rows)
+    monkeypatch.setattr(settings, "GESTURE_BATCHED_WRITE_MAX_PENDING", max_pending)
+    return GestureWriter()
+
+
+def _gesture(user_id, gesture_type="tap") -> Gesture:
+    return Gesture(user_id=user_id, gesture_type=gesture_type, intention="yes", generated_text="Yes")
+
+
+def _saved(user_id):
+    with SessionLocal() as db:
+        return db.query(Gesture).filter(Gesture.user_id == user_id).all()
+
+
+def test_concurrent_saves_share_one_insert(monkeypatch, make_user):
+    user_id, _ = make_user()
+    writer = _writer(monkeypatch)
+
+    async def run():
+        return await asyncio.gather(*(writer.save(_gesture(user_id)) for _ in range(3)))
+
+    saved = asyncio.run(run())
+    assert writer.batcher.batches == 1
+    assert writer.batcher.items == 3
+    assert all(gesture.id is not None for gesture in saved)
+    assert len(_saved(user_id)) == 3
+
+
+def test_failed_batch_is_retried_row_by_row(monkeypatch, make_user):
+    user_id, _ = make_user()
+    writer = _writer(monkeypatch)
+
+    async def run():
+        return await asyncio.gather(
+            writer.save(_gesture(user_id)),
+            writer.save(_gesture(user_id, gesture_type=None)),  # violates NOT NULL
+            writer.save(_gesture(user_id)),
+            return_exceptions=True,
+        )
+
+    first, bad, last = asyncio.run(run())
+    assert isinstance(bad, RuntimeError)
+    assert first.id is not None and last.id is not None
+    assert writer.failed == 1
+    assert len(_saved(user_id)) == 2
+
+
+def test_buffer_is_bounded(monkeypatch):
+    writer = _writer(monkeypatch, interval_ms=1.0, max_pending=2)
+    batches = []
+
+    async def run():
+        gate = asyncio.Event()
+
+        async def insert(gestures):
+            batches.append(len(gestures))
+            await gate.wait()
+            return gestures
+
+        writer.batcher.handler = insert
+        tasks = [asyncio.ensure_future(writer.save(object())) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        # Two rows are in flight; the third caller waits for a free slot
+        assert batches == [2]
+        assert not writer.batcher._pending
+        gate.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert batches == [2, 1]
+
+
+def test_drain_flushes_buffered_rows(monkeypatch, make_user):
+    user_id, _ = make_user()
+    # A window long enough that only drain() can flush within the test
+    writer = _writer(monkeypatch, interval_ms=60_000)
+
+    async def run():
+        task = asyncio.ensure_future(writer.save(_gesture(user_id)))
+        await asyncio.sleep(0.01)
+        assert not _saved(user_id)
+        await writer.drain()
+        assert task.done()
+        return task.result()
+
+    gesture = asyncio.run(run())
+    assert gesture.id is not None
+    assert [g.id for g in _saved(user_id)] == [gesture.id]
@@ -0,0 +1,153 @@
+"""Per-connection in-flight window"""
+import asyncio
+
+import pytest
+
+from backend.utils.inflight_window import InFlightWindow
+
+
+class _Jobs:
+    """Jobs that block until released, recording start and finish order"""
+
+    def __init__(self):
+        self.started = []
+        self.finished = []
+        self.rejected = []
+        self.gates = {}
+
+    def job(self, name):
+        self.gates[name] = asyncio.Event()
+
+        async def run():
+            self.started.append(name)
+            await self.gates[name].wait()
+            self.finished.append(name)
+        return run
+
+    def on_rejected(self, name):
+        async def notify(reason):
+            self.rejected.append((name, reason))
+        return notify
+
+    def submit(self, window, name):
+        return window.submit(self.job(name), self.on_rejected(name))
+
+
+@pytest.mark.parametrize("policy, reason", [("reject", "window_full"), ("drop", "dropped")])
+def test_full_window_refuses_new_jobs(policy, reason):
+    async def run():
+        jobs = _Jobs()
+        window = InFlightWindow(limit=2, policy=policy)
+        outcomes = [jobs.submit(window, name) for name in ("a", "b", "c")]
+        await asyncio.sleep(0)
+        assert len(window) == 2
+        for gate in jobs.gates.values():
+            gate.set()
+        await window.drain()
+        return outcomes, jobs
+
+    outcomes, jobs = asyncio.run(run())
+    assert outcomes == ["started", "started", reason]
+    assert jobs.started == ["a", "b"]
+    assert jobs.rejected == [("c", reason)]
+
+
+def test_coalesce_keeps_only_the_newest_waiting_job():
+    async def run():
+        jobs = _Jobs()
+        window = InFlightWindow(limit=1, policy="coalesce")
+        outcomes = [jobs.submit(window, name) for name in ("a", "b", "c")]
+        await asyncio.sleep(0)
+        assert jobs.started == ["a"]
+        jobs.gates["a"].set()
+        await asyncio.sleep(0.01)
+        # "c" replaced "b" in the pending slot and starts once "a" is done
+        assert jobs.started == ["a", "c"]
+        jobs.gates["c"].set()
+        await window.drain()
+        return outcomes, jobs
+
+    outcomes, jobs = asyncio.run(run())
+    assert outcomes == ["started", "pending", "pending"]
+    assert jobs.finished == ["a", "c"]
+    assert jobs.rejected == [("b", "coalesced")]
+
+
+def test_jobs_start_in_submission_order():
+    async def run():
+        jobs = _Jobs()
+        window = InFlightWindow(limit=3)
+        for name in ("a", "b", "c"):
+            jobs.submit(window, name)
+        await asyncio.sleep(0)
+        for name in ("c", "a", "b"):
+            jobs.gates[name].set()
+            await asyncio.sleep(0)
+        await window.drain()
+        return jobs
+
+    jobs = asyncio.run(run())
+    assert jobs.started == ["a", "b", "c"]
+    assert jobs.finished == ["c", "a", "b"]
+
+
+def test_drain_waits_for_the_parked_job():
+    async def run():
+        jobs = _Jobs()
+        window = InFlightWindow(limit=1, policy="coalesce")
+        jobs.submit(window, "a")
+        jobs.submit(window, "b")
+        await asyncio.sleep(0)
+
+        async def release_later():
+            jobs.gates["a"].set()
+            await asyncio.sleep(0.01)
+            jobs.gates["b"].set()
+
+        asyncio.ensure_future(release_later())
+        await asyncio.wait_for(window.drain(), timeout=1)
+        return jobs
+
+    assert asyncio.run(run()).finished == ["a", "b"]
+
+
+def test_failed_job_frees_its_slot():
+    async def run():
+        window = InFlightWindow(limit=1)
+
+        async def fail():
+            raise RuntimeError("pipeline error")
+
+        async def ok():
+            return None
+
+        async def ignore(reason):
+            return None
+
+        window.submit(fail, ignore)
+        await window.drain()
+        return window.submit(ok, ignore)
+
+    assert asyncio.run(run()) == "started"
+
+
+def test_cancel_stops_running_and_parked_jobs():
+    async def run():
+        jobs = _Jobs()
+        window = InFlightWindow(limit=1, policy="coalesce")
+        jobs.submit(window, "a")
+        jobs.submit(window, "b")
+        await asyncio.sleep(0)
+        window.cancel()
+        await window.drain()
+        return jobs, len(window)
+
+    jobs, running = asyncio.run(run())
+    assert jobs.started == ["a"]
+    assert jobs.finished == []
+    assert running == 0
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        InFlightWindow(limit=1, policy="queue")
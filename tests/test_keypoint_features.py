@@ -0,0 +1,62 @@
+"""Keypoint parsing and validation"""
+import numpy as np
+import pytest
+
+from backend.utils.keypoint_features import as_keypoint_array
+
+
+def test_frames_of_points_are_padded_to_xyz():
+    array = as_keypoint_array([[[0.1, 0.2], [0.3, 0.4]]])
+    assert array.shape == (1, 2, 3)
+    assert np.allclose(array[0, :, 2], 0.0)
+
+
+def test_point_dicts_are_read():
+    array = as_keypoint_array([{"x": 1, "y": 2, "z": 3}, {"x": 4, "y": 5}])
+    assert array.shape == (1, 2, 3)
+    assert array[0, 1].tolist() == [4.0, 5.0, 0.0]
+
+
+def test_empty_input_gives_empty_array():
+    assert as_keypoint_array(None).size == 0
+    assert as_keypoint_array([]).size == 0
+
+
+@pytest.mark.parametrize("keypoints", [
+    {"x": 1, "y": 2},
+    [1, 2, 3],
+    "keypoints",
+    [[[0.1, 0.2], [0.3]]],
+    [[["a", "b"]]],
+    [[[0.1]]],
+])
+def test_malformed_keypoints_raise_value_error(keypoints):
+    with pytest.raises(ValueError):
+        as_keypoint_array(keypoints)
+
+
+def test_http_submission_with_malformed_keypoints_is_422(client, make_user, fake_integrations):
+    _, token = make_user()
+    client.cookies.set("session_token", token)
+    response = client.post(
+        "/api/gestures/",
+        json={"gesture_type": "micro_gesture", "raw_data": {"keypoints": {"x": 1}}},
+    )
+    assert response.status_code == 422
+
+
+def test_websocket_malformed_keypoints_get_error_frame(client, make_user, fake_integrations):
+    user_id, _ = make_user()
+    with client.websocket_connect("/api/gestures/ws") as ws:
+        ws.send_json({
+            "id": 1, "user_id": user_id, "gesture_type": "micro_gesture",
+            "data": {"keypoints": [1, 2, 3]},
+        })
+        frame = ws.receive_json()
+        assert frame["type"] == "error"
+        assert frame["code"] == "invalid_gesture"
+        # The socket stays usable
+        ws.send_json({"id": 2, "user_id": user_id, "gesture_type": "tap", "data": {"count": 2}})
+        while (frame := ws.receive_json())["type"] != "complete":
+            pass
+        assert frame["id"] == 2
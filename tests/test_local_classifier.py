@@ -0,0 +1,44 @@
+"""Local centroid classifier"""
+import numpy as np
+
+from backend.utils.local_classifier import LocalIntentClassifier
+
+
+def _classifier():
+    classifier = LocalIntentClassifier()
+    classifier.enabled = True
+    classifier.min_samples = 5
+    classifier.threshold = 0.9
+    classifier.max_distance = 3.0
+    return classifier
+
+
+def _cluster(center, n=20, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.asarray(center, dtype=np.float64) + rng.normal(0, 0.1, size=(n, len(center)))
+
+
+def test_single_class_is_never_answered_locally():
+    classifier = _classifier()
+    classifier.fit("blink", _cluster([1.0, 1.0, 1.0]), ["yes"] * 20)
+
+    assert classifier.predict("blink", [1.0, 1.0, 1.0]) is None
+    assert classifier.predict("blink", [1.05, 0.95, 1.0]) is None
+
+
+def test_separated_classes_answer_near_a_centroid():
+    classifier = _classifier()
+    classifier.fit("blink", _cluster([1.0, 1.0, 1.0]), ["yes"] * 20)
+    classifier.fit("blink", _cluster([3.0, 3.0, 3.0], seed=1), ["no"] * 20)
+
+    result = classifier.predict("blink", [1.0, 1.0, 1.0])
+    assert result["intention"] == "yes"
+    assert result["confidence"] >= 0.9
+
+
+def test_point_between_classes_falls_back():
+    classifier = _classifier()
+    classifier.fit("blink", _cluster([1.0, 1.0, 1.0]), ["yes"] * 20)
+    classifier.fit("blink", _cluster([1.4, 1.4, 1.4], seed=1), ["no"] * 20)
+
+    assert classifier.predict("blink", [1.2, 1.2, 1.2]) is None
@@ -0,0 +1,56 @@
+"""Prometheus exposition"""
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+class _Pool:
+    def size(self):
+        return 5
+
+    def checkedout(self):
+        return 3
+
+    def checkedin(self):
+        return 2
+
+    def overflow(self):
+        return 0
+
+
+def test_pool_gauges_cover_async_and_sync_engines(database, monkeypatch):
+    from backend.routes import metrics
+
+    # SQLite's async engine uses NullPool, which has no counters to report
+    monkeypatch.setattr(metrics, "async_engine", SimpleNamespace(pool=_Pool()))
+    app = FastAPI()
+    app.include_router(metrics.router, prefix="/api")
+    body = TestClient(app).get("/api/metrics").text
+
+    pool_lines = [line for line in body.splitlines() if "db_pool_connections{" in line]
+    assert any('engine="async"' in line and 'state="checkedout"' in line and line.endswith(" 3")
+               for line in pool_lines)
+    assert any('engine="sync"' in line for line in pool_lines)
+
+
+def test_audio_store_gauges_are_refreshed_per_scrape(database, monkeypatch):
+    from backend.routes import metrics
+
+    refreshed = []
+
+    def refresh_stats():
+        refreshed.append(True)
+        metrics.audio_store.stored_bytes = 2048
+        metrics.audio_store.stored_files = 2
+
+    monkeypatch.setattr(metrics.audio_store, "stored_bytes", 0)
+    monkeypatch.setattr(metrics.audio_store, "stored_files", 0)
+    monkeypatch.setattr(metrics.audio_store, "refresh_stats", refresh_stats)
+    app = FastAPI()
+    app.include_router(metrics.router, prefix="/api")
+    body = TestClient(app).get("/api/metrics").text
+
+    assert refreshed == [True]
+    assert "audio_cache_bytes 2048" in body
+    assert "audio_cache_files 2" in body
@@ -0,0 +1,90 @@
+"""Keyed single-flight"""
+import asyncio
+
+import pytest
+
+from backend.utils.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def fetch():
+        calls.append(True)
+        await asyncio.sleep(0.01)
+        return "audio"
+
+    async def run():
+        results = await asyncio.gather(*(flight.do("hello", fetch) for _ in range(5)))
+        return results, len(flight)
+
+    results, in_flight_after = asyncio.run(run())
+    assert results == ["audio"] * 5
+    assert len(calls) == 1
+    assert (flight.leaders, flight.shared) == (1, 4)
+    assert in_flight_after == 0
+
+
+def test_exception_reaches_every_caller_and_is_not_kept():
+    flight = SingleFlight("test")
+    attempts = []
+
+    async def fail():
+        attempts.append(True)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def ok():
+        return "ok"
+
+    async def run():
+        results = await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+        # Finished calls are forgotten, so the next one runs again
+        return results, await flight.do("k", ok)
+
+    results, retry = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(attempts) == 1
+    assert retry == "ok"
+
+
+def test_different_keys_do_not_share():
+    flight = SingleFlight("test")
+
+    async def run():
+        return await asyncio.gather(flight.do("a", _value("A")), flight.do("b", _value("B")))
+
+    assert asyncio.run(run()) == ["A", "B"]
+    assert flight.shared == 0
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight("test")
+
+    async def run():
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("k", slow))
+        second = asyncio.ensure_future(flight.do("k", slow))
+        await asyncio.sleep(0)
+        assert "k" in flight
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "done"
+
+
+def _value(value):
+    async def fn():
+        await asyncio.sleep(0)
+        return value
+    return fn
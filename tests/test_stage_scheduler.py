@@ -0,0 +1,146 @@
+"""Pipeline stage dependency graph"""
+import asyncio
+
+import pytest
+
+from backend.utils.stage_scheduler import StageScheduler, drain_background
+
+
+def test_stages_get_dependency_results_and_run_in_order():
+    order = []
+
+    async def classify():
+        order.append("classify")
+        return "yes"
+
+    async def map_text(classify):
+        order.append("map_text")
+        return classify.upper()
+
+    async def combine(classify, map_text):
+        order.append("combine")
+        return f"{classify}/{map_text}"
+
+    results = asyncio.run(
+        StageScheduler()
+        .add("combine", combine, depends_on=["classify", "map_text"])
+        .add("map_text", map_text, depends_on=["classify"])
+        .add("classify", classify)
+        .run()
+    )
+    assert results == {"classify": "yes", "map_text": "YES", "combine": "yes/YES"}
+    assert order == ["classify", "map_text", "combine"]
+
+
+def test_independent_stages_run_concurrently():
+    async def run():
+        started = asyncio.Event()
+
+        async def commit():
+            started.set()
+            await asyncio.sleep(0.01)
+            return "row"
+
+        async def tts():
+            # Only finishes if commit is running at the same time
+            await asyncio.wait_for(started.wait(), timeout=1)
+            return "audio"
+
+        return await StageScheduler().add("tts", tts).add("commit", commit).run()
+
+    assert asyncio.run(run()) == {"tts": "audio", "commit": "row"}
+
+
+def test_background_stages_are_not_awaited():
+    async def run():
+        release = asyncio.Event()
+        indexed = []
+
+        async def save():
+            return "gesture"
+
+        async def index(save):
+            await release.wait()
+            indexed.append(save)
+
+        results = await (
+            StageScheduler()
+            .add("save", save)
+            .add("index", index, depends_on=["save"], background=True)
+            .run()
+        )
+        assert indexed == []
+        release.set()
+        await drain_background()
+        return results, indexed
+
+    results, indexed = asyncio.run(run())
+    assert results == {"save": "gesture"}
+    assert indexed == ["gesture"]
+
+
+def test_failure_cancels_running_stages_and_skips_dependents():
+    cancelled = []
+    launched = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append("slow")
+            raise
+
+    async def broken():
+        raise RuntimeError("classifier down")
+
+    async def after(broken):
+        launched.append("after")
+
+    async def run():
+        scheduler = (
+            StageScheduler()
+            .add("slow", slow)
+            .add("broken", broken)
+            .add("after", after, depends_on=["broken"])
+        )
+        with pytest.raises(RuntimeError, match="classifier down"):
+            await scheduler.run()
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert cancelled == ["slow"]
+    assert launched == []
+
+
+def test_observer_sees_every_stage():
+    timings = {}
+
+    async def stage():
+        return None
+
+    asyncio.run(
+        StageScheduler(observer=lambda name, seconds: timings.setdefault(name, seconds))
+        .add("a", stage)
+        .add("b", stage)
+        .run()
+    )
+    assert sorted(timings) == ["a", "b"]
+    assert all(seconds >= 0 for seconds in timings.values())
+
+
+async def _noop(**_):
+    return None
+
+
+@pytest.mark.parametrize("build, error", [
+    (lambda s: s.add("a", _noop).add("a", _noop), ValueError),
+    (lambda s: s.add("a", _noop, depends_on=["missing"]), ValueError),
+    (lambda s: s.add("bg", _noop, background=True).add("a", _noop, depends_on=["bg"]), ValueError),
+    (lambda s: s.add("a", _noop, depends_on=["b"]).add("b", _noop, depends_on=["a"]), RuntimeError),
+])
+def test_invalid_graphs_are_rejected(build, error):
+    async def run():
+        await build(StageScheduler()).run()
+
+    with pytest.raises(error):
+        asyncio.run(run())
@@ -0,0 +1,132 @@
+"""Stream segmenters and the streaming WebSocket"""
+import time
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from backend.utils.stream_segmenter import MAX_FPS, MAX_POINTS, create_segmenter
+
+
+@pytest.mark.parametrize("fps, points", [
+    (0, 21), (-5, 21), (MAX_FPS + 1, 21), (1e9, 21), (float("nan"), 21), (float("inf"), 21),
+    (30, 0), (30, MAX_POINTS + 1),
+])
+def test_out_of_range_config_is_rejected(fps, points):
+    with pytest.raises(ValueError):
+        create_segmenter("micro_gesture", fps=fps, points=points)
+
+
+def test_largest_allowed_config_is_accepted():
+    segmenter = create_segmenter("micro_gesture", fps=MAX_FPS, points=MAX_POINTS)
+    assert segmenter.points == MAX_POINTS
+
+
+@pytest.mark.parametrize("config", [
+    {"user_id": 1, "signal": "micro_gesture", "fps": 1e9},
+    {"user_id": 1, "signal": "micro_gesture", "points": 100000},
+    {"user_id": 1, "signal": "blink", "fps": "fast"},
+])
+def test_websocket_rejects_bad_config_with_1003(client, config):
+    with client.websocket_connect("/api/gestures/ws/stream") as ws:
+        ws.send_json(config)
+        frame = ws.receive_json()
+        assert frame["type"] == "error"
+        assert frame["code"] == "invalid_config"
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+        assert closed.value.code == 1003
+
+
+@pytest.mark.parametrize("send", [
+    lambda ws: ws.send_text("not json"),
+    lambda ws: ws.send_text("[1, 2]"),
+    lambda ws: ws.send_bytes(b"\x93\x01"),
+])
+def test_websocket_rejects_undecodable_config_with_1003(client, send):
+    with client.websocket_connect("/api/gestures/ws/stream") as ws:
+        send(ws)
+        frame = ws.receive_json()
+        assert frame["code"] == "invalid_config"
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+        assert closed.value.code == 1003
+
+
+def test_websocket_rejects_undecodable_msgpack_config_with_1003(client):
+    msgpack = pytest.importorskip("msgpack")
+    from backend.utils.wire_codec import MSGPACK_SUBPROTOCOL
+
+    with client.websocket_connect("/api/gestures/ws/stream", subprotocols=[MSGPACK_SUBPROTOCOL]) as ws:
+        ws.send_bytes(b"\xc1")
+        frame = msgpack.unpackb(ws.receive_bytes(), raw=False)
+        assert frame["code"] == "invalid_config"
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_bytes()
+        assert closed.value.code == 1003
+
+
+def test_two_column_frames_do_not_inherit_stale_z():
+    segmenter = create_segmenter("micro_gesture", fps=30, buffer_seconds=0.1, points=2)
+    capacity = segmenter.ring.capacity
+    for i in range(capacity):
+        segmenter.push({"t": i * 33.0, "keypoints": [[0.0, 0.0, 5.0], [0.0, 0.0, 5.0]]})
+    # Wraps around onto the first slot, which held z = 5
+    segmenter.push({"t": capacity * 33.0, "keypoints": [[0.1, 0.2], [0.3, 0.4]]})
+
+    latest = segmenter.ring.row(segmenter.ring.count - 1)
+    assert latest[:, 2].tolist() == [0.0, 0.0]
+    assert latest[:, :2].ravel().tolist() == pytest.approx([0.1, 0.2, 0.3, 0.4])
+
+
+@pytest.mark.parametrize("keypoints", [
+    [[0.1, 0.2, 0.3, 0.4], [0.1, 0.2, 0.3, 0.4]],
+    [[0.1, 0.2], [0.1]],
+    [{"x": 0.1, "y": 0.2}, {"x": 0.1, "y": 0.2}],
+    [["a", "b"], ["c", "d"]],
+    [[0.1], [0.2]],
+    [[0.1, 0.2]],
+    [[float("nan"), 0.2], [0.1, 0.2]],
+])
+def test_malformed_keypoints_are_rejected_before_buffering(keypoints):
+    segmenter = create_segmenter("micro_gesture", fps=30, points=2)
+    segmenter.push({"t": 0.0, "keypoints": [[0.5, 0.5], [0.5, 0.5]]})
+
+    with pytest.raises(ValueError):
+        segmenter.push({"t": 33.0, "keypoints": keypoints})
+    assert segmenter.ring.count == 1
+
+
+def test_websocket_skips_malformed_frames(client):
+    with client.websocket_connect("/api/gestures/ws/stream") as ws:
+        ws.send_json({"user_id": 1, "signal": "micro_gesture", "points": 2})
+        ws.send_json({"t": 0.0, "keypoints": [[0.1, 0.2, 0.3, 0.4], [0.1, 0.2, 0.3, 0.4]]})
+        frame = ws.receive_json()
+        assert frame["type"] == "error"
+        assert frame["code"] == "invalid_frame"
+
+        # The stream is still open
+        ws.send_json({"t": 33.0, "keypoints": [[0.1, 0.2], [0.3, 0.4]]})
+        ws.send_json({"t": 66.0, "keypoints": "nope"})
+        assert ws.receive_json()["code"] == "invalid_frame"
+
+
+def test_gesture_flushed_right_before_close_is_saved(client, make_user, fake_integrations):
+    from backend.database import SessionLocal
+    from backend.models.gesture import Gesture
+
+    user_id, _ = make_user()
+    with client.websocket_connect("/api/gestures/ws/stream") as ws:
+        ws.send_json({"user_id": user_id, "signal": "tap"})
+        ws.send_json({"frames": [{"t": 0.0, "pressure": 0.6}, {"t": 80.0, "pressure": 0.0}]})
+        ws.send_json({"end": True})
+        # Close without waiting for the result
+
+    # The server handler keeps running after the test client has closed
+    saved = []
+    for _ in range(100):
+        with SessionLocal() as db:
+            saved = db.query(Gesture).filter(Gesture.user_id == user_id).all()
+        if saved:
+            break
+        time.sleep(0.05)
+    assert [g.gesture_type for g in saved] == ["tap"]
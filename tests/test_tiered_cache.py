@@ -0,0 +1,169 @@
+"""TieredCache.get_or_compute"""
+import asyncio
+import time
+
+from backend.cache import RedisCache, TieredCache
+from backend.config import settings
+from backend.utils.stage_scheduler import drain_background
+
+
+class _SharedL2(RedisCache):
+    """In-memory stand-in for Redis shared by several workers, with SET NX leases"""
+
+    def __init__(self):
+        super().__init__()
+        self.store = {}
+        self.leases = {}
+        self.released = []
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ttl=None):
+        self.store[key] = value
+
+    async def delete(self, key):
+        self.store.pop(key, None)
+
+    async def acquire_lease(self, name, ttl):
+        if name in self.leases:
+            return None
+        self.leases[name] = token = f"token-{len(self.released)}"
+        return token
+
+    async def release_lease(self, name, token):
+        if self.leases.get(name) == token:
+            del self.leases[name]
+            self.released.append(name)
+
+
+def _cache(l2=None):
+    return TieredCache(l2 or _SharedL2(), budgets={}, default_budget=100, l1_ttl=60)
+
+
+class _Counter:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"version": self.calls}
+
+
+def test_computes_once_then_serves_fresh_hits():
+    cache = _cache()
+    compute = _Counter()
+
+    async def run():
+        return [await cache.get_or_compute("analytics:x", compute, ttl=60, beta=0) for _ in range(3)]
+
+    assert asyncio.run(run()) == [{"version": 1}] * 3
+    assert compute.calls == 1
+    assert cache.compute_stats["computed"] == 1
+    assert cache.compute_stats["fresh"] == 2
+    assert cache.l2.store["analytics:x"]["v"] == {"version": 1}
+    assert cache.l2.released == ["lease:analytics:x"]
+
+
+def test_concurrent_misses_share_one_compute():
+    cache = _cache()
+    compute = _Counter(delay=0.02)
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_compute("k", compute, ttl=60) for _ in range(5)))
+
+    assert asyncio.run(run()) == [{"version": 1}] * 5
+    assert compute.calls == 1
+
+
+def test_stale_value_is_served_while_it_refreshes():
+    cache = _cache()
+    release = None
+    computed = []
+
+    async def slow_refresh():
+        await release.wait()
+        computed.append(True)
+        return "new"
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        await cache.set("k", {"v": "old", "t": time.time() - 1, "d": 0.0})
+        served = await cache.get_or_compute("k", slow_refresh, ttl=60, stale_ttl=60)
+        refreshed_before_release = bool(computed)
+        release.set()
+        await drain_background(timeout=1)
+        return served, refreshed_before_release, await cache.get_or_compute("k", slow_refresh, ttl=60, beta=0)
+
+    served, refreshed_before_release, after = asyncio.run(run())
+    assert served == "old"
+    assert not refreshed_before_release
+    assert after == "new"
+    assert cache.compute_stats["stale"] == 1
+    assert computed == [True]
+
+
+def test_delete_forces_recompute():
+    cache = _cache()
+    compute = _Counter()
+
+    async def run():
+        first = await cache.get_or_compute("k", compute, ttl=60, beta=0)
+        await cache.delete("k")
+        return first, await cache.get_or_compute("k", compute, ttl=60, beta=0)
+
+    assert asyncio.run(run()) == ({"version": 1}, {"version": 2})
+
+
+def test_waits_for_the_worker_holding_the_lease():
+    l2 = _SharedL2()
+    l2.leases["lease:k"] = "other-worker"
+    cache = _cache(l2)
+    compute = _Counter()
+
+    async def other_worker_finishes():
+        await asyncio.sleep(0.1)
+        l2.store["k"] = {"v": "theirs", "t": time.time() + 60, "d": 0.0}
+
+    async def run():
+        asyncio.ensure_future(other_worker_finishes())
+        return await cache.get_or_compute("k", compute, ttl=60)
+
+    assert asyncio.run(run()) == "theirs"
+    assert compute.calls == 0
+    assert cache.compute_stats["waited"] == 1
+    assert l2.leases == {"lease:k": "other-worker"}
+
+
+def test_computes_anyway_when_the_lease_holder_is_gone(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_LOCK_WAIT", 0.1)
+    l2 = _SharedL2()
+    l2.leases["lease:k"] = "other-worker"
+    cache = _cache(l2)
+    compute = _Counter()
+
+    assert asyncio.run(cache.get_or_compute("k", compute, ttl=60)) == {"version": 1}
+    assert compute.calls == 1
+    assert cache.compute_stats["lease_timeout"] == 1
+    # Never releases a lease it does not hold
+    assert l2.leases == {"lease:k": "other-worker"}
+
+
+def test_failed_compute_releases_the_lease_and_caches_nothing():
+    cache = _cache()
+
+    async def fail():
+        raise RuntimeError("database down")
+
+    async def run():
+        try:
+            await cache.get_or_compute("k", fail, ttl=60)
+        except RuntimeError:
+            pass
+        return await cache.get_or_compute("k", _Counter(), ttl=60, beta=0)
+
+    assert asyncio.run(run()) == {"version": 1}
+    assert cache.l2.leases == {}